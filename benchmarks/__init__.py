@@ -0,0 +1,5 @@
+"""
+Interaction benchmark for the dashboard: synthetic rankings tables at
+scale, scripted widget sessions and a headless replay harness. Run it
+with `python -m benchmarks.run`.
+"""
@@ -0,0 +1,120 @@
+"""
+Headless replay of the dashboard script.
+
+A benchmark workspace is a directory laid out like the project - a copy of
+hello.py and preswald.toml, the rankings package, and data/sample.csv
+replaced by a synthetic table - so the unmodified script runs against it.
+`HeadlessDashboard` executes the script through preswald's ScriptRunner the
+way a browser session's reruns do, and measures each rerun.
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from typing import NamedTuple
+
+import toml
+
+from .synthetic import write_csv
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_workspace(rows: int, directory: str, seed: int = 0) -> str:
+    """Create (or reuse) a benchmark workspace with a `rows`-row table and return hello.py's path."""
+    os.makedirs(os.path.join(directory, "data"), exist_ok=True)
+    data_path = os.path.join(directory, "data", "sample.csv")
+    marker = f"{data_path}.{rows}-{seed}"
+    if not os.path.exists(marker):
+        write_csv(rows, data_path, seed)
+        open(marker, "w").close()
+
+    # The script resolves its directory through symlinks, so hello.py itself is copied
+    shutil.copy(os.path.join(PROJECT_DIR, "hello.py"), os.path.join(directory, "hello.py"))
+    config = toml.load(os.path.join(PROJECT_DIR, "preswald.toml"))
+    with open(os.path.join(directory, "preswald.toml"), "w", encoding="utf-8") as f:
+        toml.dump(config, f)
+    rankings = os.path.join(directory, "rankings")
+    if not os.path.exists(rankings):
+        os.symlink(os.path.join(PROJECT_DIR, "rankings"), rankings)
+    os.makedirs(os.path.join(directory, "images"), exist_ok=True)
+    return os.path.join(directory, "hello.py")
+
+
+class Rerun(NamedTuple):
+    seconds: float
+    # Components the rerun's messages flag for the browser to render, and the size of those messages
+    # as the server's websocket sends them
+    components: int
+    payload_bytes: int
+
+
+def _message_size(message: dict) -> int:
+    """Bytes of a message as Starlette's `WebSocket.send_json()` encodes it."""
+    return len(json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _widget_name(label: str) -> str:
+    """A widget label without its leading emoji, e.g. 'Select Region' for '🌐 Select Region'."""
+    head, _, rest = label.partition(" ")
+    return rest if rest and not head.isascii() else label
+
+
+class HeadlessDashboard:
+    """Runs the dashboard script as one browser session, without a server."""
+
+    def __init__(self, script_path: str):
+        from preswald.engine.service import PreswaldService
+
+        logging.disable(logging.WARNING)
+        self.script_path = script_path
+        self.service = PreswaldService.initialize(script_path)
+        self.service.script_path = script_path
+        self.states: dict = {}
+        self.widgets: dict[str, str] = {}
+
+    def reset(self) -> None:
+        """Start a new session: every widget back to its default."""
+        self.states = {}
+
+    def rerun(self, updates: dict | None = None) -> Rerun:
+        """Apply widget `updates` (by label, see _widget_name) and rerun the script."""
+        from preswald.engine.runner import ScriptRunner
+
+        for name, value in (updates or {}).items():
+            if name not in self.widgets:
+                raise KeyError(f"No widget named {name!r} in the last render; known: {sorted(self.widgets)}")
+            self.states[self.widgets[name]] = value
+
+        sent = []
+
+        async def record(message):
+            sent.append(message)
+
+        # What the server does on a widget message: update the shared widget state, then rerun
+        # the script. The render buffer is kept, so unchanged components are not flagged to re-render
+        service = self.service
+        service._component_states.clear()
+        service._component_states.update(self.states)
+        runner = ScriptRunner(session_id="benchmark", send_message_callback=record, initial_states=self.states)
+        service.script_runners["benchmark"] = runner
+
+        start = time.perf_counter()
+        runner.run_sync(self.script_path)
+        seconds = time.perf_counter() - start
+
+        components = [c for row in service.get_rendered_components().get("rows", []) for c in row]
+        self.widgets.update({_widget_name(c["label"]): c["id"] for c in components if c.get("label") and c.get("id")})
+        # Only what the session's websocket would have carried counts
+        rendered = sum(
+            1
+            for message in sent
+            if message.get("type") == "components"
+            for row in message["components"].get("rows", [])
+            for component in row
+            if component.get("shouldRender", True)
+        )
+        return Rerun(seconds, rendered, sum(_message_size(message) for message in sent))
@@ -0,0 +1,188 @@
+"""
+Run the interaction benchmark.
+
+    python -m benchmarks.run                          # all sizes and sessions
+    python -m benchmarks.run --sizes 1500 100000 --sessions search_typing
+    python -m benchmarks.run --compare benchmarks/results/<earlier>.json
+
+Each dataset size runs in its own worker process (so peak RSS is per
+size): the first render is timed as the cold start, then every scripted
+session is replayed `--repeat` times from the default widget state. Results
+- rerun latency percentiles, peak RSS and payload bytes per session - are
+written as JSON to benchmarks/results/, named by commit and time.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+
+import numpy as np
+
+from .harness import PROJECT_DIR, HeadlessDashboard, prepare_workspace
+from .sessions import SESSIONS
+
+
+DEFAULT_SIZES = [1_500, 100_000, 1_000_000, 10_000_000]
+# preswald derives component ids from the first stack frame outside its own files, matched by
+# "preswald" in the path, so the workspaces must not live under a directory with that name
+DEFAULT_WORK_DIR = os.path.join(PROJECT_DIR, "benchmarks", ".work")
+DEFAULT_RESULTS_DIR = os.path.join(PROJECT_DIR, "benchmarks", "results")
+
+# Relative slowdown of a percentile that --compare reports as a regression
+REGRESSION_THRESHOLD = 0.10
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(float(p50), 6), "p95": round(float(p95), 6), "p99": round(float(p99), 6), "max": round(max(values), 6)}
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_size(rows: int, sessions: list[str], repeat: int, work_dir: str, seed: int) -> dict:
+    """Benchmark one dataset size in this process."""
+    script = prepare_workspace(rows, os.path.join(work_dir, str(rows)), seed)
+    dashboard = HeadlessDashboard(script)
+    cold = dashboard.rerun()
+    warm = dashboard.rerun()
+    result = {
+        "rows": rows,
+        "cold_start_seconds": round(cold.seconds, 6),
+        "warm_rerun_seconds": round(warm.seconds, 6),
+        "initial_payload_bytes": cold.payload_bytes,
+        "sessions": {},
+    }
+    for name in sessions:
+        reruns = []
+        for _ in range(repeat):
+            dashboard.reset()
+            dashboard.rerun()
+            reruns += [dashboard.rerun(step) for step in SESSIONS[name]]
+        result["sessions"][name] = {
+            "reruns": len(reruns),
+            "latency_seconds": _percentiles([r.seconds for r in reruns]),
+            "payload_bytes": _percentiles([r.payload_bytes for r in reruns]),
+            "payload_bytes_total": sum(r.payload_bytes for r in reruns),
+            "components": _percentiles([r.components for r in reruns]),
+        }
+    result["peak_rss_bytes"] = _peak_rss_bytes()
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment() -> dict:
+    import pandas
+    import preswald
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "pandas": pandas.__version__,
+        "numpy": np.__version__,
+        "preswald": getattr(preswald, "__version__", None),
+    }
+
+
+def compare(baseline: dict, current: dict) -> list[str]:
+    """Lines describing latency changes from `baseline` to `current`, regressions marked."""
+    lines = []
+    previous = {entry["rows"]: entry for entry in baseline["results"]}
+    for entry in current["results"]:
+        before = previous.get(entry["rows"])
+        if before is None:
+            continue
+        for name, stats in entry["sessions"].items():
+            old = before["sessions"].get(name)
+            if old is None:
+                continue
+            for pct in ("p50", "p95", "p99"):
+                a, b = old["latency_seconds"][pct], stats["latency_seconds"][pct]
+                change = (b - a) / a if a else 0.0
+                flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else ""
+                lines.append(f"{entry['rows']:>10,} {name:<18} {pct} {a * 1e3:9.1f} ms -> {b * 1e3:9.1f} ms ({change:+.0%}){flag}")
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay scripted dashboard sessions over synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--sessions", nargs="+", choices=sorted(SESSIONS), default=list(SESSIONS))
+    parser.add_argument("--repeat", type=int, default=3, help="replays of each session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help="synthetic datasets and workspaces")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier results file to compare latencies against")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        # One size per worker process, result as JSON on the last line of stdout
+        result = run_size(args.sizes[0], args.sessions, args.repeat, args.work_dir, args.seed)
+        print(json.dumps(result))
+        return 0
+
+    results = []
+    for rows in args.sizes:
+        print(f"Benchmarking {rows:,} rows...", file=sys.stderr)
+        command = [sys.executable, "-m", "benchmarks.run", "--worker", "--sizes", str(rows), "--sessions", *args.sessions,
+                   "--repeat", str(args.repeat), "--seed", str(args.seed), "--work-dir", args.work_dir]
+        worker = subprocess.run(command, cwd=PROJECT_DIR, capture_output=True, text=True)
+        if worker.returncode != 0:
+            print(worker.stderr, file=sys.stderr)
+            return worker.returncode
+        result = json.loads(worker.stdout.strip().splitlines()[-1])
+        results.append(result)
+        for name, stats in result["sessions"].items():
+            latency = stats["latency_seconds"]
+            print(f"{rows:>10,} {name:<18} p50 {latency['p50'] * 1e3:8.1f} ms  p95 {latency['p95'] * 1e3:8.1f} ms  "
+                  f"p99 {latency['p99'] * 1e3:8.1f} ms  sent {stats['payload_bytes_total'] / 1e6:7.2f} MB", file=sys.stderr)
+        print(f"{rows:>10,} cold start {result['cold_start_seconds']:.2f} s, peak RSS {result['peak_rss_bytes'] / 2**20:.0f} MiB", file=sys.stderr)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": now.isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{commit or 'unknown'}-{now:%Y%m%dT%H%M%SZ}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            lines = compare(json.load(f), report)
+        print("\n".join(lines))
+        return 1 if any(line.endswith("REGRESSION") for line in lines) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Scripted widget sessions replayed by the benchmark.
+
+A session is a list of steps; each step sets one or more widgets, addressed
+by their label without its leading emoji, and triggers one rerun. Widget values persist
+between steps, as they do in a browser session, and every session starts
+from the dashboard's defaults.
+"""
+
+# Typing into the search box one keystroke at a time, then clearing it
+SEARCH_TYPING = [{"Search Universities": "Massachusetts"[:n]} for n in range(1, 14)] + [
+    {"Search Universities": ""},
+    {"Search Universities": "londn"},
+    {"Search Universities": ""},
+]
+
+# Dragging the threshold slider across its range and back, then paging
+SLIDER_DRAG = (
+    [{"Set Minimum Overall Score Threshold": value} for value in range(80, 101, 2)]
+    + [{"Set Minimum Overall Score Threshold": value} for value in range(98, 79, -3)]
+    + [{"Rows per Page": 100}, {"Results Page": 2}, {"Results Page": 3}, {"Rows per Page": 25}]
+)
+
+CHART_TYPES = ["📊 Regional Bar Chart", "📦 Distribution Box Plot", "📈 Score Histogram", "🔵 Scatter Plot Analysis"]
+
+# Cycling the chart types twice, the second round over a filtered selection
+CHART_SWITCHING = (
+    [{"Visualization Type": chart} for chart in CHART_TYPES]
+    + [{"Select Region": "🌍 Europe"}]
+    + [{"Visualization Type": chart} for chart in CHART_TYPES]
+)
+
+# Turning the advanced filters on, moving them, and combining them with the basic ones
+ADVANCED_FILTERS = [
+    {"Enable Advanced Filters": True},
+    {"Minimum Academic Reputation Score": 20},
+    {"Minimum Academic Reputation Score": 50},
+    {"Academic Focus Area": "🔬 Focused"},
+    {"Academic Focus Area": "🎓 Full Comprehensive"},
+    {"University Size": "🔷 Large"},
+    {"Include Private Universities": False},
+    {"Select Region": "🌍 Asia"},
+    {"Minimum Academic Reputation Score": 0},
+    {"Enable Advanced Filters": False},
+]
+
+# Exporting the full and a filtered selection in every format
+EXPORT = [
+    step
+    for export_format in ["📄 CSV (Excel Compatible)", "📋 JSON Lines (Data Format)", "📊 Excel (Advanced Workbook)", "🧱 Parquet (Analytics)"]
+    for step in (
+        {"Export Format Selection": export_format, "Download Filtered Dataset": True},
+        {"Download Filtered Dataset": False},
+    )
+] + [
+    {"Select Region": "🌍 Americas", "Download Filtered Dataset": True},
+    {"Download Filtered Dataset": False},
+]
+
+SESSIONS = {
+    "search_typing": SEARCH_TYPING,
+    "slider_drag": SLIDER_DRAG,
+    "chart_switching": CHART_SWITCHING,
+    "advanced_filters": ADVANCED_FILTERS,
+    "export": EXPORT,
+}
@@ -0,0 +1,116 @@
+"""
+Synthetic rankings tables with the schema of data/sample.csv.
+
+Every synthetic institution is derived from a randomly drawn real row: its
+Country/Region, Size, Focus, Research and Status are copied (so their joint
+distribution matches the sample), and each score is the real score plus
+Gaussian noise, clipped to the 1-100 scale, keeping the real row's missing
+scores missing. Ranks are then recomputed over the whole synthetic table
+with the sample's label formats ('7', '701-750', '1401+') and rows are
+written in overall rank order, like the published file.
+"""
+
+import numpy as np
+import pandas as pd
+
+from rankings.ingest import SCORE_COLUMNS
+
+
+SAMPLE_PATH = "data/sample.csv"
+
+# Standard deviation of the noise added to each score
+SCORE_NOISE = 4.0
+
+# Ranks up to this are exact; further down they are reported in bands, as in the sample
+EXACT_RANK = 700
+RANK_BAND = 50
+LAST_BAND = 1400
+
+CHUNK_ROWS = 250_000
+
+CATEGORY_FIELDS = ["Country/Territory", "Region", "Size", "Focus", "Research", "Status"]
+
+
+def read_sample(path: str = SAMPLE_PATH) -> pd.DataFrame:
+    return pd.read_csv(path, encoding="utf-8-sig", dtype=str, na_values=["", "-"], keep_default_na=False)
+
+
+def _rank_labels(ranks: np.ndarray) -> np.ndarray:
+    """Labels for 1-based ranks: exact up to EXACT_RANK, then bands of RANK_BAND, then 'N+'."""
+    labels = ranks.astype(str).astype(object)
+    banded = ranks > EXACT_RANK
+    low = EXACT_RANK + 1 + (ranks[banded] - EXACT_RANK - 1) // RANK_BAND * RANK_BAND
+    bands = np.char.add(np.char.add(low.astype(str), "-"), (low + RANK_BAND - 1).astype(str)).astype(object)
+    bands[low + RANK_BAND - 1 > LAST_BAND] = f"{LAST_BAND + 1}+"
+    labels[banded] = bands
+    return labels
+
+
+def _score_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks of scores, highest first, missing scores last."""
+    order = np.argsort(-np.nan_to_num(values, nan=-np.inf), kind="stable")
+    ranks = np.empty(len(values), dtype=np.int32)
+    ranks[order] = np.arange(1, len(values) + 1, dtype=np.int32)
+    return ranks
+
+
+class _Synthetic:
+    """The numeric parts of a synthetic table; string columns are built per chunk."""
+
+    def __init__(self, rows: int, seed: int, sample: pd.DataFrame):
+        self.sample = sample
+        rng = np.random.default_rng(seed)
+        source = rng.integers(0, len(sample), rows, dtype=np.int32)
+
+        scores = {}
+        for col in SCORE_COLUMNS:
+            real = pd.to_numeric(sample[col], errors="coerce").to_numpy(dtype=np.float32)[source]
+            noisy = real + rng.normal(0, SCORE_NOISE, rows).astype(np.float32)
+            scores[col] = np.round(np.clip(noisy, 1.0, 100.0), 1)
+
+        # Published order: by overall score, unscored institutions after the scored ones by reputation
+        order = np.lexsort((-np.nan_to_num(scores["AR SCORE"], nan=-np.inf), -np.nan_to_num(scores["Overall SCORE"], nan=-np.inf)))
+        self.source = source[order]
+        self.scores = {col: values[order] for col, values in scores.items()}
+        self.ranks = {col: _score_ranks(values) for col, values in self.scores.items() if col != "Overall SCORE"}
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def frame(self, start: int, stop: int) -> pd.DataFrame:
+        """Rows [start, stop) as a string-typed frame, like the raw CSV."""
+        source = self.source[start:stop]
+        out = {
+            "2026 Rank": _rank_labels(np.arange(start + 1, start + len(source) + 1)),
+            "Previous Rank": self.sample["Previous Rank"].to_numpy(dtype=object)[source],
+        }
+        # Synthetic institutions keep their source's name plus a serial number, so names stay unique
+        names = self.sample["Institution Name"].to_numpy(dtype=str)[source]
+        out["Institution Name"] = np.char.add(np.char.add(names, " #"), np.arange(start + 1, start + len(source) + 1).astype(str)).astype(object)
+        for col in CATEGORY_FIELDS:
+            out[col] = self.sample[col].to_numpy(dtype=object)[source]
+        for col in SCORE_COLUMNS:
+            out[col] = self.scores[col][start:stop]
+            if col in self.ranks:
+                out[col.replace("SCORE", "RANK")] = _rank_labels(self.ranks[col][start:stop])
+        return pd.DataFrame(out, columns=self.sample.columns)
+
+
+def generate(rows: int, seed: int = 0, sample: pd.DataFrame | None = None) -> pd.DataFrame:
+    """A synthetic rankings table of `rows` rows (string-typed, like the raw CSV)."""
+    synthetic = _Synthetic(rows, seed, read_sample() if sample is None else sample)
+    return synthetic.frame(0, rows)
+
+
+def write_csv(rows: int, path: str, seed: int = 0, sample: pd.DataFrame | None = None) -> None:
+    """
+    Write a synthetic table of `rows` rows to `path` as CSV, in chunks so
+    that only the numeric columns are held for the whole table.
+    """
+    synthetic = _Synthetic(rows, seed, read_sample() if sample is None else sample)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        for start in range(0, rows, CHUNK_ROWS):
+            chunk = synthetic.frame(start, min(start + CHUNK_ROWS, rows))
+            # The published file marks a missing overall score with '-'
+            chunk["Overall SCORE"] = chunk["Overall SCORE"].astype(object).where(chunk["Overall SCORE"].notna(), "-")
+            chunk.to_csv(f, index=False, header=start == 0, lineterminator="\n")
@@ -1,29 +1,53 @@
 # Load the dataset
-from preswald import connect, get_df, query, table, text, slider, plotly, selectbox, button, checkbox, text_input
-import plotly.express as px
-import pandas as pd
+import os
+import sys
+from preswald import connect, query, table, text, slider, selectbox, button, checkbox, text_input
 
-# Initialize connection to preswald.toml data sources
-connect()
+# Preswald runs this script from the project directory - make the local rankings package importable
+if os.getcwd() not in sys.path:
+    sys.path.insert(0, os.getcwd())
+from rankings import SCORE_COLUMNS, SUMMARY_COLUMNS, AggregationCube, Selection, aggregation_cube, build_query, cached_plotly, display_frame, downsample, edition_year, export_selection, filter_engine, lazy_import, load_watched, page_count, paginate, profiler, rank_movement, rankings_store, read_chart_config, read_profiling_config, read_rerun_config, render_mode, rerun_scheduler, score_index, search_index, section_cache, similarity_index, sorted_selection, top_k, top_k_per_group
 
-# Load data
-df = get_df("sample_csv")
+# plotly.express is only imported once a chart misses the figure cache
+px = lazy_import("plotly.express")
 
-# Fix data types - convert score columns to numeric
-score_columns = ['Overall SCORE', 'AR SCORE', 'ER SCORE', 'FSR SCORE', 'CPF SCORE', 'IFR SCORE', 'ISR SCORE', 'ISD SCORE', 'IRN SCORE', 'EO SCORE', 'SUS SCORE']
-for col in score_columns:
-    if col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+# With `profile = true` under [logging] in preswald.toml, each rerun and section logs its wall time,
+# allocated memory and payload bytes, and running totals are written as Prometheus metrics
+profile = profiler(read_profiling_config())
+profile.begin_rerun()
 
-# Query or manipulate the data - use quotes for column names with spaces
-sql = 'SELECT * FROM sample_csv WHERE "Overall SCORE" > 90'
-try:
-    filtered_df = query(sql, "sample_csv")
-    if filtered_df is None:
-        filtered_df = df[pd.to_numeric(df['Overall SCORE'], errors='coerce') > 90]
-except Exception:
-    # Fallback to pandas filtering if SQL query fails
-    filtered_df = df[pd.to_numeric(df['Overall SCORE'], errors='coerce') > 90]
+# Typing and slider drags are coalesced into one rerun per pause ([reruns] in preswald.toml), and a
+# rerun made obsolete by a newer change stops at its next cached section instead of finishing
+rerun_scheduler(read_rerun_config())
+
+# Initialize connection to preswald.toml data sources
+connect()
+
+# Load data - typed once per source file (float32 scores, nullable int ranks beside their published
+# labels such as '701-750', categorical labels)
+# and cached as a memory-mapped Arrow IPC file in .preswald_cache/, so reruns and new worker processes
+# reuse the parsed frame instead of re-reading the CSV.
+# The frame is shared read-only by every session; filters below only select row positions.
+# Each edition of the file, and indicator updates published in between, are also kept in the
+# source's append-only rankings store ([data.sample_csv] store_dir), which tracks rank movement.
+# With `watch = true` a background thread reloads the source when its files change and swaps the
+# new snapshot in for later reruns, so this rerun keeps the frame it gets here throughout
+with profile.section("load"):
+    df = load_watched("sample_csv")
+rankings_history = rankings_store("sample_csv")
+edition = edition_year(df.columns)
+score_columns = SCORE_COLUMNS
+
+# Heavy sections below run through the section cache: each declares the widget values it depends
+# on, and a rerun where those are unchanged replays the section's recorded output instead of
+# re-running its queries and rebuilding its tables and charts
+sections = section_cache(df)
+
+# Point charts switch to WebGL and thin dense areas server-side above the [charts] limits in preswald.toml
+chart_config = read_chart_config()
+
+# "Download Filtered Dataset" writes here; preswald serves the project's images/ directory at /images
+EXPORT_DIR = os.path.join("images", "exports")
 
 # Enhanced Header with Professional Styling
 text("# 🎓 University Rankings Analytics Dashboard")
@@ -34,17 +58,15 @@ text("")  # Add breathing room
 # Quick Stats Section with Enhanced Visual Appeal
 text("## 📊 Dashboard Overview")
 text("")
-total_universities = len(df)
-avg_overall_score = df['Overall SCORE'].mean()
-# Fix potential NoneType error for top university
-if not df.empty and 'Overall SCORE' in df.columns:
-    max_idx = df['Overall SCORE'].idxmax()
-    if pd.notna(max_idx):
-        top_university = df.loc[max_idx, 'Institution Name']
-    else:
-        top_university = "N/A"
-else:
-    top_university = "N/A"
+# Overview metrics, regional comparisons and the executive summary are read from the aggregation
+# cube (per Region x Country x Size x Focus x Status cell score aggregates, built once per source load)
+with profile.section("overview"):
+    cube = aggregation_cube(df)
+    total_universities = len(df)
+    avg_overall_score = cube.mean('Overall SCORE')
+    # Fix potential NoneType error for top university
+    top_row = cube.top('Overall SCORE')
+    top_university = df['Institution Name'].iloc[top_row] if top_row is not None else "N/A"
 
 # Create visually appealing metrics cards
 text("### � Key Metrics at a Glance")
@@ -71,17 +93,17 @@ text("")
 text("#### 🌍 **Geographic Selection**")
 text("*Filter universities by global regions and countries*")
 text("")
-regions = df['Region'].unique().tolist()
+regions = filter_engine(df).options('Region')
 selected_region = selectbox("🌐 Select Region", options=["🌐 All Regions"] + [f"🌍 {region}" for region in regions], default="🌐 All Regions")
 text("")
-countries = sorted(df['Country/Territory'].unique().tolist())
+countries = sorted(filter_engine(df).options('Country/Territory'))
 selected_country = selectbox("🏳️ Select Country", options=["🏳️ All Countries"] + [f"🏴 {country}" for country in countries], default="🏳️ All Countries")
 text("")
 
 text("#### 🏫 **Institution Characteristics**")
 text("*Filter by university size and institutional type*")
 text("")
-sizes = df['Size'].unique().tolist()
+sizes = filter_engine(df).options('Size')
 size_labels = {"XS": "🔹 Extra Small", "S": "🔸 Small", "M": "🔶 Medium", "L": "🔷 Large", "XL": "🔵 Extra Large"}
 size_options = ["📏 All Sizes"] + [size_labels.get(size, f"📐 {size}") for size in sizes]
 selected_size = selectbox("📏 University Size", options=size_options, default="📏 All Sizes")
@@ -111,11 +133,11 @@ if show_advanced:
     text("")
     min_ar_score = slider("🎯 Minimum Academic Reputation Score", min_val=0, max_val=100, default=0)
     text("")
-    
+
     text("##### 🎓 **Academic Focus Areas**")
     text("*Filter by institutional focus and specialization*")
     text("")
-    focus_options = df['Focus'].unique().tolist()
+    focus_options = filter_engine(df).options('Focus')
     focus_labels = {"FC": "🎓 Full Comprehensive", "FO": "🔬 Focused", "CO": "🔄 Comprehensive", "SP": "🎯 Specialized"}
     focus_display_options = ["🎯 All Focus Areas"] + [focus_labels.get(focus, f"📚 {focus}") for focus in focus_options]
     selected_focus = selectbox("🎓 Academic Focus Area", options=focus_display_options, default="🎯 All Focus Areas")
@@ -139,28 +161,37 @@ if reset_pressed:
     text("🔄 **Reset Complete!** All filters cleared - displaying full dataset.")
     text("")
 
+# Table display options - every table below is sorted, paged and projected server-side,
+# so only the visible rows and the chosen columns are sent to the browser
+text("#### 📋 **Table Display**")
+text("*Choose which columns the result tables show and how many rows fit on a page*")
+text("")
+column_choice = selectbox("🧾 Table Columns", options=["📋 Key Scores", "📑 All Indicators & Ranks"], default="📋 Key Scores")
+text("")
+rows_per_page = int(slider("📄 Rows per Page", min_val=10, max_val=100, step=5, default=25))
+text("")
+table_columns = SUMMARY_COLUMNS if column_choice.startswith("📋") else None
+
 text("---")
 text("")  # Enhanced spacing
 
-# Filter the dataframe based on selections
-filtered_data = df.copy()
+# Filter the dataframe based on selections - collect the active criteria, then let the shared
+# filter engine AND together its cached per-predicate bitmasks (only changed controls are recomputed)
+filter_criteria = {}
 
 # Apply region filter - extract region name from enhanced label
 if not selected_region.startswith("🌐"):
-    region_name = selected_region.replace("🌍 ", "")
-    filtered_data = filtered_data[filtered_data['Region'] == region_name]
+    filter_criteria['region'] = selected_region.replace("🌍 ", "")
 
 # Apply country filter - extract country name from enhanced label
 if not selected_country.startswith("🏳️"):
-    country_name = selected_country.replace("🏴 ", "")
-    filtered_data = filtered_data[filtered_data['Country/Territory'] == country_name]
+    filter_criteria['country'] = selected_country.replace("🏴 ", "")
 
 # Apply size filter - extract size from enhanced label
 if not selected_size.startswith("📏"):
     # Reverse lookup from display label to actual size value
     size_reverse_lookup = {"🔹 Extra Small": "XS", "🔸 Small": "S", "🔶 Medium": "M", "🔷 Large": "L", "🔵 Extra Large": "XL"}
-    actual_size = size_reverse_lookup.get(selected_size, selected_size.replace("📐 ", ""))
-    filtered_data = filtered_data[filtered_data['Size'] == actual_size]
+    filter_criteria['size'] = size_reverse_lookup.get(selected_size, selected_size.replace("📐 ", ""))
 
 # Apply status filter
 status_filter = []
@@ -169,22 +200,23 @@ if show_private:
 if show_public:
     status_filter.append('Public')
 if status_filter:
-    filtered_data = filtered_data[filtered_data['Status'].isin(status_filter)]
+    filter_criteria['status'] = tuple(status_filter)
 
-# Apply search filter
+# Apply search filter - matched against the prebuilt word/trigram index over name, country,
+# region, focus and status (prefix and typo-tolerant, never interpreted as a regex)
 if search_term:
-    filtered_data = filtered_data[
-        filtered_data['Institution Name'].str.contains(search_term, case=False, na=False)
-    ]
+    filter_criteria['search'] = search_term
 
 # Apply advanced filters if enabled
 if show_advanced:
-    filtered_data = filtered_data[pd.to_numeric(filtered_data['AR SCORE'], errors='coerce') >= min_ar_score]
+    filter_criteria['min_ar_score'] = min_ar_score
     if not selected_focus.startswith("🎯"):
         # Reverse lookup from display label to actual focus value
         focus_reverse_lookup = {"🎓 Full Comprehensive": "FC", "🔬 Focused": "FO", "🔄 Comprehensive": "CO", "🎯 Specialized": "SP"}
-        actual_focus = focus_reverse_lookup.get(selected_focus, selected_focus.replace("📚 ", ""))
-        filtered_data = filtered_data[filtered_data['Focus'] == actual_focus]
+        filter_criteria['focus'] = focus_reverse_lookup.get(selected_focus, selected_focus.replace("📚 ", ""))
+
+with profile.section("filters"):
+    filtered_data = filter_engine(df).select(filter_criteria)
 
 # Enhanced Results Display with Professional Formatting
 text("## 🏆 Elite Universities Showcase")
@@ -193,13 +225,34 @@ text("")
 text("*Discover universities that have achieved exceptional overall performance scores above 90 points*")
 text("")
 
-if filtered_df is not None and len(filtered_df) > 0:
-    text(f"**🎯 Found {len(filtered_df)} elite institutions meeting the highest standards**")
-    text("")
-    table(filtered_df, title="🌟 Elite University Rankings")
-else:
-    text("📊 **No universities currently meet the elite 90+ score criteria.**")
-    text("💡 *Tip: Adjust your geographic or institutional filters to discover more results*")
+def render_elite_showcase(criteria, columns):
+    # Query or manipulate the data - push the current filters plus the elite cut-off down into the SQL
+    # engine as one statement, projecting only the columns the elite table shows. The SQL table holds
+    # the frame this rerun serves, with the rankings store's updates applied. A search goes
+    # through the filter engine instead, so it matches the same rows (prefixes, typos) as the
+    # search index behind every other table
+    elite_criteria = dict(criteria, overall_above=90)
+    filtered_df = None
+    if 'search' not in elite_criteria:
+        sql = build_query("sample_csv", elite_criteria, columns=columns, order_by="Overall SCORE")
+        try:
+            filtered_df = query(sql, "sample_csv")
+        except Exception:
+            # Fallback to pandas filtering if SQL query fails
+            filtered_df = None
+    if filtered_df is None:
+        elite_rows = sorted_selection(filter_engine(df).select(elite_criteria), "Overall SCORE", descending=True)
+        filtered_df = elite_rows.to_frame(columns)
+
+    if filtered_df is not None and len(filtered_df) > 0:
+        text(f"**🎯 Found {len(filtered_df)} elite institutions meeting the highest standards**")
+        text("")
+        table(display_frame(filtered_df), title="🌟 Elite University Rankings")
+    else:
+        text("📊 **No universities currently meet the elite 90+ score criteria.**")
+        text("💡 *Tip: Adjust your geographic or institutional filters to discover more results*")
+
+sections.run("elite_showcase", render_elite_showcase, filter_criteria, table_columns)
 
 text("")
 text("---")
@@ -214,12 +267,20 @@ text("")
 
 threshold = slider("🎚️ Set Minimum Overall Score Threshold", min_val=80, max_val=100, default=90)
 text("")
-threshold_filtered = df[pd.to_numeric(df["Overall SCORE"], errors='coerce') > threshold].dropna(subset=['Overall SCORE'])
+# Binary search over the pre-sorted Overall SCORE index instead of rescanning the column per drag
+threshold_filtered = score_index(df, "Overall SCORE").above(threshold)
+
+def render_threshold_page(selection, threshold, page_number, rows_per_page, columns):
+    threshold_page = paginate(selection, page_number, rows_per_page, columns=columns)
+    text(f"*{threshold_page.caption}*")
+    table(display_frame(threshold_page.frame), title=f"🎓 Universities Scoring Above {threshold} Points")
 
-if threshold_filtered is not None and len(threshold_filtered) > 0:
+if len(threshold_filtered) > 0:
     text(f"📈 **{len(threshold_filtered)} universities** exceed your {threshold}-point threshold")
     text("")
-    table(threshold_filtered, title=f"🎓 Universities Scoring Above {threshold} Points")
+    threshold_pages = page_count(len(threshold_filtered), rows_per_page)
+    threshold_page_number = slider("📄 Threshold Results Page", min_val=1, max_val=threshold_pages, default=1) if threshold_pages > 1 else 1
+    sections.run("threshold_page", render_threshold_page, threshold_filtered, threshold, threshold_page_number, rows_per_page, table_columns)
 else:
     text(f"🔍 **No universities found** with scores above {threshold} points.")
     text("💡 *Consider lowering the threshold to see more results*")
@@ -229,7 +290,7 @@ text("---")
 text("")
 
 # Enhanced Filtered Results with Exceptional Visual Appeal
-result_count = len(filtered_data) if filtered_data is not None else 0
+result_count = len(filtered_data)
 text(f"## 🔎 **Customized Results Dashboard**")
 text(f"### 📊 *{result_count} Universities Match Your Criteria*")
 text("")
@@ -238,40 +299,63 @@ if result_count > 0:
     text(f"✅ **Excellent!** We found **{result_count} universities** that perfectly match your search criteria.")
     text("")
     text("#### 📋 **Your Personalized University Selection**")
-    table(filtered_data, title="🎯 Tailored University Results")
-    text("")
-    
-    # Enhanced Summary Statistics with Premium Visual Appeal
-    text("### 📊 **Advanced Performance Analytics**")
-    text("*Comprehensive statistical analysis of your filtered results*")
-    text("")
-    
-    overall_scores = pd.to_numeric(filtered_data['Overall SCORE'], errors='coerce')
-    avg_score = overall_scores.mean()
-    max_score = overall_scores.max()
-    min_score = overall_scores.min()
-    
-    text("#### 🎯 **Core Performance Metrics**")
-    text("")
-    text(f"🏆 **Peak Performance Score:** `{max_score:.1f}/100` points")
-    text(f"📊 **Average Performance Score:** `{avg_score:.1f}/100` points") 
-    text(f"📉 **Minimum Performance Score:** `{min_score:.1f}/100` points")
-    text(f"🎓 **Total Institutions Analyzed:** `{result_count}` universities")
-    text("")
-    
-    # Enhanced Performance Categories with Visual Appeal
-    excellent_count = len(filtered_data[pd.to_numeric(filtered_data['Overall SCORE'], errors='coerce') >= 95])
-    good_count = len(filtered_data[pd.to_numeric(filtered_data['Overall SCORE'], errors='coerce').between(85, 95)])
-    average_count = len(filtered_data[pd.to_numeric(filtered_data['Overall SCORE'], errors='coerce') < 85])
-    
-    text("#### 📈 **Performance Distribution Analysis**")
-    text("*Classification of institutions by performance tier*")
-    text("")
-    text(f"🌟 **World-Class (95+ points):** `{excellent_count}` universities")
-    text(f"⭐ **Excellent (85-94 points):** `{good_count}` universities") 
-    text(f"📈 **Strong (Below 85 points):** `{average_count}` universities")
-    text("")
-    
+    # Sorting happens server-side on the selected row positions; "Best Match" keeps search relevance order
+    sort_options = {
+        "🏅 Best Match / Ranking Order": (None, False),
+        "📊 Overall Score (High to Low)": ("Overall SCORE", True),
+        "🎓 Academic Reputation (High to Low)": ("AR SCORE", True),
+        "💼 Employer Reputation (High to Low)": ("ER SCORE", True),
+        "🔤 Institution Name (A-Z)": ("Institution Name", False),
+        "🌍 Country (A-Z)": ("Country/Territory", False),
+    }
+    sort_choice = selectbox("↕️ Sort Results By", options=list(sort_options), default="🏅 Best Match / Ranking Order")
+    sort_column, sort_descending = sort_options.get(sort_choice, (None, False))
+    results_pages = page_count(result_count, rows_per_page)
+    results_page_number = slider("📄 Results Page", min_val=1, max_val=results_pages, default=1) if results_pages > 1 else 1
+
+    def render_results_page(selection, search_term, sort_column, sort_descending, page_number, rows_per_page, columns):
+        results_view = search_index(df).rank(selection, search_term) if search_term else selection
+        results_page = paginate(results_view, page_number, rows_per_page, sort_by=sort_column, descending=sort_descending, columns=columns)
+        text(f"*{results_page.caption}*")
+        table(display_frame(results_page.frame), title="🎯 Tailored University Results")
+        text("")
+
+    def render_result_statistics(selection):
+        # Enhanced Summary Statistics with Premium Visual Appeal
+        text("### 📊 **Advanced Performance Analytics**")
+        text("*Comprehensive statistical analysis of your filtered results*")
+        text("")
+
+        # Sorted Overall SCORE index limited to the filtered rows - stats and tier counts are binary searches
+        overall_scores = score_index(df, 'Overall SCORE').restrict(selection.rows)
+        avg_score = overall_scores.mean()
+        max_score = overall_scores.max()
+        min_score = overall_scores.min()
+
+        text("#### 🎯 **Core Performance Metrics**")
+        text("")
+        text(f"🏆 **Peak Performance Score:** `{max_score:.1f}/100` points")
+        text(f"📊 **Average Performance Score:** `{avg_score:.1f}/100` points")
+        text(f"📉 **Minimum Performance Score:** `{min_score:.1f}/100` points")
+        text(f"🎓 **Total Institutions Analyzed:** `{len(selection)}` universities")
+        text("")
+
+        # Enhanced Performance Categories with Visual Appeal
+        excellent_count = overall_scores.count_at_least(95)
+        good_count = overall_scores.count_between(85, 95)
+        average_count = overall_scores.count_below(85)
+
+        text("#### 📈 **Performance Distribution Analysis**")
+        text("*Classification of institutions by performance tier*")
+        text("")
+        text(f"🌟 **World-Class (95+ points):** `{excellent_count}` universities")
+        text(f"⭐ **Excellent (85-94 points):** `{good_count}` universities")
+        text(f"📈 **Strong (Below 85 points):** `{average_count}` universities")
+        text("")
+
+    sections.run("results_page", render_results_page, filtered_data, search_term, sort_column, sort_descending, results_page_number, rows_per_page, table_columns)
+    sections.run("result_statistics", render_result_statistics, filtered_data)
+
 else:
     text("🔍 **No Match Found** - Let's Help You Discover Great Universities!")
     text("")
@@ -311,116 +395,116 @@ text("### 🌍 **Global Regional Performance Analysis**")
 text("*Compare and contrast university performance across different world regions*")
 text("")
 
-if result_count > 0:
+def render_chart(selection, criteria, chart_type):
     if "Scatter" in chart_type:
         text("#### 🎯 **Correlation Analysis: Overall vs Academic Reputation**")
         text("*Explore the relationship between overall performance and academic reputation by region*")
         text("")
-        
+
         # Enhanced scatter plot with better data handling
-        plot_data = filtered_data.copy()
-        plot_data['Overall SCORE'] = pd.to_numeric(plot_data['Overall SCORE'], errors='coerce')
-        plot_data['AR SCORE'] = pd.to_numeric(plot_data['AR SCORE'], errors='coerce')
-        plot_data = plot_data.dropna(subset=['Overall SCORE', 'AR SCORE'])
-        
-        if len(plot_data) > 0:
-            fig1 = px.scatter(plot_data, 
+        plot_rows = selection.dropna(['Overall SCORE', 'AR SCORE'])
+
+        if len(plot_rows) > 0:
+            shown_rows = downsample(plot_rows, "Overall SCORE", "AR SCORE", chart_config["max_points"])
+            if len(shown_rows) < len(plot_rows):
+                text(f"*Showing {len(shown_rows):,} of {len(plot_rows):,} universities - dense areas are thinned, outliers are kept*")
+            cached_plotly("overall_vs_ar_scatter", shown_rows, lambda: px.scatter(
+                         shown_rows.to_frame(['Institution Name', 'Country/Territory', 'Region', 'Size', 'Overall SCORE', 'AR SCORE']),
+                         render_mode=render_mode(len(shown_rows), chart_config["webgl_threshold"]),
                          x="Overall SCORE", 
                          y="AR SCORE", 
                          color="Region",
                          hover_name="Institution Name",
                          hover_data=["Country/Territory", "Size"],
                          title="🎯 Performance Correlation: Overall Score vs Academic Reputation",
-                         labels={"Overall SCORE": "Overall Performance Score", "AR SCORE": "Academic Reputation Score"})
-            fig1.update_layout(
-                plot_bgcolor='rgba(240,248,255,0.8)',
-                paper_bgcolor='rgba(255,255,255,0.9)',
-                font=dict(size=12, family="Arial"),
-                title_font_size=16,
-                showlegend=True
-            )
-            plotly(fig1)
+                         labels={"Overall SCORE": "Overall Performance Score", "AR SCORE": "Academic Reputation Score"}),
+                layout=dict(
+                    plot_bgcolor='rgba(240,248,255,0.8)',
+                    paper_bgcolor='rgba(255,255,255,0.9)',
+                    font=dict(size=12, family="Arial"),
+                    title_font_size=16,
+                    showlegend=True
+                ))
         else:
             text("📊 *Insufficient data points available for scatter plot visualization*")
-            
+
     elif "Bar Chart" in chart_type:
         text("#### 📊 **Regional Performance Comparison**")
         text("*Average performance scores across different global regions*")
         text("")
-        
-        plot_data = filtered_data.copy()
-        plot_data['Overall SCORE'] = pd.to_numeric(plot_data['Overall SCORE'], errors='coerce')
-        region_avg = plot_data.groupby('Region')['Overall SCORE'].mean().reset_index()
-        
+
+        cube_filter = AggregationCube.where_from_criteria(criteria)
+        if cube_filter is not None:
+            region_avg = cube.aggregate('Overall SCORE', cube_filter, by='Region')[['Region', 'mean']].rename(columns={'mean': 'Overall SCORE'})
+        else:
+            # Search and score thresholds are not cube dimensions - aggregate the selected rows
+            plot_data = selection.to_frame(['Region', 'Overall SCORE'])
+            region_avg = plot_data.groupby('Region', observed=True)['Overall SCORE'].mean().reset_index()
+
         if len(region_avg) > 0:
-            fig1 = px.bar(region_avg, 
+            cached_plotly("region_average_bar", selection, lambda: px.bar(region_avg, 
                       x="Region", 
                       y="Overall SCORE",
                       title="📊 Average Performance Metrics by Global Region",
                       labels={"Overall SCORE": "Average Overall Score", "Region": "Geographic Region"},
                       color="Overall SCORE",
-                      color_continuous_scale="viridis")
-            fig1.update_layout(
-                plot_bgcolor='rgba(240,248,255,0.8)',
-                paper_bgcolor='rgba(255,255,255,0.9)',
-                font=dict(size=12, family="Arial"),
-                title_font_size=16
-            )
-            plotly(fig1)
+                      color_continuous_scale="viridis"),
+                layout=dict(
+                    plot_bgcolor='rgba(240,248,255,0.8)',
+                    paper_bgcolor='rgba(255,255,255,0.9)',
+                    font=dict(size=12, family="Arial"),
+                    title_font_size=16
+                ))
         else:
             text("📊 *No regional data available for bar chart visualization*")
-            
+
     elif "Box Plot" in chart_type:
         text("#### 📦 **Score Distribution Analysis**")
         text("*Statistical distribution of performance scores across regions*")
         text("")
-        
-        plot_data = filtered_data.copy()
-        plot_data['Overall SCORE'] = pd.to_numeric(plot_data['Overall SCORE'], errors='coerce')
-        plot_data = plot_data.dropna(subset=['Overall SCORE'])
-        
-        if len(plot_data) > 0:
-            fig1 = px.box(plot_data, 
+
+        plot_rows = selection.dropna(['Overall SCORE'])
+
+        if len(plot_rows) > 0:
+            cached_plotly("region_score_box", plot_rows, lambda: px.box(plot_rows.to_frame(['Region', 'Overall SCORE']), 
                           x="Region", 
                           y="Overall SCORE",
                           title="📦 Performance Distribution Analysis by Region",
-                          labels={"Overall SCORE": "Overall Score Distribution", "Region": "Geographic Region"})
-            fig1.update_layout(
-                plot_bgcolor='rgba(240,248,255,0.8)',
-                paper_bgcolor='rgba(255,255,255,0.9)',
-                font=dict(size=12, family="Arial"),
-                title_font_size=16
-            )
-            plotly(fig1)
+                          labels={"Overall SCORE": "Overall Score Distribution", "Region": "Geographic Region"}),
+                layout=dict(
+                    plot_bgcolor='rgba(240,248,255,0.8)',
+                    paper_bgcolor='rgba(255,255,255,0.9)',
+                    font=dict(size=12, family="Arial"),
+                    title_font_size=16
+                ))
         else:
             text("📊 *Insufficient data available for box plot visualization*")
-            
+
     else:  # Histogram
         text("#### 📈 **Score Frequency Distribution**")
         text("*Histogram showing the distribution of overall scores across regions*")
         text("")
-        
-        plot_data = filtered_data.copy()
-        plot_data['Overall SCORE'] = pd.to_numeric(plot_data['Overall SCORE'], errors='coerce')
-        plot_data = plot_data.dropna(subset=['Overall SCORE'])
-        
-        if len(plot_data) > 0:
-            fig1 = px.histogram(plot_data, 
+
+        plot_rows = selection.dropna(['Overall SCORE'])
+
+        if len(plot_rows) > 0:
+            cached_plotly("overall_score_histogram", plot_rows, lambda: px.histogram(plot_rows.to_frame(['Region', 'Overall SCORE']), 
                                x="Overall SCORE", 
                                color="Region",
                                title="📈 Overall Score Distribution Across Global Regions",
                                labels={"Overall SCORE": "Overall Score", "count": "Number of Universities"},
-                               nbins=20)
-            fig1.update_layout(
-                plot_bgcolor='rgba(240,248,255,0.8)',
-                paper_bgcolor='rgba(255,255,255,0.9)',
-                font=dict(size=12, family="Arial"),
-                title_font_size=16
-            )
-            plotly(fig1)
+                               nbins=20),
+                layout=dict(
+                    plot_bgcolor='rgba(240,248,255,0.8)',
+                    paper_bgcolor='rgba(255,255,255,0.9)',
+                    font=dict(size=12, family="Arial"),
+                    title_font_size=16
+                ))
         else:
             text("📊 *No data available for histogram visualization*")
 
+if result_count > 0:
+    sections.run("chart", render_chart, filtered_data, filter_criteria, chart_type)
 else:
     text("🔍 **No Visualization Data Available**")
     text("*Please adjust your search and filter criteria to generate charts and analytics*")
@@ -431,52 +515,64 @@ text("---")
 text("")
 
 # Premium Additional Visualizations with Enhanced Styling
-if result_count > 0:
-    text("### 🏆 **Elite Performers Spotlight**")
-    text("#### 🌟 *Showcasing the Highest-Achieving Institutions*")
-    text("")
-    text("*Highlighting the most exceptional universities from your filtered selection*")
-    text("")
-    
-    top_20_data = filtered_data.copy()
-    top_20_data['Overall SCORE'] = pd.to_numeric(top_20_data['Overall SCORE'], errors='coerce')
-    top_20_data = top_20_data.dropna(subset=['Overall SCORE']).head(20)
-    
-    if len(top_20_data) > 0:
-        text(f"**📊 Displaying Top {len(top_20_data)} Universities from Your Selection**")
+# Top performers are a true top-k by the chosen score (partial sort, ties in ranking order),
+# not the first rows of the selection
+ranking_options = {
+    "📊 Overall Score": ("Overall SCORE", "Overall Performance Score"),
+    "🎓 Academic Reputation": ("AR SCORE", "Academic Reputation Score"),
+    "💼 Employer Reputation": ("ER SCORE", "Employer Reputation Score"),
+    "📚 Citations per Faculty": ("CPF SCORE", "Citations per Faculty Score"),
+    "👩‍🏫 Faculty Student Ratio": ("FSR SCORE", "Faculty Student Ratio Score"),
+    "🤝 International Research Network": ("IRN SCORE", "International Research Network Score"),
+    "🎯 Employment Outcomes": ("EO SCORE", "Employment Outcomes Score"),
+    "🌱 Sustainability": ("SUS SCORE", "Sustainability Score"),
+}
+
+def render_elite_performers(selection, ranking_choice, per_region):
+    ranking_column, ranking_label = ranking_options[ranking_choice]
+    if per_region:
+        top_20_rows = top_k_per_group(selection, 5, 'Region', by=ranking_column, then_by=[('Overall SCORE', True)])
+        top_title = f"🏅 Top 5 Universities per Region by {ranking_label}"
+    else:
+        top_20_rows = top_k(selection, 20, by=ranking_column, then_by=[('Overall SCORE', True)])
+        top_title = f"🏅 Top {len(top_20_rows)} University Champions - Performance Rankings"
+
+    if len(top_20_rows) > 0:
+        text(f"**📊 Displaying Top {len(top_20_rows)} Universities from Your Selection**")
         text("")
-        
-        fig2 = px.bar(top_20_data, 
+
+        cached_plotly(f"top_performers_bar:{ranking_column}:{'per_region' if per_region else 'overall'}", top_20_rows, lambda: px.bar(top_20_rows.to_frame(['Institution Name', 'Region', ranking_column]), 
                       x="Institution Name", 
-                      y="Overall SCORE",
+                      y=ranking_column,
                       color="Region",
-                      title=f"🏅 Top {len(top_20_data)} University Champions - Performance Rankings",
-                      labels={"Overall SCORE": "Overall Performance Score", "Institution Name": "University"})
-        fig2.update_layout(
-            xaxis_tickangle=45,
-            plot_bgcolor='rgba(240,248,255,0.8)',
-            paper_bgcolor='rgba(255,255,255,0.9)',
-            font=dict(size=12, family="Arial"),
-            title_font_size=16,
-            height=550,
-            margin=dict(b=150)  # Extra bottom margin for rotated labels
-        )
-        plotly(fig2)
+                      title=top_title,
+                      labels={ranking_column: ranking_label, "Institution Name": "University"}),
+            layout=dict(
+                xaxis_tickangle=45,
+                plot_bgcolor='rgba(240,248,255,0.8)',
+                paper_bgcolor='rgba(255,255,255,0.9)',
+                font=dict(size=12, family="Arial"),
+                title_font_size=16,
+                height=550,
+                margin=dict(b=150)  # Extra bottom margin for rotated labels
+            ))
         text("")
-        
+
         text("### 🔬 **Research Excellence Analysis**")
         text("#### 📊 *Research Output vs Employment Success Correlation*")
         text("")
         text("*Analyzing the relationship between research performance and employment outcomes*")
         text("")
-        
-        research_data = filtered_data.copy()
-        research_data['Overall SCORE'] = pd.to_numeric(research_data['Overall SCORE'], errors='coerce')
-        research_data['EO SCORE'] = pd.to_numeric(research_data['EO SCORE'], errors='coerce')
-        research_data = research_data.dropna(subset=['Overall SCORE', 'EO SCORE'])
-        
-        if len(research_data) > 0:
-            fig3 = px.scatter(research_data,
+
+        research_rows = selection.dropna(['Overall SCORE', 'EO SCORE'])
+
+        if len(research_rows) > 0:
+            shown_rows = downsample(research_rows, "Research", "Overall SCORE", chart_config["max_points"])
+            if len(shown_rows) < len(research_rows):
+                text(f"*Showing {len(shown_rows):,} of {len(research_rows):,} universities - dense areas are thinned, outliers are kept*")
+            cached_plotly("research_bubble", shown_rows, lambda: px.scatter(
+                             shown_rows.to_frame(['Institution Name', 'Country/Territory', 'Region', 'Status', 'Research', 'Overall SCORE', 'EO SCORE']),
+                             render_mode=render_mode(len(shown_rows), chart_config["webgl_threshold"]),
                              x="Research",
                              y="Overall SCORE",
                              size="EO SCORE",
@@ -484,20 +580,127 @@ if result_count > 0:
                              hover_name="Institution Name",
                              hover_data=["Country/Territory", "Status"],
                              title="🎓 Research Excellence vs Overall Performance Analysis",
-                             labels={"Overall SCORE": "Overall Performance Score", "Research": "Research Level", "EO SCORE": "Employment Outcomes Score"})
-            fig3.update_layout(
-                plot_bgcolor='rgba(240,248,255,0.8)',
-                paper_bgcolor='rgba(255,255,255,0.9)',
-                font=dict(size=12, family="Arial"),
-                title_font_size=16
-            )
-            plotly(fig3)
+                             labels={"Overall SCORE": "Overall Performance Score", "Research": "Research Level", "EO SCORE": "Employment Outcomes Score"}),
+                layout=dict(
+                    plot_bgcolor='rgba(240,248,255,0.8)',
+                    paper_bgcolor='rgba(255,255,255,0.9)',
+                    font=dict(size=12, family="Arial"),
+                    title_font_size=16
+                ))
         else:
             text("📊 *Insufficient data available for comprehensive research analysis*")
     else:
         text("📊 *No universities available for elite performers analysis*")
         text("💡 *Try expanding your search criteria to see top performers*")
 
+if result_count > 0:
+    text("### 🏆 **Elite Performers Spotlight**")
+    text("#### 🌟 *Showcasing the Highest-Achieving Institutions*")
+    text("")
+    text("*Highlighting the most exceptional universities from your filtered selection*")
+    text("")
+    ranking_choice = selectbox("🏅 Rank Top Performers By", options=list(ranking_options), default="📊 Overall Score")
+    per_region = checkbox("🌍 Show Top 5 per Region", default=False)
+    text("")
+    sections.run("elite_performers", render_elite_performers, filtered_data, ranking_choice, per_region)
+
+text("")
+text("---")
+text("")
+
+# Nearest-neighbour search over the score indicators
+text("## 🧭 **Find Similar Universities**")
+text("### 🔗 *Institutions With the Most Alike Indicator Profiles*")
+text("")
+text("*Pick a reference university to find the institutions whose indicator scores are closest to it*")
+text("")
+
+similarity_presets = {
+    "⚖️ All Indicators Equally": None,
+    "🔬 Research & Reputation": {"AR SCORE": 3, "CPF SCORE": 3, "FSR SCORE": 2, "ER SCORE": 1, "IRN SCORE": 1},
+    "💼 Employability": {"ER SCORE": 3, "EO SCORE": 3, "AR SCORE": 1},
+    "🌍 International Outlook": {"IFR SCORE": 2, "ISR SCORE": 2, "ISD SCORE": 1, "IRN SCORE": 2},
+    "🌱 Sustainability": {"SUS SCORE": 3, "AR SCORE": 1, "ER SCORE": 1},
+}
+reference_name = text_input("🏛️ Reference University", placeholder="Type a university name, e.g. 'Imperial' or 'Melbourne'...")
+similarity_preset = selectbox("⚖️ Compare On", options=list(similarity_presets), default="⚖️ All Indicators Equally")
+similar_count = int(slider("🔢 Similar Universities to Show", min_val=5, max_val=50, step=5, default=10))
+similar_within_filters = checkbox("🎯 Only Search Within My Filters", default=False)
+text("")
+
+def render_similar_universities(reference_row, preset, k, candidates):
+    similar_rows, distances = similarity_index(df).similar(reference_row, k, weights=similarity_presets[preset], candidates=candidates)
+    text(f"**🎯 Reference:** `{df['Institution Name'].iloc[reference_row]}` ({df['Country/Territory'].iloc[reference_row]})")
+    text("")
+    if len(similar_rows) > 0:
+        similar_df = similar_rows.to_frame(['Institution Name', 'Country/Territory', 'Region', *score_columns])
+        similar_df.insert(1, 'Similarity %', (100 * (1 - distances)).round(1))
+        table(display_frame(similar_df), title=f"🔗 {len(similar_rows)} Universities Most Like {df['Institution Name'].iloc[reference_row]}")
+    else:
+        text("📊 *No comparable universities found - try searching outside your filters*")
+
+if reference_name.strip():
+    reference_scores = search_index(df).scores(reference_name)
+    if reference_scores is not None and reference_scores.max() > 0:
+        # Best-matching institution; equally relevant matches resolve to the first in ranking order
+        reference_row = int(reference_scores.argmax())
+        sections.run("similar_universities", render_similar_universities, reference_row, similarity_preset, similar_count,
+                     filtered_data if similar_within_filters else None)
+    else:
+        text(f"🔍 *No university matches '{reference_name}' - check the spelling or try part of the name*")
+else:
+    text("💡 *Enter a university name above to see its closest peers*")
+
+text("")
+text("---")
+text("")
+
+# Year-over-year movement, joined across stored editions by institution ID
+text("## 📈 **Rank Movement & Trends**")
+text("### 🧗 *Biggest Climbers, Fallers and Indicator Trends Across Editions*")
+text("")
+
+movers_count = int(slider("🔢 Movers to Show", min_val=5, max_val=25, step=5, default=10))
+text("")
+
+# The movement is taken from the store together with df (one per df, like the section cache), so its
+# rows line up with df's even if the store has since ingested something newer. The store version is
+# part of the section's inputs, so the per-edition trends re-render when an edition or update is ingested
+def render_rank_movement(selection, k, store_version):
+    moved = Selection(movement, selection.rows)
+    change = moved.column('Rank Change')
+    compared = movement.attrs.get("previous_edition")
+    compared_with = f"the stored {compared} edition" if compared is not None else "each institution's published previous rank"
+    text(f"*{edition} ranks compared with {compared_with}. Movement is shown for exactly ranked institutions only - banded ranks such as 701-750 are left out*")
+    text("")
+    climbed = (change > 0).to_numpy(dtype=bool, na_value=False)
+    fell = (change < 0).to_numpy(dtype=bool, na_value=False)
+    text(f"**⬆️ Climbed:** {climbed.sum():,} | **⬇️ Fell:** {fell.sum():,} | **➡️ Unchanged:** {int((change == 0).sum()):,} | **🆕 New Entries:** {int(moved.column('New Entry').sum()):,}")
+    text("")
+
+    movement_columns = ['Rank', 'Previous Rank', 'Rank Change', 'Institution Name', 'Country/Territory', 'Region']
+    climbers = top_k(moved.where(climbed), k, by='Rank Change', then_by=[('Rank', False)])
+    if len(climbers) > 0:
+        table(display_frame(climbers.to_frame(movement_columns)), title=f"🧗 {len(climbers)} Biggest Climbers")
+    fallers = top_k(moved.where(fell), k, by='Rank Change', descending=False, then_by=[('Rank', False)])
+    if len(fallers) > 0:
+        table(display_frame(fallers.to_frame(movement_columns)), title=f"📉 {len(fallers)} Biggest Fallers")
+
+    trends = rankings_history.trends(movement['Institution ID'].to_numpy()[selection.rows])
+    table(trends.round(1), title=f"📈 Average Indicator Scores per Edition ({len(rankings_history.editions)} stored)")
+    if len(rankings_history.editions) < 2:
+        text("💡 *Place earlier editions' files in the store's editions directory to see indicator trends over time*")
+
+movement = rank_movement(df, "sample_csv") if rankings_history is not None else None
+if rankings_history is None:
+    text("💡 *Set `store_dir` for the data source in preswald.toml to track rank movement across editions*")
+elif movement is None:
+    text("🔄 *The rankings data is being reloaded - rank movement will show on the next update*")
+elif result_count > 0:
+    sections.run("rank_movement", render_rank_movement, filtered_data, movers_count, rankings_history.version)
+else:
+    text("📊 *No universities match your filters - adjust them to see rank movement*")
+
 text("")
 text("---")
 text("")
@@ -512,8 +715,14 @@ text("")
 text("#### 📄 **Export Configuration**")
 text("*Choose your preferred file format for data export*")
 text("")
+export_formats = {
+    "📄 CSV (Excel Compatible)": "csv",
+    "📋 JSON Lines (Data Format)": "jsonl",
+    "📊 Excel (Advanced Workbook)": "xlsx",
+    "🧱 Parquet (Analytics)": "parquet",
+}
 export_format = selectbox("� Export Format Selection", 
-                         options=["📄 CSV (Excel Compatible)", "📋 JSON (Data Format)", "📊 Excel (Advanced Workbook)"], 
+                         options=list(export_formats), 
                          default="📄 CSV (Excel Compatible)")
 text("")
 
@@ -521,13 +730,21 @@ export_pressed = button("📥 Download Filtered Dataset")
 text("")
 
 if export_pressed:
-    format_name = export_format.split(" ")[1].replace("(", "").replace(")", "")
-    text(f"📁 **Export Successfully Initiated!**")
-    text("")
-    text(f"✅ Your selection of **{result_count} universities** is being prepared for download in **{format_name}** format.")
-    text("")
-    text("💡 *Note: In a production environment, this would automatically download your file*")
-    text("")
+    format_name = export_format.split(" (")[0].split(" ", 1)[1]
+    # Rows are streamed from the filtered selection in batches into a file under the served images/ directory
+    try:
+        export_path = export_selection(filtered_data, export_formats.get(export_format, "csv"), EXPORT_DIR)
+    except ImportError as e:
+        text(f"⚠️ **{format_name} export is unavailable** - install `{e.name}` on the server to enable it")
+        text("")
+    else:
+        export_name = os.path.basename(export_path)
+        text(f"📁 **Export Ready!**")
+        text("")
+        text(f"✅ Your selection of **{result_count} universities** has been exported in **{format_name}** format.")
+        text("")
+        text(f"📥 [Download {export_name}](/images/exports/{export_name})")
+        text("")
 
 text("### 🔧 **Quick Action Panel**")
 text("*Convenient shortcuts for common operations*")
@@ -548,9 +765,37 @@ if reset_action:
 if report_action:
     text("📊 **Executive Summary Generated!**")
     text("")
-    text("✅ A comprehensive analytical report has been prepared")
-    text("📈 Summary includes key metrics, trends, and insights")
-    text("")
+    # Answered from the aggregation cube; search and score filters get a cube over just the filtered rows
+    summary_filter = AggregationCube.where_from_criteria(filter_criteria)
+    summary_cube = cube if summary_filter is not None else AggregationCube.from_selection(filtered_data)
+    if summary_cube.row_count(summary_filter) == 0:
+        text("🔍 *No universities match your current filters - widen them to generate a summary*")
+        text("")
+    else:
+        overall = summary_cube.aggregate('Overall SCORE', summary_filter, quantiles=(0.25, 0.5, 0.75)).iloc[0]
+        summary_top_row = summary_cube.top('Overall SCORE', summary_filter)
+        text(f"🎓 **Universities in Scope:** `{int(overall['rows']):,}` (`{int(overall['count']):,}` with an overall score)")
+        if summary_top_row is not None:
+            # Quantiles come from the cube's half-point score histograms, so they are approximate
+            text(f"📊 **Overall Score:** average `{overall['mean']:.1f}`, median ≈ `{overall['q50']:.1f}`, middle half ≈ `{overall['q25']:.1f}`-`{overall['q75']:.1f}`")
+            text(f"🏆 **Top Institution:** `{df['Institution Name'].iloc[summary_top_row]}` with `{overall['max']:.1f}/100`")
+        text("")
+
+        regional = summary_cube.aggregate('Overall SCORE', summary_filter, by='Region', quantiles=(0.5,))
+        for column, label in [('AR SCORE', 'Avg Academic Reputation'), ('ER SCORE', 'Avg Employer Reputation')]:
+            regional[label] = summary_cube.aggregate(column, summary_filter, by='Region', quantiles=())['mean'].to_numpy()
+        scored_regions = regional.dropna(subset=['mean'])
+        if len(scored_regions) > 0:
+            leader = scored_regions.loc[scored_regions['mean'].idxmax()]
+            text(f"🌍 **Strongest Region:** `{leader['Region']}` with an average overall score of `{leader['mean']:.1f}`")
+            text("")
+        regional = regional.rename(columns={'rows': 'Universities', 'mean': 'Avg Overall', 'q50': 'Median Overall (approx.)', 'max': 'Best Overall'})
+        table(
+            regional[['Region', 'Universities', 'Avg Overall', 'Median Overall (approx.)', 'Best Overall', 'Avg Academic Reputation', 'Avg Employer Reputation']].round(1),
+            title="🌍 Executive Summary - Regional Comparison",
+        )
+        text("*Medians are estimated from score histograms and are accurate to about half a point*")
+        text("")
 
 text("---")
 text("")
@@ -586,3 +831,5 @@ text("")
 text("📊 **Data Source:** Global university rankings with comprehensive performance metrics")
 text("")
 text("*Empowering informed decisions in higher education through data-driven insights*")
+
+profile.end_rerun()
@@ -0,0 +1,29 @@
+"""
+Data layer for the University Rankings Analytics Dashboard (hello.py).
+
+Everything here lives in an importable module rather than in the script so
+that loaded data and caches survive preswald reruns, which re-execute
+hello.py with fresh globals on every interaction.
+"""
+
+from .bundle import build_bundle
+from .cube import DIMENSIONS, AggregationCube, aggregation_cube
+from .export import EXPORT_FORMATS, csv_chunks, export_selection, iter_batches, jsonl_chunks, write_excel, write_parquet
+from .figures import FigureCache, cached_plotly, compact_figure, figure_cache, lazy_import
+from .filters import FilterEngine, filter_engine
+from .ingest import CATEGORY_COLUMNS, SCORE_COLUMNS, SUMMARY_COLUMNS, display_frame, load_source
+from .paging import DEFAULT_PAGE_SIZE, Page, page_count, paginate, sorted_selection
+from .profiling import DEFAULT_PROFILING_CONFIG, Profiler, profiler, read_profiling_config
+from .registry import FrameRegistry
+from .reruns import DEFAULT_RERUN_CONFIG, RerunScheduler, read_rerun_config, rerun_scheduler
+from .sampling import DEFAULT_CHART_CONFIG, downsample, read_chart_config, render_mode
+from .score_index import ScoreIndex, score_index
+from .search import SearchIndex, search_index
+from .sections import SectionCache, section_cache
+from .selection import Selection
+from .similarity import SIMILARITY_COLUMNS, SimilarityIndex, find_similar, similarity_index
+from .snapshot import read_snapshot, warm_start, write_snapshot
+from .sql import build_query
+from .store import RankingsStore, edition_year, load_rankings, rank_movement, rankings_store
+from .topk import top_k, top_k_per_group
+from .watch import SourceWatcher, load_watched, source_watcher
@@ -0,0 +1,169 @@
+"""
+Compact static HTML export of the dashboard.
+
+    python -m rankings.bundle                    # into preswald_export/
+    python -m rankings.bundle --chunk-rows 20000 path/to/export
+
+`preswald export --format html` snapshots every file under the project
+directory into one project_fs.json - data files included, as base64 when
+they are not UTF-8 - and the browser downloads and parses all of it before
+the dashboard starts. This builds the same export from only the files the
+app runs on (the script, preswald.toml, this package and the branding
+images), with each CSV data source stored as typed Parquet chunks beside
+project_fs.json instead of inside it. Chunks are named by the hash of their
+content, so HTTP caches keep them across exports and unchanged chunks are
+never downloaded again. project_fs.json carries a small manifest per
+source, and the dashboard's browser worker fetches the chunks when the
+script first loads the source (see `ingest.load_chunks()`), so the page
+itself starts in the same time however large the data is.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+import toml
+
+from .ingest import read_csv_typed
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = "preswald_export"
+DEFAULT_CHUNK_ROWS = 100_000
+# Chunk files, relative to the export directory
+CHUNKS_DIR = "data"
+MANIFEST_FORMAT = 1
+
+# Source settings for a server with a writable project directory: the rankings store, the file
+# watcher and warm-start snapshots have nothing to work on in the browser
+SERVER_ONLY_KEYS = ["store_dir", "editions_dir", "updates_dir", "watch", "watch_interval", "snapshot"]
+
+
+def write_chunks(df: pd.DataFrame, directory: str, prefix: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> list[dict]:
+    """Write `df` as Parquet files of `chunk_rows` rows named by content hash; returns their manifest entries."""
+    os.makedirs(directory, exist_ok=True)
+    chunks = []
+    for start in range(0, max(len(df), 1), chunk_rows):
+        buffer = io.BytesIO()
+        # zstd: a fifth smaller than the default snappy, and both pyarrow and DuckDB read it
+        df.iloc[start:start + chunk_rows].to_parquet(buffer, index=False, compression="zstd")
+        data = buffer.getvalue()
+        name = f"{prefix}-{hashlib.sha256(data).hexdigest()[:20]}.parquet"
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        chunks.append({"file": f"{CHUNKS_DIR}/{name}", "rows": min(chunk_rows, len(df) - start), "bytes": len(data)})
+    return chunks
+
+
+def chunk_manifest(df: pd.DataFrame, chunks: list[dict]) -> dict:
+    """What `ingest.load_chunks()` needs to fetch the chunks and restore the typed schema."""
+    dtypes = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtypes[col] = {"categories": dtype.categories.tolist()}
+        elif dtype.kind in "iufb":
+            dtypes[col] = str(dtype)
+    names = "".join(chunk["file"] for chunk in chunks)
+    return {
+        "format": MANIFEST_FORMAT,
+        "rows": len(df),
+        "columns": [str(col) for col in df.columns],
+        "dtypes": dtypes,
+        "chunks": chunks,
+        "checksum": hashlib.sha256(names.encode()).hexdigest(),
+    }
+
+
+def _stage(script: str, config: dict, staging: str) -> None:
+    """Copy the files the app runs on into `staging`."""
+    shutil.copy(script, os.path.join(staging, os.path.basename(script)))
+    package = os.path.dirname(os.path.abspath(__file__))
+    os.makedirs(os.path.join(staging, "rankings"))
+    for name in sorted(os.listdir(package)):
+        if name.endswith(".py"):
+            shutil.copy(os.path.join(package, name), os.path.join(staging, "rankings", name))
+    for key in ("logo", "favicon"):
+        image = config.get("branding", {}).get(key)
+        if image and os.path.isfile(image):
+            os.makedirs(os.path.join(staging, os.path.dirname(image)), exist_ok=True)
+            shutil.copy(image, os.path.join(staging, image))
+
+
+def build_bundle(
+    output_dir: str = DEFAULT_OUTPUT_DIR,
+    script: str = "hello.py",
+    config_path: str = "preswald.toml",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> dict:
+    """
+    Export the dashboard as a static site in `output_dir`. Returns the size
+    in bytes of project_fs.json and of each source's chunks.
+    """
+    from preswald.utils import prepare_html_export
+
+    config = toml.load(config_path)
+    chunks_dir = os.path.join(output_dir, CHUNKS_DIR)
+    sizes = {}
+    kept = set()
+    with tempfile.TemporaryDirectory() as staging:
+        _stage(script, config, staging)
+        for name, source in config.get("data", {}).items():
+            if source.get("type", "csv") != "csv" or "path" not in source:
+                continue
+            for key in SERVER_ONLY_KEYS:
+                source.pop(key, None)
+            # Untyped sources are skipped by preswald's data manager, which would otherwise look for the
+            # CSV on every rerun; `load_source()` defaults to csv and registers the chunks for query()
+            source.pop("type", None)
+            df = read_csv_typed(source["path"])
+            chunks = write_chunks(df, chunks_dir, name, chunk_rows)
+            kept.update(os.path.basename(chunk["file"]) for chunk in chunks)
+            manifest = os.path.join(CHUNKS_DIR, f"{name}.chunks.json")
+            os.makedirs(os.path.join(staging, CHUNKS_DIR), exist_ok=True)
+            with open(os.path.join(staging, manifest), "w", encoding="utf-8") as f:
+                json.dump(chunk_manifest(df, chunks), f)
+            source["chunks"] = manifest
+            sizes[name] = sum(chunk["bytes"] for chunk in chunks)
+            logger.info(f"[bundle] {name}: {len(df)} rows in {len(chunks)} chunks ({sizes[name]:,} bytes)")
+        with open(os.path.join(staging, "preswald.toml"), "w", encoding="utf-8") as f:
+            toml.dump(config, f)
+
+        prepare_html_export(os.path.join(staging, os.path.basename(script)), os.path.abspath(output_dir), staging)
+
+    # Chunks of earlier exports that no manifest refers to any more
+    for name in os.listdir(chunks_dir) if os.path.isdir(chunks_dir) else []:
+        if name.endswith(".parquet") and name not in kept:
+            os.remove(os.path.join(chunks_dir, name))
+    sizes["project_fs.json"] = os.path.getsize(os.path.join(output_dir, "project_fs.json"))
+    return sizes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the dashboard as a static site with chunked data sources")
+    parser.add_argument("output_dir", nargs="?", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--script", default="hello.py")
+    parser.add_argument("--config", default="preswald.toml")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="rows per data chunk")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sizes = build_bundle(args.output_dir, args.script, args.config, args.chunk_rows)
+    for name, size in sizes.items():
+        print(f"{name:<24} {size:>12,} bytes")
+    print(f"Serve {args.output_dir}/ over HTTP, e.g. python -m http.server -d {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""
+Aggregation cube over the categorical dimensions of the rankings.
+
+Rows are grouped once into cells - one per observed Region x Country x
+Size x Focus x Status combination - and every score column gets a count,
+sum, min, max, the row holding the max, and a fixed-bin histogram as a
+mergeable quantile sketch. Summaries over any dimension filter are then
+reductions over a few hundred cells instead of the raw rows, and when a
+reloaded source only appends rows, a cube over those rows is merged into
+the existing one (see `extend_cube()`).
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .ingest import SCORE_COLUMNS
+from .registry import FrameRegistry
+from .selection import Selection
+
+
+DIMENSIONS = ["Region", "Country/Territory", "Size", "Focus", "Status"]
+
+# Filter-engine criteria the cube can answer, and the dimension each one constrains
+CRITERIA_DIMENSIONS = {
+    "region": "Region",
+    "country": "Country/Territory",
+    "size": "Size",
+    "focus": "Focus",
+    "status": "Status",
+}
+
+# Quantile sketch: score histograms over [0, 100] in half-point bins
+SKETCH_RANGE = (0.0, 100.0)
+SKETCH_BINS = 200
+
+
+def _cell_ids(keys: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Cell id of each key row (in dimension sort order) and the first row of each cell."""
+    ids = keys.groupby(list(keys.columns), observed=True, dropna=False, sort=True).ngroup().to_numpy()
+    _, first = np.unique(ids, return_index=True)
+    return ids, first
+
+
+class AggregationCube:
+    """Per-cell score aggregates for one base frame (or rows appended to it)."""
+
+    def __init__(
+        self,
+        keys: pd.DataFrame,
+        rows: np.ndarray,
+        count: np.ndarray,
+        total: np.ndarray,
+        low: np.ndarray,
+        high: np.ndarray,
+        top_row: np.ndarray,
+        sketch: np.ndarray,
+        columns: list[str],
+    ):
+        self.keys = keys  # one row of dimension values per cell
+        self.rows = rows  # rows per cell
+        # Per cell and score column; min/max are NaN and top_row -1 for cells without scores
+        self.count = count
+        self.total = total
+        self.low = low
+        self.high = high
+        self.top_row = top_row
+        self.sketch = sketch  # histogram per cell, column and bin
+        self.columns = list(columns)
+        self._column_index = {col: i for i, col in enumerate(self.columns)}
+        # Integer codes of each dimension's cell values, so filters compare small int arrays
+        self._codes = {}
+        for dim in keys.columns:
+            codes, uniques = pd.factorize(keys[dim])
+            self._codes[dim] = (codes, {value: code for code, value in enumerate(uniques)})
+
+    @classmethod
+    def build(
+        cls,
+        frame: pd.DataFrame,
+        columns: list[str] | None = None,
+        dimensions: list[str] | None = None,
+        positions: np.ndarray | None = None,
+    ) -> "AggregationCube":
+        """
+        Aggregate `frame`. `positions` are the base-frame row positions of its
+        rows (default 0..n-1), used to report the top row of each cell.
+        """
+        columns = SCORE_COLUMNS if columns is None else columns
+        dimensions = DIMENSIONS if dimensions is None else dimensions
+        positions = np.arange(len(frame)) if positions is None else np.asarray(positions, dtype=np.int64)
+
+        ids, first = _cell_ids(frame[dimensions])
+        keys = frame[dimensions].iloc[first].reset_index(drop=True)
+        cells = len(first)
+
+        shape = (cells, len(columns))
+        count = np.zeros(shape, dtype=np.int64)
+        total = np.zeros(shape, dtype=np.float64)
+        low = np.full(shape, np.nan)
+        high = np.full(shape, np.nan)
+        top_row = np.full(shape, -1, dtype=np.int64)
+        sketch = np.zeros((cells, len(columns), SKETCH_BINS), dtype=np.uint32)
+
+        bin_width = (SKETCH_RANGE[1] - SKETCH_RANGE[0]) / SKETCH_BINS
+        for j, col in enumerate(columns):
+            values = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = ~np.isnan(values)
+            cell, value, position = ids[valid], values[valid], positions[valid]
+            count[:, j] = np.bincount(cell, minlength=cells)
+            total[:, j] = np.bincount(cell, weights=value, minlength=cells)
+
+            # fmin/fmax skip the NaN fill, so cells without scores stay NaN
+            np.fmin.at(low[:, j], cell, value)
+            np.fmax.at(high[:, j], cell, value)
+
+            # The first row (in base order) holding each cell's maximum, like idxmax()
+            at_max = value == high[cell, j]
+            first_top = np.full(cells, np.iinfo(np.int64).max)
+            np.minimum.at(first_top, cell[at_max], position[at_max])
+            top_row[count[:, j] > 0, j] = first_top[count[:, j] > 0]
+
+            bins = np.clip(((value - SKETCH_RANGE[0]) / bin_width).astype(np.int64), 0, SKETCH_BINS - 1)
+            sketch[:, j, :] = np.bincount(cell * SKETCH_BINS + bins, minlength=cells * SKETCH_BINS).reshape(cells, SKETCH_BINS)
+
+        return cls(keys, np.bincount(ids, minlength=cells), count, total, low, high, top_row, sketch, columns)
+
+    @classmethod
+    def from_selection(cls, selection: Selection, columns: list[str] | None = None) -> "AggregationCube":
+        """A cube over just the rows of a selection, for filters the full cube cannot express."""
+        columns = SCORE_COLUMNS if columns is None else columns
+        return cls.build(selection.to_frame([*DIMENSIONS, *columns]), columns, positions=selection.rows)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        return f"AggregationCube({len(self)} cells, {int(self.rows.sum())} rows)"
+
+    def merge(self, other: "AggregationCube") -> "AggregationCube":
+        """Combine with a cube over other rows (positions already offset into the same base)."""
+        if other.columns != self.columns or list(other.keys.columns) != list(self.keys.columns):
+            raise ValueError("Only cubes over the same dimensions and score columns can be merged")
+
+        keys = pd.DataFrame(
+            {
+                dim: union_categoricals([self.keys[dim], other.keys[dim]], ignore_order=True)
+                if isinstance(self.keys[dim].dtype, pd.CategoricalDtype) and isinstance(other.keys[dim].dtype, pd.CategoricalDtype)
+                else pd.concat([self.keys[dim], other.keys[dim]], ignore_index=True)
+                for dim in self.keys.columns
+            }
+        )
+        ids, first = _cell_ids(keys)
+        cells = len(first)
+
+        def add(a, b, dtype):
+            out = np.zeros((cells, *a.shape[1:]), dtype=dtype)
+            np.add.at(out, ids, np.concatenate([a, b]))
+            return out
+
+        def extreme(a, b, ufunc):
+            out = np.full((cells, a.shape[1]), np.nan)
+            ufunc.at(out, ids, np.concatenate([a, b]))
+            return out
+
+        high = extreme(self.high, other.high, np.fmax)
+        # Top row: the earliest row among the merged cells that reached the new maximum
+        candidates = np.where(np.concatenate([self.high, other.high]) == high[ids], np.concatenate([self.top_row, other.top_row]), np.iinfo(np.int64).max)
+        top_row = np.full((cells, len(self.columns)), np.iinfo(np.int64).max)
+        np.minimum.at(top_row, ids, candidates)
+        top_row[np.isnan(high)] = -1
+
+        return AggregationCube(
+            keys.iloc[first].reset_index(drop=True),
+            add(self.rows, other.rows, np.int64),
+            add(self.count, other.count, np.int64),
+            add(self.total, other.total, np.float64),
+            extreme(self.low, other.low, np.fmin),
+            high,
+            top_row,
+            add(self.sketch, other.sketch, np.uint32),
+            self.columns,
+        )
+
+    def append(self, frame: pd.DataFrame, offset: int) -> "AggregationCube":
+        """The cube after appending `frame` as base rows `offset`, `offset + 1`, ..."""
+        return self.merge(
+            AggregationCube.build(frame, self.columns, list(self.keys.columns), positions=np.arange(offset, offset + len(frame)))
+        )
+
+    @staticmethod
+    def where_from_criteria(criteria: dict) -> dict | None:
+        """
+        The cube filter for filter-engine criteria, or None when some active
+        criterion (search, score thresholds) is not a cube dimension.
+        """
+        where = {}
+        for name, value in criteria.items():
+            if value is None:
+                continue
+            if name not in CRITERIA_DIMENSIONS:
+                return None
+            where[CRITERIA_DIMENSIONS[name]] = value
+        return where
+
+    def cells(self, where: dict | None = None) -> np.ndarray:
+        """Boolean mask of cells matching `where` ({dimension: value or tuple of values})."""
+        mask = np.ones(len(self), dtype=bool)
+        for dim, value in (where or {}).items():
+            codes, lookup = self._codes[dim]
+            values = value if isinstance(value, tuple | list | set) else [value]
+            mask &= np.isin(codes, [lookup[v] for v in values if v in lookup])
+        return mask
+
+    def _column(self, column: str) -> int:
+        try:
+            return self._column_index[column]
+        except KeyError:
+            raise KeyError(f"{column!r} is not aggregated in this cube") from None
+
+    def row_count(self, where: dict | None = None) -> int:
+        return int(self.rows[self.cells(where)].sum())
+
+    def mean(self, column: str, where: dict | None = None) -> float:
+        j, mask = self._column(column), self.cells(where)
+        count = self.count[mask, j].sum()
+        return float(self.total[mask, j].sum() / count) if count else float("nan")
+
+    def max(self, column: str, where: dict | None = None) -> float:
+        values = self.high[self.cells(where), self._column(column)]
+        return float(np.nanmax(values)) if not np.isnan(values).all() else float("nan")
+
+    def min(self, column: str, where: dict | None = None) -> float:
+        values = self.low[self.cells(where), self._column(column)]
+        return float(np.nanmin(values)) if not np.isnan(values).all() else float("nan")
+
+    def top(self, column: str, where: dict | None = None) -> int | None:
+        """Base row position of the highest `column` value (the first one on ties), or None."""
+        j, mask = self._column(column), self.cells(where)
+        high, rows = self.high[mask, j], self.top_row[mask, j]
+        if np.isnan(high).all():
+            return None
+        best = np.nanmax(high)
+        return int(rows[high == best].min())
+
+    def quantile(self, column: str, q: float, where: dict | None = None) -> float:
+        """Approximate quantile from the merged sketches (within one bin, clamped to min/max)."""
+        j, mask = self._column(column), self.cells(where)
+        return _sketch_quantiles(self.sketch[mask, j].sum(axis=0), [q], self.min(column, where), self.max(column, where))[0]
+
+    def aggregate(
+        self,
+        column: str,
+        where: dict | None = None,
+        by: str | None = None,
+        quantiles: tuple[float, ...] = (0.5,),
+    ) -> pd.DataFrame:
+        """
+        Count, mean, min, max and quantiles of `column` for the cells matching
+        `where`, one row per value of dimension `by` (observed values, in
+        category order, like `groupby(by, observed=True)`), or a single row.
+        """
+        j, mask = self._column(column), self.cells(where)
+        if by is None:
+            groups, labels = np.zeros(int(mask.sum()), dtype=np.int64), None
+            n = 1
+        else:
+            # Cells with a missing `by` value are left out, as groupby() does
+            mask &= self.keys[by].notna().to_numpy()
+            groups, labels = pd.factorize(self.keys[by][mask], sort=True)
+            n = len(labels)
+
+        count = np.bincount(groups, weights=self.count[mask, j], minlength=n).astype(np.int64)
+        low = np.full(n, np.nan)
+        high = np.full(n, np.nan)
+        np.fmin.at(low, groups, self.low[mask, j])
+        np.fmax.at(high, groups, self.high[mask, j])
+        sketch = np.zeros((n, SKETCH_BINS), dtype=np.int64)
+        np.add.at(sketch, groups, self.sketch[mask, j])
+
+        out = pd.DataFrame(
+            {
+                "rows": np.bincount(groups, weights=self.rows[mask], minlength=n).astype(np.int64),
+                "count": count,
+                "mean": np.divide(
+                    np.bincount(groups, weights=self.total[mask, j], minlength=n),
+                    count,
+                    out=np.full(n, np.nan),
+                    where=count > 0,
+                ),
+                "min": low,
+                "max": high,
+            }
+        )
+        for q in quantiles:
+            out[f"q{round(q * 100):02d}"] = [_sketch_quantiles(sketch[g], [q], low[g], high[g])[0] for g in range(n)]
+        if labels is not None:
+            out.insert(0, by, np.asarray(labels))
+        return out
+
+
+def _sketch_quantiles(hist: np.ndarray, qs: list[float], low: float, high: float) -> list[float]:
+    total = hist.sum()
+    if total == 0:
+        return [float("nan")] * len(qs)
+    bin_width = (SKETCH_RANGE[1] - SKETCH_RANGE[0]) / SKETCH_BINS
+    cumulative = np.cumsum(hist)
+    out = []
+    for q in qs:
+        target = q * total
+        b = int(np.searchsorted(cumulative, target, side="left"))
+        b = min(b, SKETCH_BINS - 1)
+        before = cumulative[b - 1] if b else 0
+        fraction = (target - before) / hist[b] if hist[b] else 0.0
+        value = SKETCH_RANGE[0] + (b + fraction) * bin_width
+        out.append(float(min(max(value, low), high)))
+    return out
+
+
+_cubes = FrameRegistry(AggregationCube.build)
+
+
+def aggregation_cube(base: pd.DataFrame) -> AggregationCube:
+    """The process-wide aggregation cube of a base frame, built on first use."""
+    return _cubes.get(base)
+
+
+def _same_values(a: pd.Series, b: pd.Series) -> bool:
+    a, b = a.reset_index(drop=True), b.reset_index(drop=True)
+    if isinstance(a.dtype, pd.CategoricalDtype) or isinstance(b.dtype, pd.CategoricalDtype):
+        # A reload can add categories, which makes equal values compare unequal as categoricals
+        a, b = a.astype(object), b.astype(object)
+    return a.equals(b)
+
+
+def extend_cube(base: pd.DataFrame, previous: pd.DataFrame) -> AggregationCube | None:
+    """
+    When `base` is `previous` with rows appended at the end, register the
+    cube of `base` as the cube of `previous` with just those rows merged in,
+    instead of aggregating every row again. Returns it, or None when `base`
+    changes any earlier row (then `aggregation_cube(base)` builds it).
+    """
+    if len(base) <= len(previous):
+        return None
+    cube = aggregation_cube(previous)
+    columns = [*cube.keys.columns, *cube.columns]
+    if any(col not in base.columns for col in columns):
+        return None
+    head = base.iloc[: len(previous)]
+    if not all(_same_values(head[col], previous[col]) for col in columns):
+        return None
+    extended = cube.append(base.iloc[len(previous):], len(previous))
+    _cubes.put(base, extended)
+    return extended
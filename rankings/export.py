@@ -0,0 +1,191 @@
+"""
+Streaming export of a row selection.
+
+Rows are read from the shared base frame in batches of selected positions,
+so an export never materializes the whole selection: CSV and JSON Lines are
+produced by chunk generators, Excel is written by xlsxwriter in constant
+memory mode and Parquet one row group per batch. `export_selection()` writes
+an export file next to the dashboard's served assets; the chunk generators
+can equally back a streaming HTTP response.
+"""
+
+import hashlib
+import logging
+import os
+from collections.abc import Iterator
+
+import numpy as np
+import pandas as pd
+
+from .ingest import show_rank_labels
+from .selection import Selection
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 10_000
+
+# Parquet compresses better with larger row groups, and batches stay columnar
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+# Excel's row limit per worksheet, including the header row
+EXCEL_MAX_ROWS = 1_048_576
+
+EXPORT_FORMATS = {
+    "csv": ".csv",
+    "jsonl": ".jsonl",
+    "xlsx": ".xlsx",
+    "parquet": ".parquet",
+}
+
+
+def _export_frame(batch: pd.DataFrame) -> pd.DataFrame:
+    # Ranks are exported as published ('701-750'), and float32 scores are widened and rounded so
+    # they export as 99.4, not 99.40000152587891
+    out = show_rank_labels(batch).copy(deep=False)
+    for col in out.columns:
+        if out[col].dtype == np.float32:
+            out[col] = out[col].astype("float64").round(4)
+    return out
+
+
+def iter_batches(
+    rows: Selection, columns: list[str] | None = None, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """The selected rows in selection order, `batch_size` rows at a time."""
+    for start in range(0, len(rows), batch_size):
+        yield Selection(rows.base, rows.rows[start : start + batch_size]).to_frame(columns)
+
+
+def csv_chunks(
+    rows: Selection, columns: list[str] | None = None, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[str]:
+    """CSV text for the selection: the header with the first chunk, then one chunk per batch."""
+    if rows.empty:
+        yield _export_frame(rows.to_frame(columns)).to_csv(index=False, lineterminator="\n")
+    for number, batch in enumerate(iter_batches(rows, columns, batch_size)):
+        yield _export_frame(batch).to_csv(index=False, header=number == 0, lineterminator="\n")
+
+
+def jsonl_chunks(
+    rows: Selection, columns: list[str] | None = None, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[str]:
+    """JSON Lines for the selection, one object per row, one chunk per batch."""
+    for batch in iter_batches(rows, columns, batch_size):
+        chunk = _export_frame(batch).to_json(orient="records", lines=True, force_ascii=False)
+        yield chunk if chunk.endswith("\n") else chunk + "\n"
+
+
+def write_excel(
+    rows: Selection, path: str, columns: list[str] | None = None, batch_size: int = DEFAULT_BATCH_SIZE
+) -> None:
+    """
+    Write the selection as an .xlsx workbook in constant memory. Selections
+    longer than Excel's row limit continue on further worksheets.
+    """
+    import xlsxwriter
+
+    header = list(_export_frame(rows.head(0).to_frame(columns)).columns)
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "nan_inf_to_errors": True})
+    try:
+        sheet, row_number = None, EXCEL_MAX_ROWS
+        for batch in iter_batches(rows, columns, batch_size):
+            frame = _export_frame(batch)
+            frame = frame.astype(object).where(frame.notna(), None)
+            for values in frame.itertuples(index=False, name=None):
+                if row_number == EXCEL_MAX_ROWS:
+                    sheet = workbook.add_worksheet()
+                    sheet.write_row(0, 0, header)
+                    row_number = 1
+                sheet.write_row(row_number, 0, values)
+                row_number += 1
+        if sheet is None:
+            workbook.add_worksheet().write_row(0, 0, header)
+    finally:
+        workbook.close()
+
+
+def write_parquet(
+    rows: Selection, path: str, columns: list[str] | None = None, batch_size: int = PARQUET_ROW_GROUP_SIZE
+) -> None:
+    """
+    Write the selection as Parquet, one row group per batch, keeping the
+    typed schema: numeric ranks alongside their label columns.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(rows.head(0).to_frame(columns), preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in iter_batches(rows, columns, batch_size):
+            writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+
+
+def _write_text(chunks: Iterator[str], path: str) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def export_selection(
+    rows: Selection,
+    fmt: str,
+    directory: str,
+    columns: list[str] | None = None,
+    name: str = "universities",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    keep: int = 20,
+) -> str:
+    """
+    Write the selection to `directory` in format `fmt` (see EXPORT_FORMATS)
+    and return the file path. Files are named by the selection fingerprint
+    and the checksum of the data it selects from (`rows.base.attrs`), so
+    exporting an unchanged selection of unchanged data again reuses the
+    existing file, while a reload or an update writes a new one. A frame
+    without a checksum is always written afresh. Only the `keep` most recent
+    exports are kept in the directory.
+
+    Raises ImportError if the format's writer (xlsxwriter, pyarrow) is not installed.
+    """
+    try:
+        extension = EXPORT_FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {sorted(EXPORT_FORMATS)}") from None
+
+    suffix = "" if columns is None else "-" + hashlib.blake2b("\0".join(columns).encode(), digest_size=4).hexdigest()
+    version = rows.base.attrs.get("checksum")
+    path = os.path.join(directory, f"{name}-{rows.fingerprint()[:16]}-{(version or 'unversioned')[:8]}{suffix}{extension}")
+    if version is not None and os.path.exists(path):
+        os.utime(path)
+        return path
+
+    # Write to a temporary file first so a download never sees a partial export
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        if fmt == "csv":
+            _write_text(csv_chunks(rows, columns, batch_size), tmp_path)
+        elif fmt == "jsonl":
+            _write_text(jsonl_chunks(rows, columns, batch_size), tmp_path)
+        elif fmt == "xlsx":
+            write_excel(rows, tmp_path, columns, batch_size)
+        else:
+            write_parquet(rows, tmp_path, columns)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    _prune(directory, keep)
+    logger.info(f"Exported {len(rows)} rows to {path}")
+    return path
+
+
+def _prune(directory: str, keep: int) -> None:
+    exports = [entry for entry in os.scandir(directory) if entry.is_file() and not entry.name.endswith(".tmp")]
+    exports.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in exports[keep:]:
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass
@@ -0,0 +1,183 @@
+"""
+Memoized Plotly figures.
+
+Building a chart with plotly.express and serializing it for the frontend
+costs far more than the filtering behind it. `cached_plotly()` renders a
+figure like preswald's `plotly()` component, but keeps the serialized
+figure JSON keyed by (chart kind, selected-row fingerprint, layout), so a
+repeated view - another session, or switching back to a chart type - is a
+dictionary lookup and a JSON decode. Figures are cached and sent without
+the template defaults they cannot use (`compact_figure()`). Since a cached
+view never builds a figure, `lazy_import()` lets the script defer importing
+plotly.express until the first one that does.
+"""
+
+import functools
+import importlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+
+import pandas as pd
+
+from .registry import FrameRegistry
+from .sections import freeze
+from .selection import Selection
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Trace types drawn on each kind of non-cartesian subplot, whose template defaults a figure without
+# them never reads
+_SUBPLOT_TRACES = {
+    "polar": {"barpolar", "scatterpolar", "scatterpolargl"},
+    "ternary": {"scatterternary"},
+    "scene": {"cone", "isosurface", "mesh3d", "scatter3d", "streamtube", "surface", "volume"},
+    "geo": {"choropleth", "scattergeo"},
+    "mapbox": {"choroplethmapbox", "densitymapbox", "scattermapbox"},
+}
+
+
+def compact_figure(data: dict) -> dict:
+    """
+    Drop the parts of a serialized figure's template that cannot affect it:
+    the trace defaults of trace types it does not draw, and the defaults of
+    subplot kinds it has none of. The default template is three quarters of a
+    small chart's payload, and every rerun that shows the chart sends it.
+    """
+    template = data.get("layout", {}).get("template")
+    if not template:
+        return data
+    types = {trace.get("type", "scatter") for trace in data.get("data", [])}
+    if "data" in template:
+        template["data"] = {kind: value for kind, value in template["data"].items() if kind in types}
+    for subplot, traces in _SUBPLOT_TRACES.items():
+        if not types & traces:
+            template.get("layout", {}).pop(subplot, None)
+    return data
+
+
+class FigureCache:
+    """LRU of serialized plot payloads over one base frame, bounded by total bytes."""
+
+    def __init__(self, base: pd.DataFrame, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.base = base
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(kind: str, rows: Selection, layout: dict | None = None) -> tuple:
+        return (kind, rows.fingerprint(), freeze(layout))
+
+    def get(self, key: tuple) -> dict | None:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(payload)
+
+    def put(self, key: tuple, data: dict) -> None:
+        payload = json.dumps(data, separators=(",", ":"))
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= len(previous)
+            self._entries[key] = payload
+            self.nbytes += len(payload)
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+
+_caches = FrameRegistry(FigureCache)
+
+
+class LazyModule:
+    """Stands in for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __repr__(self) -> str:
+        return f"LazyModule({self._name!r}, loaded={self._module is not None})"
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    `import name`, deferred until the module is first used. Not a real lazy
+    module: preswald derives component ids from `inspect.stack()`, which reads
+    `__file__` from every module in `sys.modules` and would import one at once.
+    """
+    return LazyModule(name)
+
+
+def figure_cache(base: pd.DataFrame) -> FigureCache:
+    """The process-wide figure cache for a base frame, shared by all sessions."""
+    return _caches.get(base)
+
+
+@functools.cache
+def _plot_component():
+    # preswald is imported lazily so the data layer can be used without its runtime
+    from preswald import plotly
+    from preswald.engine.render_tracking import with_render_tracking
+    from preswald.interfaces.component_return import ComponentReturn
+
+    @with_render_tracking("plot")
+    def plot_component(kind, rows, build, layout=None, size=1.0, component_id=None, **kwargs):
+        cache = figure_cache(rows.base)
+        key = FigureCache.key(kind, rows, layout)
+        data = cache.get(key)
+        if data is not None:
+            component = {"type": "plot", "id": component_id, "data": data, "size": size}
+            return ComponentReturn(component, component)
+
+        fig = build()
+        if layout:
+            fig.update_layout(**layout)
+        # Same figure optimization and serialization as preswald's plotly() component
+        result = plotly.__wrapped__(fig, size=size, component_id=component_id)
+        if "error" not in result._preswald_component:
+            cache.put(key, compact_figure(result._preswald_component["data"]))
+        return result
+
+    return plot_component
+
+
+def cached_plotly(
+    kind: str,
+    rows: Selection,
+    build: Callable,
+    layout: dict | None = None,
+    size: float = 1.0,
+    **kwargs,
+):
+    """
+    Render the figure returned by `build()` as a plot component, reusing the
+    serialized figure when the same `kind` was already built over the same
+    rows with the same `layout` (applied with `fig.update_layout`).
+
+    `kind` must identify everything `build` varies by apart from the rows,
+    such as the chart type and its axes.
+    """
+    if "callsite_hint" not in kwargs:
+        # Component ids hash the callsite; make it the caller's line rather than this module's
+        caller = sys._getframe(1)
+        kwargs["callsite_hint"] = f"{caller.f_code.co_filename}:{caller.f_lineno}"
+    return _plot_component()(kind, rows, build, layout, size, **kwargs)
@@ -0,0 +1,125 @@
+"""
+Bitmask filter engine for the dashboard's search & filter controls.
+
+Each predicate (region, country, size, status, focus, AR threshold, search
+term) is evaluated once per distinct widget value and kept as a packed
+bitset in an LRU cache. A rerun then only ANDs the cached bitsets together,
+so toggling one control recomputes one predicate instead of the whole chain.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .registry import FrameRegistry
+from .score_index import score_index
+from .search import search_index
+from .selection import Selection
+
+
+def _equals(column):
+    return lambda df, value: (df[column] == value).to_numpy(dtype=bool, na_value=False)
+
+
+def _isin(column):
+    return lambda df, values: df[column].isin(values).to_numpy(dtype=bool, na_value=False)
+
+
+def _at_least(column):
+    return lambda df, value: score_index(df, column).mask_at_least(value)
+
+
+def _above(column):
+    return lambda df, value: score_index(df, column).mask_above(value)
+
+
+def _search(df, query):
+    return search_index(df).mask(query)
+
+
+# Predicate name -> function(base frame, widget value) -> boolean mask over the base rows
+PREDICATES = {
+    "region": _equals("Region"),
+    "country": _equals("Country/Territory"),
+    "size": _equals("Size"),
+    "status": _isin("Status"),
+    "focus": _equals("Focus"),
+    "min_ar_score": _at_least("AR SCORE"),
+    "overall_above": _above("Overall SCORE"),
+    "search": _search,
+}
+
+
+def pack_mask(mask: np.ndarray) -> np.ndarray:
+    """Pack a boolean mask into a bitset of 64-bit words."""
+    packed = np.packbits(mask, bitorder="little")
+    padded = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+    padded[: len(packed)] = packed
+    return padded.view(np.uint64)
+
+
+def unpack_mask(words: np.ndarray, length: int) -> np.ndarray:
+    """Inverse of `pack_mask`."""
+    return np.unpackbits(words.view(np.uint8), count=length, bitorder="little").astype(bool)
+
+
+class FilterEngine:
+    """Per-predicate bitset cache over one shared base frame."""
+
+    def __init__(self, base: pd.DataFrame, max_entries: int = 256):
+        self.base = base
+        self.max_entries = max_entries
+        self._masks: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        # Column -> distinct values for its dropdown
+        self._options: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def options(self, column: str) -> list:
+        """Distinct values of `column` in order of first appearance, scanned once per base frame."""
+        values = self._options.get(column)
+        if values is None:
+            values = self._options[column] = self.base[column].unique().tolist()
+        return values
+
+    def mask(self, name: str, value) -> np.ndarray:
+        """Packed bitset for one predicate/value pair, computed at most once while cached."""
+        key = (name, value)
+        with self._lock:
+            if key in self._masks:
+                self._masks.move_to_end(key)
+                return self._masks[key]
+
+        words = pack_mask(PREDICATES[name](self.base, value))
+
+        with self._lock:
+            self._masks[key] = words
+            while len(self._masks) > self.max_entries:
+                self._masks.popitem(last=False)
+        return words
+
+    def select(self, criteria: dict) -> Selection:
+        """
+        Rows matching every active criterion.
+
+        `criteria` maps predicate names to widget values; `None` means the
+        control is not filtering. Values must be hashable (use tuples for
+        multi-value predicates such as status).
+        """
+        active = [(name, value) for name, value in criteria.items() if value is not None]
+        if not active:
+            return Selection(self.base)
+
+        combined = self.mask(*active[0])
+        if len(active) > 1:
+            combined = np.bitwise_and.reduce([self.mask(name, value) for name, value in active])
+        return Selection(self.base, np.flatnonzero(unpack_mask(combined, len(self.base))))
+
+
+_engines = FrameRegistry(FilterEngine)
+
+
+def filter_engine(base: pd.DataFrame) -> FilterEngine:
+    """The process-wide engine for a base frame, shared by all sessions."""
+    return _engines.get(base)
@@ -0,0 +1,370 @@
+"""
+One-time, typed ingest of the rankings data sources listed in preswald.toml.
+
+The raw CSV is parsed once, coerced to compact dtypes and written to a
+columnar cache keyed by the checksum of the source file. Later reruns (and
+other processes) memory-map the cached Arrow file instead of re-parsing the
+CSV, and the checksum itself is remembered per file modification time and
+size, so a new worker does not re-read an unchanged source to find its cache.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import toml
+
+from .registry import set_source
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the typed schema below changes so stale caches are ignored
+SCHEMA_VERSION = 3
+
+SCORE_COLUMNS = [
+    "Overall SCORE",
+    "AR SCORE",
+    "ER SCORE",
+    "FSR SCORE",
+    "CPF SCORE",
+    "IFR SCORE",
+    "ISR SCORE",
+    "ISD SCORE",
+    "IRN SCORE",
+    "EO SCORE",
+    "SUS SCORE",
+]
+CATEGORY_COLUMNS = ["Country/Territory", "Region", "Size", "Focus", "Research", "Status"]
+# Identifying columns plus every score - the projection used by summary tables
+SUMMARY_COLUMNS = ["2026 Rank", "Institution Name", *CATEGORY_COLUMNS, *SCORE_COLUMNS]
+DEFAULT_CACHE_DIR = ".preswald_cache"
+# Rank columns are parsed to numbers for sorting and filtering; each keeps its published label
+# ('701-750', '1401+', '7=') in a categorical column of this suffix for display and export
+RANK_LABEL_SUFFIX = " Label"
+
+# In-process memo: (path, mtime_ns, size) -> (checksum, DataFrame)
+_loaded: dict[tuple, tuple[str, pd.DataFrame]] = {}
+
+
+def is_rank_column(column: str) -> bool:
+    """Rank columns hold labels like '7', '7=', '701-710' or '801+'."""
+    return column.upper().endswith("RANK")
+
+
+def rank_label_column(column: str) -> str:
+    """The column holding the published labels of rank column `column`."""
+    return f"{column}{RANK_LABEL_SUFFIX}"
+
+
+def with_rank_labels(columns: list[str], available) -> list[str]:
+    """`columns` with the label column of each rank column in it that has one in `available`."""
+    out = []
+    for col in columns:
+        out.append(col)
+        label = rank_label_column(col)
+        if is_rank_column(col) and label in available and label not in columns:
+            out.append(label)
+    return out
+
+
+def show_rank_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """`df` with each rank column that has a label column replaced by its labels."""
+    labelled = [col for col in df.columns if is_rank_column(col) and rank_label_column(col) in df.columns]
+    if not labelled:
+        return df
+    out = df.copy(deep=False)
+    for col in labelled:
+        out[col] = out.pop(rank_label_column(col))
+    return out
+
+
+# Parsed preswald.toml files by path, with the (mtime, size) they were parsed at
+_configs: dict[str, tuple[tuple, dict]] = {}
+
+
+def read_source_config(source_name: str, config_path: str = "preswald.toml") -> dict:
+    """Return the `[data.<source_name>]` table from preswald.toml, parsed again only when the file changes."""
+    stat = os.stat(config_path)
+    key = os.path.abspath(config_path)
+    cached = _configs.get(key)
+    if cached is None or cached[0] != (stat.st_mtime_ns, stat.st_size):
+        cached = _configs[key] = ((stat.st_mtime_ns, stat.st_size), toml.load(config_path))
+    try:
+        return dict(cached[1]["data"][source_name])
+    except KeyError as e:
+        raise KeyError(f"No [data.{source_name}] entry in {config_path}") from e
+
+
+def file_checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_rank(values: pd.Series) -> pd.Series:
+    """Convert rank labels to nullable ints, keeping the leading number ('701-710' -> 701)."""
+    leading = values.astype("string").str.extract(r"^\s*(\d+)", expand=False)
+    return pd.to_numeric(leading, errors="coerce").astype("Int32")
+
+
+def coerce_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply the typed rankings schema: float32 scores, Int32 ranks (each
+    followed by its categorical label column), categorical labels.
+    """
+    for col in list(df.columns):
+        if col in SCORE_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+        elif is_rank_column(col):
+            df.insert(df.columns.get_loc(col) + 1, rank_label_column(col), df[col].str.strip().astype("category"))
+            df[col] = parse_rank(df[col])
+        elif col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def read_csv_typed(path: str) -> pd.DataFrame:
+    """Parse a rankings CSV, stripping the UTF-8 BOM from the first header."""
+    df = pd.read_csv(path, encoding="utf-8-sig", dtype=str, na_values=["", "-"], keep_default_na=False)
+    df.columns = [str(col).strip() for col in df.columns]
+    return coerce_types(df)
+
+
+def source_checksum(path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """
+    `file_checksum(path)`, remembered in `cache_dir` against the file's
+    modification time and size so unchanged files are only hashed once.
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    record = [stat.st_mtime_ns, stat.st_size]
+    index_path = os.path.join(cache_dir, "checksums.json")
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    if index.get(key, [None])[:2] == record:
+        return index[key][2]
+
+    checksum = file_checksum(path)
+    index[key] = [*record, checksum]
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        logger.warning(f"Could not record the checksum of {path}: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return checksum
+
+
+def _cache_path(cache_dir: str, source_name: str, checksum: str) -> str:
+    return os.path.join(cache_dir, f"{source_name}-{checksum[:16]}-v{SCHEMA_VERSION}.arrow")
+
+
+def write_arrow(df: pd.DataFrame, path: str) -> None:
+    """Write a typed frame as an uncompressed Arrow IPC file, laid out for `read_arrow()`."""
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    # float32 columns keep NaN rather than gaining a validity bitmap, so they map back without a copy
+    arrays = [
+        pa.array(df[col].to_numpy()) if df[col].dtype == np.float32 else pa.Array.from_pandas(df[col])
+        for col in df.columns
+    ]
+    table = pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+    with ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table)
+
+
+def read_arrow(path: str) -> pd.DataFrame:
+    """
+    Memory-map a file from `write_arrow()`: the float32 score columns are not
+    copied but read from the page cache, shared by every process mapping it.
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    table = ipc.open_file(pa.memory_map(path)).read_all()
+    # int32 only appears for the nullable rank columns
+    return table.to_pandas(split_blocks=True, types_mapper={pa.int32(): pd.Int32Dtype()}.get)
+
+
+def _read_cache(path: str) -> pd.DataFrame | None:
+    try:
+        return read_arrow(path)
+    except ImportError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable rankings cache {path}: {e}")
+        return None
+
+
+def _write_cache(df: pd.DataFrame, path: str):
+    # Write to a temporary file first so concurrent readers never see a partial cache
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_arrow(df, tmp_path)
+        os.replace(tmp_path, path)
+    except ImportError:
+        logger.info("pyarrow is not installed - skipping on-disk rankings cache")
+    except OSError as e:
+        logger.warning(f"Could not write rankings cache {path}: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _fetch_export_file(path: str) -> bytes:
+    """A file of the static HTML export serving this script, fetched from inside its browser worker."""
+    try:
+        import js  # Pyodide's bridge to the browser
+    except ImportError as e:
+        raise RuntimeError(f"{path} is part of a static HTML export and is only fetched in the browser") from e
+
+    # The worker script is served from the export's assets/ directory
+    url = js.URL.new(f"../{path}", js.location.href).href
+    request = js.XMLHttpRequest.new()
+    request.open("GET", url, False)
+    request.responseType = "arraybuffer"
+    request.send()
+    if request.status != 200:
+        raise OSError(f"Could not fetch {url}: HTTP {request.status}")
+    return request.response.to_py().tobytes()
+
+
+def _read_parquet_files(paths: list[str]) -> pd.DataFrame:
+    try:
+        import pyarrow.parquet as pq
+
+        return pq.read_table(paths).to_pandas()
+    except ImportError:
+        # Always installed alongside preswald, including in the browser
+        import duckdb
+
+        return duckdb.read_parquet(paths).df()
+
+
+def load_chunks(manifest_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> pd.DataFrame:
+    """
+    The typed frame of a data source stored as Parquet chunks by a static
+    HTML export (see bundle.py), fetching the chunks not already in `cache_dir`.
+    """
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    # One directory per manifest, so it holds exactly this frame's chunks
+    directory = os.path.join(cache_dir, "chunks", manifest["checksum"][:16])
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for chunk in manifest["chunks"]:
+        path = os.path.join(directory, os.path.basename(chunk["file"]))
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(_fetch_export_file(chunk["file"]))
+        paths.append(path)
+
+    df = _read_parquet_files(paths)[manifest["columns"]]
+    # Either reader may widen the typed schema (nullable ints to floats, categories to strings)
+    for col, dtype in manifest["dtypes"].items():
+        df[col] = df[col].astype(pd.CategoricalDtype(dtype["categories"]) if isinstance(dtype, dict) else dtype)
+    df.attrs["checksum"] = manifest["checksum"]
+    return df
+
+
+def _register_chunks(source_name: str, directory: str) -> None:
+    """
+    Serve `query()` on an exported source from its chunks. The export drops
+    the source's type so preswald's data manager does not look for the CSV.
+    """
+    try:
+        from preswald.engine.managers.data import ParquetConfig, ParquetSource
+        from preswald.engine.service import PreswaldService
+
+        manager = PreswaldService.get_instance().data_manager
+    except (ImportError, RuntimeError):
+        return
+    try:
+        source = ParquetSource(source_name, ParquetConfig(path=os.path.join(directory, "*.parquet"), columns=None), manager.duckdb_conn)
+    except Exception as e:
+        # query() callers fall back to filtering the frame
+        logger.warning(f"Could not register {source_name} for SQL queries: {e}")
+        return
+    old = manager.sources.get(source_name)
+    manager.sources[source_name] = source
+    if isinstance(old, ParquetSource):
+        manager.duckdb_conn.execute(f"DROP TABLE IF EXISTS {old._table_name}")
+
+
+def load_source(source_name: str, config_path: str = "preswald.toml") -> pd.DataFrame:
+    """
+    Load a CSV data source from preswald.toml as a typed DataFrame.
+
+    The result is memoized per process and cached on disk as an Arrow file,
+    keyed by the checksum of the source file, so unchanged files are only
+    parsed once. Callers share the returned frame and must not modify it in place.
+    In a static HTML export the source's `chunks` manifest is loaded instead.
+    """
+    source = read_source_config(source_name, config_path)
+    if source.get("type", "csv") != "csv":
+        raise ValueError(f"Typed ingest only supports csv sources, got {source.get('type')!r}")
+
+    # In a static HTML export the CSV is replaced by a manifest of typed chunks
+    path = source.get("chunks") or source["path"]
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if memo_key in _loaded:
+        return _loaded[memo_key][1]
+
+    cache_dir = source.get("cache_dir", DEFAULT_CACHE_DIR)
+    if source.get("chunks"):
+        df = load_chunks(path, cache_dir)
+        checksum = df.attrs["checksum"]
+        _register_chunks(source_name, os.path.join(cache_dir, "chunks", checksum[:16]))
+    else:
+        checksum = source_checksum(path, cache_dir)
+        cache_path = _cache_path(cache_dir, source_name, checksum)
+
+        df = _read_cache(cache_path) if os.path.exists(cache_path) else None
+        if df is None:
+            df = read_csv_typed(path)
+            _write_cache(df, cache_path)
+            logger.info(f"Ingested {source_name} ({len(df)} rows) into {cache_path}")
+        # Identifies the frame's content to caches of structures derived from it (see snapshot.py)
+        df.attrs["checksum"] = checksum
+
+    set_source(df, source_name)
+    # Only keep the latest version of each source in memory
+    for key in [k for k in _loaded if k[0] == memo_key[0]]:
+        del _loaded[key]
+    _loaded[memo_key] = (checksum, df)
+    return df
+
+
+def display_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepare a typed frame for `table()`: rank columns show their published
+    labels where the frame has them, float32 scores are widened and rounded
+    so they print as `99.4` rather than `99.40000152587891`, and nullable
+    integers are turned into plain objects so missing ranks render as blanks.
+    """
+    out = show_rank_labels(df).copy(deep=False)
+    for col in out.columns:
+        dtype = out[col].dtype
+        if dtype == np.float32:
+            out[col] = out[col].astype("float64").round(4)
+        elif isinstance(dtype, pd.Int32Dtype | pd.Int64Dtype):
+            out[col] = out[col].astype(object).where(out[col].notna(), None)
+    return out
@@ -0,0 +1,105 @@
+"""
+Server-side windowing for `table()`.
+
+Instead of serializing a whole selection, tables sort the selected row
+positions (cached per selection and sort key) and materialize only the
+visible page of rows for the chosen columns, so the payload stays the same
+size whether a filter matches 20 rows or 200,000.
+"""
+
+import math
+import threading
+import weakref
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .selection import Selection
+
+
+DEFAULT_PAGE_SIZE = 25
+
+_orders: OrderedDict[tuple, tuple[weakref.ref, np.ndarray]] = OrderedDict()
+_orders_lock = threading.Lock()
+_MAX_ORDERS = 64
+
+
+class Page(NamedTuple):
+    frame: pd.DataFrame
+    number: int
+    count: int
+    first: int
+    last: int
+    total: int
+
+    @property
+    def caption(self) -> str:
+        if self.total == 0:
+            return "No rows"
+        return f"Rows {self.first:,}-{self.last:,} of {self.total:,} (page {self.number} of {self.count})"
+
+
+def page_count(total: int, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    return max(math.ceil(total / page_size), 1)
+
+
+def _sort_key(values: pd.Series) -> np.ndarray:
+    """Float sort key for a column; missing values become NaN so they sort last."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy(dtype=np.float64)
+        codes[codes < 0] = np.nan
+        return codes
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, _ = pd.factorize(values, sort=True)
+    codes = codes.astype(np.float64)
+    codes[codes < 0] = np.nan
+    return codes
+
+
+def sorted_selection(selection: Selection, column: str, descending: bool = False) -> Selection:
+    """The selection ordered by one column (missing values last, ties in current order)."""
+    key = (id(selection.base), selection.fingerprint(), column, descending)
+    with _orders_lock:
+        entry = _orders.get(key)
+        # The frame is held weakly, so check it is the same one rather than a later frame at a reused id
+        if entry is not None and entry[0]() is selection.base:
+            _orders.move_to_end(key)
+            return Selection(selection.base, entry[1])
+
+    values = _sort_key(selection.column(column))
+    # -NaN is still NaN, so missing values stay last in both directions
+    order = np.argsort(-values if descending else values, kind="stable")
+    rows = selection.rows[order]
+
+    with _orders_lock:
+        _orders[key] = (weakref.ref(selection.base), rows)
+        while len(_orders) > _MAX_ORDERS:
+            _orders.popitem(last=False)
+    return Selection(selection.base, rows)
+
+
+def paginate(
+    selection: Selection,
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    sort_by: str | None = None,
+    descending: bool = False,
+    columns: list[str] | None = None,
+) -> Page:
+    """
+    One page of a selection as a DataFrame, optionally sorted and projected.
+
+    Out-of-range page numbers are clamped, so a page widget left on a high
+    value keeps working after the filters narrow the selection.
+    """
+    if sort_by is not None:
+        selection = sorted_selection(selection, sort_by, descending)
+    total = len(selection)
+    count = page_count(total, page_size)
+    number = min(max(int(page), 1), count)
+    start = (number - 1) * page_size
+    window = Selection(selection.base, selection.rows[start : start + page_size])
+    return Page(window.to_frame(columns), number, count, min(start + 1, total), start + len(window), total)
@@ -0,0 +1,274 @@
+"""
+Rerun profiling for the dashboard.
+
+With `profile = true` in the `[logging]` table of preswald.toml, every
+rerun of hello.py and every profiled section within it (each
+`SectionCache.run()` section plus the blocks hello.py wraps in
+`profile.section()`) records its wall time, peak memory allocated while it
+ran (via tracemalloc) and the bytes of the components it sent to the
+frontend. Each record is logged as one JSON line on the
+`rankings.profiling` logger, and running totals are written as a
+Prometheus text exposition file after each rerun.
+
+Reruns are labelled with the widget whose value triggered them. Memory
+figures are process-wide, so they are only attributable while one session
+reruns at a time. When profiling is off, sections cost one context manager.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import toml
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILING_CONFIG = {
+    # Record per-rerun and per-section timings
+    "profile": False,
+    # Also trace memory allocations (slows reruns down noticeably)
+    "profile_memory": True,
+    # Prometheus text file rewritten after every rerun; "" to disable
+    "profile_metrics": os.path.join(".preswald_cache", "metrics.prom"),
+}
+
+_MISSING = object()
+
+
+def read_profiling_config(config_path: str = "preswald.toml") -> dict:
+    """The profiling keys of the `[logging]` table of preswald.toml, with defaults for missing keys."""
+    try:
+        config = toml.load(config_path).get("logging", {})
+    except FileNotFoundError:
+        config = {}
+    return {key: config.get(key, default) for key, default in DEFAULT_PROFILING_CONFIG.items()}
+
+
+class _Stats:
+    __slots__ = ("count", "seconds", "max_seconds", "memory_peak", "payload_bytes", "components", "replays")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.memory_peak = 0
+        self.payload_bytes = 0
+        self.components = 0
+        self.replays = 0
+
+    def add(self, record: dict) -> None:
+        self.count += 1
+        self.seconds += record["seconds"]
+        self.max_seconds = max(self.max_seconds, record["seconds"])
+        self.memory_peak = max(self.memory_peak, record.get("memory_peak_bytes", 0))
+        self.payload_bytes += record["payload_bytes"]
+        self.components += record["components"]
+        self.replays += bool(record.get("replayed"))
+
+
+class _Frame:
+    __slots__ = ("record", "start", "memory_start", "memory_peak")
+
+    def __init__(self, record: dict, memory: bool):
+        self.record = record
+        self.start = time.perf_counter()
+        self.memory_start = tracemalloc.get_traced_memory()[0] if memory else 0
+        self.memory_peak = self.memory_start
+
+
+class Profiler:
+    """Per-rerun and per-section wall time, memory and payload statistics."""
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.metrics_path = ""
+        self._started_tracing = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sections: dict[str, _Stats] = {}
+        self._reruns: dict[str, _Stats] = {}
+        self._last_states: dict | None = None
+        self._labels: dict[str, str] = {}
+
+    def configure(self, config: dict) -> None:
+        self.enabled = bool(config.get("profile"))
+        self.memory = self.enabled and bool(config.get("profile_memory"))
+        self.metrics_path = config.get("profile_metrics") or ""
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        elif not self.memory and self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @property
+    def _stack(self) -> list[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, record: dict) -> _Frame:
+        stack = self._stack
+        memory = self.memory and tracemalloc.is_tracing()
+        if memory:
+            # Fold the peak so far into the open frames before resetting it for this one
+            peak = tracemalloc.get_traced_memory()[1]
+            for frame in stack:
+                frame.memory_peak = max(frame.memory_peak, peak)
+            tracemalloc.reset_peak()
+        frame = _Frame(record, memory)
+        stack.append(frame)
+        return frame
+
+    def _exit(self, frame: _Frame) -> dict:
+        stack = self._stack
+        stack.remove(frame)
+        record = frame.record
+        record["seconds"] = round(time.perf_counter() - frame.start, 6)
+        if self.memory and tracemalloc.is_tracing():
+            peak = max(frame.memory_peak, tracemalloc.get_traced_memory()[1])
+            record["memory_peak_bytes"] = max(peak - frame.memory_start, 0)
+            if stack:
+                stack[-1].memory_peak = max(stack[-1].memory_peak, peak)
+        return record
+
+    def _count_component(self, component) -> None:
+        component = getattr(component, "_preswald_component", component)
+        size = len(json.dumps(component, default=str))
+        for frame in self._stack:
+            frame.record["payload_bytes"] += size
+            frame.record["components"] += 1
+
+    @contextmanager
+    def section(self, name: str):
+        """
+        Profile the enclosed block as section `name`. Yields the section's
+        record dict (None when profiling is off), which callers may annotate.
+        """
+        if not self.enabled:
+            yield None
+            return
+        frame = self._enter({"event": "section", "section": name, "payload_bytes": 0, "components": 0})
+        try:
+            yield frame.record
+        finally:
+            record = self._exit(frame)
+            with self._lock:
+                self._sections.setdefault(name, _Stats()).add(record)
+            logger.info(json.dumps(record))
+
+    def begin_rerun(self) -> None:
+        """Start profiling a rerun of the script; call first thing in the script."""
+        if not self.enabled:
+            return
+        from preswald.engine.service import PreswaldService
+
+        service = PreswaldService.get_instance()
+        # A rerun that raised never reached end_rerun(), so drop its frames and counting hook
+        self._local.stack = []
+        service.__dict__.pop("append_component", None)
+        self._local.rerun = self._enter({"event": "rerun", "trigger": self._trigger(service), "payload_bytes": 0, "components": 0})
+
+        append_component = service.append_component
+
+        def counting_append(component):
+            self._count_component(component)
+            append_component(component)
+
+        # Shadow the bound method on the service instance for the rest of the rerun
+        service.append_component = counting_append
+
+    def end_rerun(self) -> None:
+        """Finish the rerun started by begin_rerun(); call last thing in the script."""
+        frame = getattr(self._local, "rerun", None)
+        if not self.enabled or frame is None:
+            return
+        from preswald.engine.service import PreswaldService
+
+        service = PreswaldService.get_instance()
+        service.__dict__.pop("append_component", None)
+        self._local.rerun = None
+        record = self._exit(frame)
+        with self._lock:
+            self._reruns.setdefault(record["trigger"], _Stats()).add(record)
+        logger.info(json.dumps(record))
+
+        # Widget labels by component id, to name the trigger of the next rerun
+        for row in service.get_rendered_components().get("rows", []):
+            for component in row:
+                if component.get("label") and component.get("id"):
+                    self._labels[component["id"]] = component["label"]
+        if self.metrics_path:
+            self.write_metrics(self.metrics_path)
+
+    def _trigger(self, service) -> str:
+        states = dict(service._component_states)
+        previous, self._last_states = self._last_states, states
+        if previous is None:
+            return "initial"
+        changed = [key for key, value in states.items() if previous.get(key, _MISSING) != value]
+        if not changed:
+            return "none"
+        if len(changed) > 1:
+            return "multiple"
+        return self._labels.get(changed[0], changed[0])
+
+    def metrics(self) -> str:
+        """Totals so far in the Prometheus text exposition format."""
+        with self._lock:
+            groups = [("section", "section", dict(self._sections)), ("rerun", "trigger", dict(self._reruns))]
+        lines = []
+        for kind, label, stats in groups:
+            series = [(f'{label}="{_escape(name)}"', s) for name, s in sorted(stats.items())]
+            for metric, metric_type, help_text, value in [
+                ("seconds", "summary", f"Wall time per {kind}", None),
+                ("seconds_max", "gauge", f"Longest {kind}", lambda s: s.max_seconds),
+                ("memory_peak_bytes", "gauge", f"Most memory allocated during one {kind}", lambda s: s.memory_peak),
+                ("payload_bytes_total", "counter", f"Component bytes sent by {kind}s", lambda s: s.payload_bytes),
+                ("components_total", "counter", f"Components sent by {kind}s", lambda s: s.components),
+            ]:
+                name = f"dashboard_{kind}_{metric}"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+                for labels, s in series:
+                    if value is None:
+                        lines += [f"{name}_count{{{labels}}} {s.count}", f"{name}_sum{{{labels}}} {s.seconds:.6f}"]
+                    else:
+                        lines.append(f"{name}{{{labels}}} {value(s)}")
+            if kind == "section":
+                name = "dashboard_section_replays_total"
+                lines += [f"# HELP {name} Section runs replayed from the section cache", f"# TYPE {name} counter"]
+                lines += [f"{name}{{{labels}}} {s.replays}" for labels, s in series]
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.metrics())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {path}: {e}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_profiler = Profiler()
+
+
+def profiler(config: dict | None = None) -> Profiler:
+    """The process-wide profiler, (re)configured from `config` (see read_profiling_config) when given."""
+    if config is not None:
+        _profiler.configure(config)
+    return _profiler
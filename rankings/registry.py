@@ -0,0 +1,118 @@
+"""
+Process-wide objects built per base frame.
+
+Indexes, caches and aggregates are built once per loaded frame and shared by
+every session. A `FrameRegistry` keeps them while their frame is alive, and
+drops the objects of an earlier load of a source when a frame from a newer
+load of the same source (see `set_source()`) is registered. Frames of other
+sources leave them alone; frames not loaded from a source, such as store
+editions, only replace each other. Concurrent requests for an object not yet built wait for one
+build rather than each building it. A data source watcher (see watch.py) pins the frames it serves:
+while it builds the next snapshot's objects alongside the current ones
+both stay registered, and after a swap it releases the old frame's objects
+explicitly.
+"""
+
+import threading
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+import pandas as pd
+
+
+_pinned: dict[int, weakref.ref] = {}
+# Data source each loaded frame came from, so a newer load replaces only that source's objects
+_sources: dict[int, tuple[weakref.ref, str]] = {}
+_registries: list["FrameRegistry"] = []
+
+
+def pin(base: pd.DataFrame) -> None:
+    """Keep the registered objects of `base` until it is unpinned."""
+    _pinned[id(base)] = weakref.ref(base)
+
+
+def unpin(base: pd.DataFrame) -> None:
+    ref = _pinned.get(id(base))
+    if ref is not None and ref() is base:
+        del _pinned[id(base)]
+
+
+def pinned(base: pd.DataFrame) -> bool:
+    ref = _pinned.get(id(base))
+    return ref is not None and ref() is base
+
+
+def set_source(base: pd.DataFrame, source: str) -> None:
+    """Record that `base` is a load of data source `source`."""
+    for key in [key for key, (ref, _) in _sources.items() if ref() is None]:
+        del _sources[key]
+    _sources[id(base)] = (weakref.ref(base), source)
+
+
+def source_of(base: pd.DataFrame) -> str | None:
+    entry = _sources.get(id(base))
+    return entry[1] if entry is not None and entry[0]() is base else None
+
+
+def release(base: pd.DataFrame) -> None:
+    """Drop every registry's objects for `base`."""
+    unpin(base)
+    for registry in _registries:
+        registry.release(base)
+
+
+class FrameRegistry:
+    """`build(base, *args)` results, one per base frame and arguments."""
+
+    def __init__(self, build: Callable[..., Any]):
+        self._build = build
+        # Frames are held weakly: an object that does not refer to its frame goes when the frame does
+        self._entries: dict[tuple, tuple[weakref.ref, Any]] = {}
+        self._building: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        _registries.append(self)
+
+    def _lookup(self, key: tuple, base: pd.DataFrame) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is base:
+            return True, entry[1]
+        return False, None
+
+    def get(self, base: pd.DataFrame, *args) -> Any:
+        key = (id(base), *args)
+        found, value = self._lookup(key, base)
+        if found:
+            return value
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            found, value = self._lookup(key, base)
+            if not found:
+                value = self._build(base, *args)
+                self.put(base, value, *args)
+        with self._lock:
+            self._building.pop(key, None)
+        return value
+
+    def put(self, base: pd.DataFrame, value: Any, *args) -> None:
+        """Register an object built elsewhere (e.g. read from a warm-start snapshot) as `get(base, *args)`."""
+        source = source_of(base)
+        if not pinned(base) and any(
+            source_of(frame) == source for frame in (ref() for ref in list(_pinned.values())) if frame is not None
+        ):
+            # A frame a watcher has swapped out, still used by a rerun that started before the
+            # swap: build for that rerun without displacing the snapshots being served
+            return
+        with self._lock:
+            # Objects over earlier loads of the same source are stale, unless still served
+            for key, (ref, _) in list(self._entries.items()):
+                other = ref()
+                if other is None or (other is not base and source_of(other) == source and not pinned(other)):
+                    del self._entries[key]
+            self._entries[(id(base), *args)] = (weakref.ref(base), value)
+
+    def release(self, base: pd.DataFrame) -> None:
+        with self._lock:
+            for key in [key for key, (ref, _) in self._entries.items() if ref() is base]:
+                del self._entries[key]
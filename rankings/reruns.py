@@ -0,0 +1,258 @@
+"""
+Debounced, cancellable reruns for the dashboard server.
+
+preswald handles a session's widget messages one at a time, rerunning the
+whole script for each on the server's event loop. While one rerun runs,
+the messages sent by someone typing into the search box or dragging a
+slider queue up, and each then reruns a state the user has already left.
+Its only debounce drops a message arriving within 0.1s of the previous
+rerun, states and all, so the value the user stops on can be lost.
+
+`rerun_scheduler()` takes over the service's widget-message handler. Each
+message's states are merged into its session's pending states, and the
+rerun is scheduled once changes to the widget types under `debounce` in
+the `[reruns]` table of preswald.toml have paused that long (other widgets
+rerun at once). `max_wait` caps how long a continuous burst holds its rerun
+back, so a long drag still updates as it goes. Reruns execute one at a time
+in a worker thread, which leaves the event loop free to take in newer
+messages meanwhile; with `cancel = true` a rerun that a newer message has
+made obsolete stops before its next cached section (see
+`SectionCache.run()`), and its changes are rerun with the newer ones.
+A new session's first run takes its turn with the reruns, and a closed
+session's pending changes are dropped with it.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+
+import toml
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERUN_CONFIG = {
+    # Seconds changes to a widget of each type must pause before the rerun starts; other widgets
+    # rerun at once
+    "debounce": {"text_input": 0.3, "slider": 0.15},
+    # Longest a continuous burst of changes holds its rerun back, in seconds
+    "max_wait": 1.0,
+    # Stop a rerun before its next cached section once a newer change has made it obsolete
+    "cancel": True,
+}
+
+
+def read_rerun_config(config_path: str = "preswald.toml") -> dict:
+    """The `[reruns]` table of preswald.toml, with defaults for missing keys."""
+    try:
+        config = toml.load(config_path).get("reruns", {})
+    except FileNotFoundError:
+        config = {}
+    return {**DEFAULT_RERUN_CONFIG, **config}
+
+
+class RerunSuperseded(BaseException):
+    """
+    Stops a rerun that a newer widget change has made obsolete. Not an
+    Exception, so preswald's handlers - which would report it to the browser
+    and retry the script without reactivity - let it through to the scheduler.
+    """
+
+
+# The (scheduler, session, generation) of the rerun executing in this thread
+_local = threading.local()
+
+
+def check_superseded() -> None:
+    """Raise RerunSuperseded if the rerun executing in this thread is obsolete."""
+    run = getattr(_local, "run", None)
+    if run is not None:
+        scheduler, client_id, generation = run
+        if scheduler.cancel and scheduler._generations.get(client_id) != generation:
+            raise RerunSuperseded
+
+
+class RerunScheduler:
+    """Coalesces each session's widget changes into as few reruns as it can."""
+
+    def __init__(self, service, config: dict):
+        self.service = service
+        # The service's own methods, before rerun_scheduler() shadows them
+        self._register = type(service)._register_common_client_setup.__get__(service)
+        self._unregister = type(service).unregister_client.__get__(service)
+        self.configure(config)
+        # Per session: states received but not rerun yet, when their burst began, the timer that
+        # will rerun them, the number of messages received, and changes of a cancelled rerun
+        self._pending: dict[str, dict] = {}
+        self._burst_start: dict[str, float] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._generations: dict[str, int] = {}
+        self._carried: dict[str, dict] = {}
+        self._widget_types: dict[str, str] = {}
+        self._tasks: set[asyncio.Task] = set()
+        # preswald's service, layout and workflow are shared by all sessions: one rerun at a time
+        self._run_lock = asyncio.Lock()
+        self.reruns = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    def __repr__(self) -> str:
+        return f"RerunScheduler(reruns={self.reruns}, coalesced={self.coalesced}, cancelled={self.cancelled})"
+
+    def configure(self, config: dict) -> None:
+        self.debounce = {str(kind): float(seconds) for kind, seconds in config["debounce"].items()}
+        self.max_wait = float(config["max_wait"])
+        self.cancel = bool(config["cancel"])
+
+    def _widget_type(self, component_id: str) -> str | None:
+        # Reading the layout closes its current row, so never while a rerun is appending to it
+        if component_id not in self._widget_types and not self._run_lock.locked():
+            self._learn_widget_types()
+        return self._widget_types.get(component_id)
+
+    def _learn_widget_types(self) -> None:
+        for row in self.service.get_rendered_components().get("rows", []):
+            for component in row:
+                if component.get("id") and component.get("type"):
+                    self._widget_types[component["id"]] = component["type"]
+
+    async def register_client(self, client_id: str, websocket):
+        """Replaces `BasePreswaldService._register_common_client_setup()`."""
+        # The session's first run renders into the same layout as the reruns
+        async with self._run_lock:
+            return await self._register(client_id, websocket)
+
+    async def unregister_client(self, client_id: str) -> None:
+        """Replaces the service's `unregister_client()`."""
+        self.forget(client_id)
+        # Unregistering clears the shared layout, so not in the middle of a rerun
+        async with self._run_lock:
+            await self._unregister(client_id)
+
+    def forget(self, client_id: str) -> None:
+        """Drop a session's pending changes; a rerun of it in progress becomes obsolete."""
+        timer = self._timers.pop(client_id, None)
+        if timer is not None:
+            timer.cancel()
+        for per_session in (self._pending, self._burst_start, self._generations, self._carried):
+            per_session.pop(client_id, None)
+
+    async def handle_component_update(self, client_id: str, message: dict) -> None:
+        """Replaces `BasePreswaldService._handle_component_update()`."""
+        states = message.get("states", {})
+        if not states:
+            await self.service._send_error(client_id, "Component update missing states")
+            raise ValueError("Component update missing states")
+
+        loop = asyncio.get_running_loop()
+        self._generations[client_id] = self._generations.get(client_id, 0) + 1
+        pending = self._pending.setdefault(client_id, {})
+        if pending:
+            self.coalesced += 1
+        pending.update(states)
+
+        now = loop.time()
+        start = self._burst_start.setdefault(client_id, now)
+        delay = max(self.debounce.get(self._widget_type(component_id), 0.0) for component_id in states)
+        delay = max(0.0, min(delay, start + self.max_wait - now))
+        timer = self._timers.pop(client_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._timers[client_id] = loop.call_later(delay, self._start, client_id)
+
+    def _start(self, client_id: str) -> None:
+        self._timers.pop(client_id, None)
+        task = asyncio.ensure_future(self._rerun(client_id))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _rerun(self, client_id: str) -> None:
+        async with self._run_lock:
+            states = self._pending.pop(client_id, None)
+            self._burst_start.pop(client_id, None)
+            if not states:
+                return
+            service = self.service
+            changed = {key: value for key, value in states.items() if service.should_render(key, value)}
+            # A cancelled rerun's changes were never rendered, even if these undo some of them
+            changed = {**self._carried.pop(client_id, {}), **changed}
+            if not changed:
+                logger.info("[reruns] No actual state changes detected. Skipping rerun.")
+                return
+
+            service._update_component_states(changed)
+            runner = service.script_runners.get(client_id)
+            if runner is not None:
+                loop = asyncio.get_running_loop()
+                generation = self._generations[client_id]
+                self.reruns += 1
+                if not await loop.run_in_executor(None, self._run, runner, changed, client_id, generation, loop):
+                    self.cancelled += 1
+                    if client_id in service.script_runners:
+                        self._carried[client_id] = changed
+                    return
+            await service._broadcast_state_updates(changed, exclude_client=client_id)
+
+    def _run(self, runner, states: dict, client_id: str, generation: int, loop: asyncio.AbstractEventLoop) -> bool:
+        """Rerun the script in this worker thread. Returns False if it was superseded part-way."""
+        send = runner._send_message_callback
+
+        async def send_on_loop(message: dict):
+            # The session's websocket belongs to the server's event loop
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(send(message), loop))
+
+        render_buffer = self.service._render_buffer
+        rendered = dict(render_buffer._state_cache)
+        cwd = os.getcwd()
+        runner._send_message_callback = send_on_loop
+        # Bursts are already coalesced here; preswald's own debounce would drop the states
+        runner._last_run_time = 0
+        _local.run = (self, client_id, generation)
+        try:
+            asyncio.run(runner.rerun(states))
+            return True
+        except RerunSuperseded:
+            # The components rendered before the stop were never sent, so must not count as rendered
+            render_buffer._state_cache = rendered
+            logger.info(f"[reruns] Cancelled an obsolete rerun for session {client_id}")
+            return False
+        finally:
+            _local.run = None
+            runner._send_message_callback = send
+            # The script runs from its own directory and a stopped rerun never changes back
+            os.chdir(cwd)
+            self._learn_widget_types()
+
+
+_scheduler: RerunScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def rerun_scheduler(config: dict | None = None) -> RerunScheduler | None:
+    """
+    The scheduler of the server's reruns, installed on first call and
+    (re)configured from `config` (see read_rerun_config) when given. None
+    outside a preswald server and in the browser, which has no threads.
+    """
+    global _scheduler
+    if sys.platform == "emscripten":
+        return None
+    try:
+        from preswald.engine.service import PreswaldService
+
+        service = PreswaldService.get_instance()
+    except (ImportError, RuntimeError):
+        return None
+    with _scheduler_lock:
+        if _scheduler is None or _scheduler.service is not service:
+            _scheduler = RerunScheduler(service, config or read_rerun_config())
+            # Shadow the bound methods on the service instance
+            service._handle_component_update = _scheduler.handle_component_update
+            service._register_common_client_setup = _scheduler.register_client
+            service.unregister_client = _scheduler.unregister_client
+        elif config is not None:
+            _scheduler.configure(config)
+    return _scheduler
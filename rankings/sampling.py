@@ -0,0 +1,95 @@
+"""
+Large-data mode for point charts.
+
+Scatter and bubble charts send one marker (with hover data) per row, which
+the browser cannot draw at hundreds of thousands of points. Above a point
+budget the rows are thinned server-side on a 2D grid: every grid cell keeps
+at most the same number of points, so dense clusters are reduced while
+sparse cells - the outliers - keep all of theirs. Above a (lower) WebGL
+threshold, charts switch from SVG to WebGL markers.
+"""
+
+import numpy as np
+import pandas as pd
+import toml
+
+from .selection import Selection
+
+
+DEFAULT_CHART_CONFIG = {
+    # Point count above which scatter charts render with WebGL instead of SVG
+    "webgl_threshold": 5000,
+    # Most points a point chart sends to the browser
+    "max_points": 20000,
+}
+
+
+def read_chart_config(config_path: str = "preswald.toml") -> dict:
+    """The `[charts]` table of preswald.toml, with defaults for missing keys."""
+    try:
+        config = toml.load(config_path).get("charts", {})
+    except FileNotFoundError:
+        config = {}
+    return {**DEFAULT_CHART_CONFIG, **config}
+
+
+def render_mode(points: int, webgl_threshold: int = DEFAULT_CHART_CONFIG["webgl_threshold"]) -> str:
+    """plotly.express `render_mode` for a point chart of `points` markers."""
+    return "webgl" if points > webgl_threshold else "svg"
+
+
+def _axis_values(values: pd.Series) -> np.ndarray:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy(dtype=np.float64)
+        codes[codes < 0] = np.nan
+        return codes
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = pd.factorize(values)[0].astype(np.float64)
+    codes[codes < 0] = np.nan
+    return codes
+
+
+def _grid_cells(values: np.ndarray, bins: int) -> np.ndarray:
+    """Bin index of each value on an even grid over its range (NaN in its own bin)."""
+    finite = np.isfinite(values)
+    cells = np.full(len(values), bins, dtype=np.int64)
+    if finite.any():
+        low, high = values[finite].min(), values[finite].max()
+        scale = bins / (high - low) if high > low else 0.0
+        cells[finite] = np.minimum(((values[finite] - low) * scale).astype(np.int64), bins - 1)
+    return cells
+
+
+def downsample(rows: Selection, x: str, y: str, max_points: int = DEFAULT_CHART_CONFIG["max_points"]) -> Selection:
+    """
+    At most `max_points` of `rows`, thinned evenly per cell of an x/y grid.
+
+    Each cell keeps up to the same quota of points (the earliest in the
+    selection's order), with the quota as large as the budget allows, so
+    cells with few points - outliers and sparse regions - are kept whole.
+    The result stays in the selection's order.
+    """
+    if len(rows) <= max_points:
+        return rows
+
+    # At most about half the budget in cells, so every occupied cell keeps at least one point
+    bins = max(int(np.sqrt(max_points / 2)), 1)
+    cells = _grid_cells(_axis_values(rows.column(x)), bins) * (bins + 1) + _grid_cells(_axis_values(rows.column(y)), bins)
+    _, cell_ids, counts = np.unique(cells, return_inverse=True, return_counts=True)
+
+    # Largest per-cell quota whose total fits the budget
+    low, high = 1, int(counts.max())
+    while low < high:
+        quota = (low + high + 1) // 2
+        if np.minimum(counts, quota).sum() <= max_points:
+            low = quota
+        else:
+            high = quota - 1
+
+    # Position of each point within its cell, in selection order
+    order = np.argsort(cell_ids, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    within = np.empty(len(order), dtype=np.int64)
+    within[order] = np.arange(len(order)) - starts[cell_ids[order]]
+    return rows.where(within < low)
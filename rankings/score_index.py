@@ -0,0 +1,99 @@
+"""
+Sorted indexes over the score columns.
+
+Each index holds the row positions of one score column ordered by value
+(argsort, missing scores excluded). Threshold counts, tier counts and range
+queries are then binary searches over the sorted values instead of full
+column scans.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .registry import FrameRegistry
+from .selection import Selection
+
+
+class ScoreIndex:
+    """Row positions of a base frame sorted ascending by one score column."""
+
+    def __init__(self, base: pd.DataFrame, order: np.ndarray, sorted_values: np.ndarray):
+        self.base = base
+        self.order = order
+        self.sorted_values = sorted_values
+
+    @classmethod
+    def build(cls, base: pd.DataFrame, column: str) -> "ScoreIndex":
+        values = base[column].to_numpy(dtype=np.float32, na_value=np.nan)
+        valid = np.flatnonzero(~np.isnan(values))
+        # Stable sort keeps tied scores in file order
+        order = valid[np.argsort(values[valid], kind="stable")]
+        return cls(base, order, values[order])
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _position(self, value, side: str) -> int:
+        # Compare in the column's own dtype so results match `column >= value`
+        return int(np.searchsorted(self.sorted_values, np.asarray(value, dtype=self.sorted_values.dtype), side=side))
+
+    def count_above(self, value) -> int:
+        return len(self) - self._position(value, "right")
+
+    def count_at_least(self, value) -> int:
+        return len(self) - self._position(value, "left")
+
+    def count_below(self, value) -> int:
+        return self._position(value, "left")
+
+    def count_between(self, low, high) -> int:
+        """Scores in [low, high], matching `Series.between(low, high)`."""
+        return max(self._position(high, "right") - self._position(low, "left"), 0)
+
+    def rows_above(self, value) -> np.ndarray:
+        """Row positions scoring strictly above `value`, in base order."""
+        return np.sort(self.order[self._position(value, "right"):])
+
+    def rows_at_least(self, value) -> np.ndarray:
+        return np.sort(self.order[self._position(value, "left"):])
+
+    def rows_between(self, low, high) -> np.ndarray:
+        return np.sort(self.order[self._position(low, "left"):self._position(high, "right")])
+
+    def mask_above(self, value) -> np.ndarray:
+        """Boolean mask over the base rows for scores strictly above `value`."""
+        mask = np.zeros(len(self.base), dtype=bool)
+        mask[self.order[self._position(value, "right"):]] = True
+        return mask
+
+    def mask_at_least(self, value) -> np.ndarray:
+        mask = np.zeros(len(self.base), dtype=bool)
+        mask[self.order[self._position(value, "left"):]] = True
+        return mask
+
+    def above(self, value) -> Selection:
+        return Selection(self.base, self.rows_above(value))
+
+    def restrict(self, rows: np.ndarray) -> "ScoreIndex":
+        """The same index limited to a subset of rows, without re-sorting."""
+        member = np.zeros(len(self.base), dtype=bool)
+        member[rows] = True
+        keep = member[self.order]
+        return ScoreIndex(self.base, self.order[keep], self.sorted_values[keep])
+
+    def min(self) -> float:
+        return float(self.sorted_values[0]) if len(self) else float("nan")
+
+    def max(self) -> float:
+        return float(self.sorted_values[-1]) if len(self) else float("nan")
+
+    def mean(self) -> float:
+        return float(self.sorted_values.mean(dtype=np.float64)) if len(self) else float("nan")
+
+
+_indexes = FrameRegistry(ScoreIndex.build)
+
+
+def score_index(base: pd.DataFrame, column: str) -> ScoreIndex:
+    """The process-wide sorted index of `column`, built on first use."""
+    return _indexes.get(base, column)
@@ -0,0 +1,260 @@
+"""
+In-memory search index for the Smart Search box.
+
+Institution name, country, region, focus and status are tokenized into a
+vocabulary of normalized words. Each word has a posting list of the rows it
+appears in, and a trigram index over the vocabulary resolves prefix,
+substring and fuzzy (misspelled) query words without scanning the rows.
+Query text is never interpreted as a regex.
+"""
+
+import bisect
+import functools
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from .registry import FrameRegistry
+from .selection import Selection
+
+
+# Searchable columns and how much a hit in each contributes to a row's relevance
+SEARCH_FIELDS = {
+    "Institution Name": 3.0,
+    "Country/Territory": 2.0,
+    "Region": 1.5,
+    "Focus": 1.0,
+    "Status": 1.0,
+}
+
+# Relevance of each kind of word match, before the field weight is applied
+EXACT, PREFIX, SUBSTRING, FUZZY = 1.0, 0.75, 0.5, 0.35
+
+# Minimum trigram similarity for a vocabulary word to count as a fuzzy match
+FUZZY_THRESHOLD = 0.4
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents, so 'Türkiye' and 'turkiye' compare equal."""
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(normalize(text))
+
+
+def trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _offsets(ids: np.ndarray, count: int) -> np.ndarray:
+    """Start of each id's run in `ids` sorted ascending, plus the end."""
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=count), out=offsets[1:])
+    return offsets
+
+
+class SearchIndex:
+    """Word postings plus a trigram index over the vocabulary of one base frame."""
+
+    def __init__(
+        self,
+        base: pd.DataFrame,
+        vocab: list[str],
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        weights: np.ndarray,
+        grams: list[str],
+        gram_offsets: np.ndarray,
+        gram_words: np.ndarray,
+        gram_counts: np.ndarray,
+    ):
+        self.base = base
+        # Sorted words; rows containing vocab[i] are postings[offsets[i]:offsets[i + 1]],
+        # each with the weight of the best field it appears in
+        self.vocab = vocab
+        self.offsets = offsets
+        self.postings = postings
+        self.weights = weights
+        # Ids of the words containing grams[j], ascending, are gram_words[gram_offsets[j]:gram_offsets[j + 1]];
+        # gram_counts[i] is the number of distinct trigrams of vocab[i]
+        self.grams = grams
+        self.gram_ids = {gram: j for j, gram in enumerate(grams)}
+        self.gram_offsets = gram_offsets
+        self.gram_words = gram_words
+        self.gram_counts = gram_counts
+
+    @classmethod
+    def build(cls, base: pd.DataFrame, fields: dict[str, float] | None = None) -> "SearchIndex":
+        fields = SEARCH_FIELDS if fields is None else fields
+
+        # (word id, row, field weight) for every word of every searchable value
+        word_ids: dict[str, int] = {}
+        hits = []
+        for column, weight in fields.items():
+            if column not in base.columns:
+                continue
+            values = base[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                codes, uniques = pd.factorize(values)  # None / NaN -> -1
+            # Tokenize each distinct value once, then give its words to every row holding it
+            value_of, word_of = [], []
+            for i, value in enumerate(uniques.tolist()):
+                for word in dict.fromkeys(tokenize(value)):
+                    value_of.append(i)
+                    word_of.append(word_ids.setdefault(word, len(word_ids)))
+            if not word_of:
+                continue
+            value_words = _offsets(np.asarray(value_of, dtype=np.int64), len(uniques))
+            rows = np.flatnonzero(codes >= 0)
+            row_codes = codes[rows]
+            per_row = np.diff(value_words)[row_codes]
+            runs = np.cumsum(per_row) - per_row
+            within = np.arange(int(per_row.sum())) - np.repeat(runs, per_row)
+            hits.append((
+                np.asarray(word_of, dtype=np.int64)[np.repeat(value_words[row_codes], per_row) + within],
+                np.repeat(rows, per_row),
+                np.full(len(within), weight, dtype=np.float32),
+            ))
+        words, rows, weights = (
+            (np.concatenate(part) for part in zip(*hits)) if hits
+            else (np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float32))
+        )
+
+        # Number the words in sorted order and keep each row's best weight per word
+        vocab = sorted(word_ids)
+        rank = np.empty(len(vocab), dtype=np.int64)
+        rank[[word_ids[word] for word in vocab]] = np.arange(len(vocab))
+        words = rank[words]
+        order = np.lexsort((-weights, rows, words))
+        words, rows, weights = words[order], rows[order], weights[order]
+        first = np.ones(len(words), dtype=bool)
+        first[1:] = (words[1:] != words[:-1]) | (rows[1:] != rows[:-1])
+        words, rows, weights = words[first], rows[first], weights[first]
+
+        gram_ids: dict[str, int] = {}
+        gram_of, word_of = [], []
+        gram_counts = np.empty(len(vocab), dtype=np.int32)
+        for i, word in enumerate(vocab):
+            grams = trigrams(word)
+            gram_counts[i] = len(grams)
+            for gram in grams:
+                gram_of.append(gram_ids.setdefault(gram, len(gram_ids)))
+                word_of.append(i)
+        gram_of = np.asarray(gram_of, dtype=np.int64)
+        # Stable, so each gram's words stay in ascending id order
+        order = np.argsort(gram_of, kind="stable")
+
+        return cls(
+            base,
+            vocab,
+            _offsets(words, len(vocab)),
+            rows.astype(np.int32),
+            weights,
+            list(gram_ids),
+            _offsets(gram_of, len(gram_ids)),
+            np.asarray(word_of, dtype=np.int32)[order],
+            gram_counts,
+        )
+
+    def _words_with(self, gram: str) -> np.ndarray:
+        j = self.gram_ids.get(gram)
+        if j is None:
+            return self.gram_words[:0]
+        return self.gram_words[self.gram_offsets[j]:self.gram_offsets[j + 1]]
+
+    def _matching_words(self, term: str) -> dict[int, float]:
+        """Vocabulary word ids matching one query word, with their match quality."""
+        matches: dict[int, float] = {}
+
+        # Prefix matches (including the exact word) are a contiguous range of the sorted vocabulary
+        start = bisect.bisect_left(self.vocab, term)
+        end = bisect.bisect_left(self.vocab, term + "\uffff")
+        for i in range(start, end):
+            matches[i] = EXACT if self.vocab[i] == term else PREFIX
+
+        # Substring matches: candidates share every trigram of the term
+        if len(term) >= 3:
+            inner = [self._words_with(term[i : i + 3]) for i in range(len(term) - 2)]
+            for i in functools.reduce(np.intersect1d, inner).tolist():
+                if i not in matches and term in self.vocab[i]:
+                    matches[i] = SUBSTRING
+
+        # Fuzzy matches only when nothing matched literally, ranked by trigram similarity
+        if not matches and len(term) >= 3:
+            grams = trigrams(term)
+            ids, common = np.unique(np.concatenate([self._words_with(gram) for gram in grams]), return_counts=True)
+            similarity = common / (len(grams) + self.gram_counts[ids] - common)
+            keep = similarity >= FUZZY_THRESHOLD
+            for i, value in zip(ids[keep].tolist(), similarity[keep].tolist()):
+                matches[i] = FUZZY * value
+        return matches
+
+    def scores(self, query: str) -> np.ndarray | None:
+        """
+        Relevance of every base row for `query` (0 = no match), or None if the
+        query has no searchable words. Every query word must match a row.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return None
+
+        total = np.zeros(len(self.base), dtype=np.float32)
+        matched_all = np.ones(len(self.base), dtype=bool)
+        for term in dict.fromkeys(terms):
+            term_score = np.zeros(len(self.base), dtype=np.float32)
+            for word_id, quality in self._matching_words(term).items():
+                lo, hi = self.offsets[word_id], self.offsets[word_id + 1]
+                rows = self.postings[lo:hi]
+                term_score[rows] = np.maximum(term_score[rows], quality * self.weights[lo:hi])
+            matched_all &= term_score > 0
+            total += term_score
+        total[~matched_all] = 0
+        return total
+
+    def mask(self, query: str) -> np.ndarray:
+        """Boolean mask of base rows matching `query`; all rows if it has no searchable words."""
+        scores = self.scores(query)
+        if scores is None:
+            return np.ones(len(self.base), dtype=bool)
+        return scores > 0
+
+    def rank(self, selection: Selection, query: str) -> Selection:
+        """Order the rows of a selection by relevance to `query`, best first."""
+        scores = self.scores(query)
+        if scores is None:
+            return selection
+        return Selection(selection.base, _by_relevance(selection.rows, scores))
+
+    def search(self, query: str, limit: int = 20) -> pd.DataFrame:
+        """Best matches for `query` with a relevance column, for use outside the dashboard."""
+        scores = self.scores(query)
+        if scores is None:
+            return self.base.head(0)
+        rows = _by_relevance(np.arange(len(self.base)), scores)[:limit]
+        return self.base.iloc[rows].assign(relevance=scores[rows])
+
+
+def _by_relevance(rows: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    rows = rows[scores[rows] > 0]
+    # Stable sort keeps equally relevant rows in their existing order
+    return rows[np.argsort(-scores[rows], kind="stable")]
+
+
+_indexes = FrameRegistry(SearchIndex.build)
+
+
+def search_index(base: pd.DataFrame) -> SearchIndex:
+    """The process-wide search index for a base frame, built on first use."""
+    return _indexes.get(base)
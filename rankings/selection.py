@@ -0,0 +1,75 @@
+"""
+Lazy row selections over the shared, read-only rankings frame.
+
+`load_source()` hands every session the same base DataFrame. Filters narrow
+a `Selection` - an array of row positions into that frame - and columns are
+only copied out when a table or chart actually needs them.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from .ingest import with_rank_labels
+
+
+class Selection:
+    """Row positions into a shared base DataFrame - base order unless ranked or sorted."""
+
+    def __init__(self, base: pd.DataFrame, rows: np.ndarray | None = None):
+        self.base = base
+        self.rows = np.arange(len(base)) if rows is None else np.asarray(rows, dtype=np.intp)
+        self._fingerprint = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __repr__(self) -> str:
+        return f"Selection({len(self.rows)} of {len(self.base)} rows)"
+
+    @property
+    def empty(self) -> bool:
+        return len(self.rows) == 0
+
+    def fingerprint(self) -> str:
+        """Digest of the selected row positions (and their order), for use as a cache key."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(self.rows.tobytes(), digest_size=16)
+            digest.update(str(len(self.base)).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _derive(self, rows: np.ndarray) -> "Selection":
+        return Selection(self.base, rows)
+
+    def filter(self, mask) -> "Selection":
+        """Keep selected rows where a mask over the *base* frame is True."""
+        mask = np.asarray(mask, dtype=bool)
+        return self._derive(self.rows[mask[self.rows]])
+
+    def where(self, mask) -> "Selection":
+        """Keep selected rows where a mask over *this selection* is True."""
+        return self._derive(self.rows[np.asarray(mask, dtype=bool)])
+
+    def dropna(self, subset: list[str]) -> "Selection":
+        """Drop selected rows that are missing any of the given columns."""
+        keep = np.ones(len(self.rows), dtype=bool)
+        for col in subset:
+            keep &= self.column(col).notna().to_numpy()
+        return self.where(keep)
+
+    def head(self, n: int) -> "Selection":
+        return self._derive(self.rows[:n])
+
+    def column(self, name: str) -> pd.Series:
+        """Values of a single column for the selected rows."""
+        return self.base[name].iloc[self.rows]
+
+    def to_frame(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Materialize the selected rows, optionally projected to a subset of
+        columns (plus the label columns of rank columns among them).
+        """
+        frame = self.base if columns is None else self.base[with_rank_labels(columns, self.base.columns)]
+        return frame.iloc[self.rows]
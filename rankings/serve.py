@@ -0,0 +1,115 @@
+"""
+Multi-process dashboard server.
+
+    python -m rankings.serve                # one worker per core
+    python -m rankings.serve --workers 4 --port 8600
+
+`preswald run` serves every session from one process, so reruns - pandas
+filtering, figure building and JSON serialization, all holding the GIL -
+queue behind each other however many cores the machine has. This serves the
+same preswald app from `--workers` processes that accept connections on one
+listening socket. A dashboard session is one websocket connection, so it
+stays on the worker that accepted it for its whole life, together with its
+widget state and that worker's section and figure caches, while the kernel
+spreads new connections across the workers.
+
+Before the workers start, one short-lived process loads each data source,
+writing its Arrow ingest cache, its rankings store partitions and - with
+`snapshot = true` - its warm-start snapshot (see snapshot.py). Later files
+are ingested into the store by a single worker, its leader, and the other
+workers reload the store once it has written them (see store.py). Every worker then memory-maps the same files,
+so the typed columns and indexes are shared read-only through the page cache
+instead of being parsed and built once per worker.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+import toml
+
+from .snapshot import warm_start
+from .store import load_rankings
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8501
+# Tells worker processes, which uvicorn starts afresh, which script and config to serve
+SCRIPT_ENV = "RANKINGS_SERVE_SCRIPT"
+CONFIG_ENV = "RANKINGS_SERVE_CONFIG"
+
+
+def prepare_sources(config_path: str = "preswald.toml") -> None:
+    """Load every CSV data source once, writing the cache files the workers memory-map."""
+    for name, source in toml.load(config_path).get("data", {}).items():
+        if source.get("type", "csv") != "csv":
+            continue
+        start = time.perf_counter()
+        frame = load_rankings(name, config_path)
+        warm_start(frame, name, config_path, wait=True)
+        logger.info(f"[serve] Prepared {name} ({len(frame)} rows) in {time.perf_counter() - start:.2f}s")
+
+
+def _prepare(config_path: str) -> None:
+    from preswald.utils import configure_logging
+
+    configure_logging(config_path=config_path)
+    prepare_sources(config_path)
+
+
+def create_worker_app():
+    """uvicorn application factory, called once in each worker process."""
+    from preswald.main import create_app
+    from preswald.utils import configure_logging
+
+    configure_logging(config_path=os.environ[CONFIG_ENV])
+    return create_app(os.environ[SCRIPT_ENV])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the dashboard from several worker processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: one per core)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=None, help="default: [project] port in preswald.toml")
+    parser.add_argument("--config", default="preswald.toml")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    from preswald.utils import configure_logging
+
+    config = toml.load(args.config)
+    script = config.get("project", {}).get("entrypoint")
+    if not script or not os.path.exists(script):
+        print(f"Entrypoint script {script!r} from {args.config} not found", file=sys.stderr)
+        return 1
+    log_level = configure_logging(config_path=args.config)
+    port = args.port or config.get("project", {}).get("port", DEFAULT_PORT)
+
+    # In a process of its own, so the server process does not keep the data in memory
+    prepare = multiprocessing.get_context("spawn").Process(target=_prepare, args=(args.config,), name="prepare")
+    prepare.start()
+    prepare.join()
+    if prepare.exitcode != 0:
+        logger.warning("[serve] Preparing the data sources failed; each worker will load them itself")
+
+    os.environ[SCRIPT_ENV] = script
+    os.environ[CONFIG_ENV] = args.config
+    print(f"Serving {script} on http://localhost:{port} from {args.workers} workers")
+    uvicorn.run(
+        "rankings.serve:create_worker_app",
+        factory=True,
+        host=args.host,
+        port=port,
+        workers=args.workers,
+        loop="asyncio",
+        log_level=log_level.lower(),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
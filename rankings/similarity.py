@@ -0,0 +1,225 @@
+"""
+"Find similar universities" - nearest neighbours over the score indicators.
+
+Each indicator is min-max normalized to [0, 1] into a float32 matrix, with
+missing scores kept as NaN. The distance between two institutions is the
+weighted RMS (euclidean) or mean absolute (manhattan) difference over the
+indicators both of them report, so a missing score neither counts as a
+match nor as a zero. Distances are therefore in [0, 1] and
+`1 - distance` reads as a similarity.
+
+Queries are computed in vectorized batches. On large frames, rows with
+every indicator present are also held in a KD-tree (when scipy is
+installed) per metric and weighting, and only the incomplete rows are
+scanned; the results are exact either way.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .ingest import SCORE_COLUMNS
+from .registry import FrameRegistry
+from .selection import Selection
+
+
+# The indicators behind the overall score - the overall score itself is their weighted sum
+SIMILARITY_COLUMNS = [col for col in SCORE_COLUMNS if col != "Overall SCORE"]
+METRICS = ("euclidean", "manhattan")
+
+# Below this many rows a batched scan beats building and querying a tree
+TREE_MIN_ROWS = 20_000
+
+# Rows scanned per batch, bounding the temporary (rows x indicators) arrays
+BATCH_ROWS = 65_536
+
+# Trees kept per index, one per metric and weighting used
+MAX_TREES = 4
+
+
+def _normalize(base: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    matrix = np.empty((len(base), len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        values = base[col].to_numpy(dtype=np.float32, na_value=np.nan)
+        finite = values[np.isfinite(values)]
+        low, high = (finite.min(), finite.max()) if len(finite) else (0.0, 0.0)
+        matrix[:, j] = (values - low) / (high - low) if high > low else np.where(np.isnan(values), np.nan, 0.0)
+    return matrix
+
+
+class SimilarityIndex:
+    """Normalized indicator matrix of a base frame, for nearest-neighbour queries."""
+
+    def __init__(self, base: pd.DataFrame, columns: list[str], matrix: np.ndarray):
+        self.base = base
+        self.columns = columns
+        self.matrix = matrix
+        self.present = ~np.isnan(matrix)
+        self.complete = np.flatnonzero(self.present.all(axis=1))
+        self.incomplete = np.flatnonzero(~self.present.all(axis=1))
+        self._trees: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, base: pd.DataFrame, columns: list[str] | None = None) -> "SimilarityIndex":
+        columns = SIMILARITY_COLUMNS if columns is None else list(columns)
+        return cls(base, columns, _normalize(base, columns))
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    def weights(self, weights: dict[str, float] | None = None) -> np.ndarray:
+        """Per-indicator weight vector; indicators missing from `weights` get 0."""
+        if weights is None:
+            return np.ones(len(self.columns), dtype=np.float32)
+        unknown = set(weights) - set(self.columns)
+        if unknown:
+            raise KeyError(f"Not similarity indicators: {sorted(unknown)}")
+        vector = np.array([weights.get(col, 0.0) for col in self.columns], dtype=np.float32)
+        if (vector < 0).any() or not vector.any():
+            raise ValueError("Weights must be non-negative with at least one indicator weighted")
+        return vector
+
+    def distances(
+        self,
+        queries: np.ndarray,
+        candidates: np.ndarray | None = None,
+        weights: dict[str, float] | None = None,
+        metric: str = "euclidean",
+    ) -> np.ndarray:
+        """
+        Distances from each query row to each candidate row (all rows if None),
+        as a (queries x candidates) float32 array. Pairs that share no weighted
+        indicator are infinitely far apart.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+        w = self.weights(weights)
+        queries = np.atleast_1d(np.asarray(queries, dtype=np.intp))
+        candidates = np.arange(len(self.base)) if candidates is None else np.asarray(candidates, dtype=np.intp)
+        out = np.empty((len(queries), len(candidates)), dtype=np.float32)
+        for i, query in enumerate(queries):
+            q, q_present = self.matrix[query], self.present[query]
+            for start in range(0, len(candidates), BATCH_ROWS):
+                batch = candidates[start : start + BATCH_ROWS]
+                out[i, start : start + len(batch)] = self._scan(q, q_present, batch, w, metric)
+        return out
+
+    def _scan(self, q, q_present, rows: np.ndarray, w: np.ndarray, metric: str) -> np.ndarray:
+        shared = self.present[rows] & q_present
+        diff = np.abs(self.matrix[rows] - q)
+        if metric == "euclidean":
+            diff *= diff
+        np.copyto(diff, 0, where=~shared)
+        shared_weight = shared @ w
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dist = (diff @ w) / shared_weight
+        if metric == "euclidean":
+            np.sqrt(dist, out=dist)
+        dist[shared_weight == 0] = np.inf
+        return dist
+
+    def _tree(self, w: np.ndarray, metric: str):
+        """KD-tree over the complete rows, scaled so tree distances equal `_scan` distances."""
+        key = (metric, w.tobytes())
+        with self._lock:
+            tree = self._trees.get(key)
+        if tree is None:
+            from scipy.spatial import cKDTree
+
+            tree = cKDTree(self.matrix[self.complete] * self._scale(w, metric))
+            with self._lock:
+                if len(self._trees) >= MAX_TREES:
+                    self._trees.pop(next(iter(self._trees)))
+                self._trees[key] = tree
+        return tree
+
+    @staticmethod
+    def _scale(w: np.ndarray, metric: str) -> np.ndarray:
+        share = w / w.sum()
+        return np.sqrt(share) if metric == "euclidean" else share
+
+    def _use_tree(self, query: int, candidates: Selection | None) -> bool:
+        if candidates is not None or len(self.base) < TREE_MIN_ROWS or not self.present[query].all():
+            return False
+        try:
+            import scipy.spatial  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def similar(
+        self,
+        row: int,
+        k: int = 20,
+        weights: dict[str, float] | None = None,
+        metric: str = "euclidean",
+        candidates: Selection | None = None,
+    ) -> tuple[Selection, np.ndarray]:
+        """
+        The `k` rows nearest to base row `row` (excluding itself), closest
+        first with ties in base order, and their distances. `candidates`
+        limits the search to a selection, e.g. the dashboard's filtered rows.
+        """
+        if self._use_tree(row, candidates):
+            rows, dist = self._similar_tree(row, k, weights, metric)
+        else:
+            pool = np.arange(len(self.base)) if candidates is None else candidates.rows
+            pool = pool[pool != row]
+            dist = self.distances(row, pool, weights, metric)[0]
+            rows, dist = _nearest(pool, dist, k)
+        return Selection(self.base, rows), dist
+
+    def _similar_tree(self, row: int, k: int, weights, metric: str) -> tuple[np.ndarray, np.ndarray]:
+        w = self.weights(weights)
+        scale = self._scale(w, metric)
+        # One extra neighbour, since the query row itself is in the tree
+        count = min(k + 1, len(self.complete))
+        tree_dist, found = self._tree(w, metric).query(self.matrix[row] * scale, k=count, p=2 if metric == "euclidean" else 1)
+        tree_rows = self.complete[np.atleast_1d(found)]
+        tree_dist = np.atleast_1d(tree_dist).astype(np.float32)
+        # Rows missing some indicator are not in the tree and are scanned instead
+        scan_dist = self.distances(row, self.incomplete, weights, metric)[0]
+        rows = np.concatenate((tree_rows, self.incomplete))
+        dist = np.concatenate((tree_dist, scan_dist))
+        keep = rows != row
+        return _nearest(rows[keep], dist[keep], k)
+
+
+def _nearest(rows: np.ndarray, dist: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """The `k` finite distances smallest first (ties by row position), in O(n + k log k)."""
+    finite = np.isfinite(dist)
+    rows, dist = rows[finite], dist[finite]
+    if len(rows) > k:
+        # Take every row tied with the k-th distance so ties resolve by position, not partition order
+        kth = np.partition(dist, k - 1)[k - 1] if k > 0 else -np.inf
+        near = dist <= kth
+        rows, dist = rows[near], dist[near]
+    order = np.lexsort((rows, dist))[:k]
+    return rows[order], dist[order]
+
+
+_indexes = FrameRegistry(SimilarityIndex.build)
+
+
+def similarity_index(base: pd.DataFrame) -> SimilarityIndex:
+    """The process-wide similarity index for a base frame, built on first use."""
+    return _indexes.get(base)
+
+
+def find_similar(
+    base: pd.DataFrame,
+    row: int,
+    k: int = 20,
+    weights: dict[str, float] | None = None,
+    metric: str = "euclidean",
+    candidates: Selection | None = None,
+) -> pd.DataFrame:
+    """
+    The `k` institutions most like base row `row` as a frame of their rows
+    with `distance` and `similarity` (1 - distance) columns, for use outside
+    the dashboard.
+    """
+    rows, dist = similarity_index(base).similar(row, k, weights, metric, candidates)
+    return rows.to_frame().assign(distance=dist, similarity=1 - dist)
@@ -0,0 +1,192 @@
+"""
+Warm-start snapshots of the structures built over a loaded data source.
+
+The typed frame itself is memory-mapped from the ingest cache, but the
+search index and aggregation cube take far longer to build than the frame
+takes to load. With `snapshot = true` in a source's preswald.toml table,
+they are written - with the dropdown option lists and the score index the
+dashboard always reads - to `<cache_dir>/snapshots/` once built, keyed by
+the checksum of the data they describe. A new worker process then
+memory-maps the arrays and registers them for its frame instead of
+building anything, so it is ready as soon as the frame is.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from .cube import AggregationCube, _cubes, aggregation_cube
+from .filters import filter_engine
+from .ingest import CATEGORY_COLUMNS, DEFAULT_CACHE_DIR, SCHEMA_VERSION, read_source_config
+from .score_index import ScoreIndex, score_index
+from .score_index import _indexes as _score_indexes
+from .search import SearchIndex, search_index
+from .search import _indexes as _search_indexes
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout below (or of the structures it saves) changes so old snapshots are ignored
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_SCORE_COLUMNS = ["Overall SCORE"]
+
+_SNAPSHOT_NAME = re.compile(r"^(.+)-[0-9a-f]{16}-v\d+\.\d+$")
+_SEARCH_ARRAYS = ["offsets", "postings", "weights", "gram_offsets", "gram_words", "gram_counts"]
+_CUBE_ARRAYS = ["rows", "count", "total", "low", "high", "top_row", "sketch"]
+
+# Frames whose snapshot has been looked for, by id
+_started: dict[int, weakref.ref] = {}
+_started_lock = threading.Lock()
+
+
+def snapshot_path(base: pd.DataFrame, source_name: str, config_path: str = "preswald.toml") -> str | None:
+    """Where the snapshot of a frame loaded from `source_name` lives, or None without `snapshot = true`."""
+    source = read_source_config(source_name, config_path)
+    checksum = base.attrs.get("checksum")
+    if not source.get("snapshot") or not checksum:
+        return None
+    name = f"{source_name}-{checksum[:16]}-v{SCHEMA_VERSION}.{SNAPSHOT_FORMAT}"
+    return os.path.join(source.get("cache_dir", DEFAULT_CACHE_DIR), "snapshots", name)
+
+
+def _write_lines(path: str, words: list[str]) -> None:
+    # Vocabulary words are [0-9a-z]+ and trigrams are drawn from them, so neither holds a newline
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(words))
+
+
+def _read_lines(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    return text.split("\n") if text else []
+
+
+def write_snapshot(base: pd.DataFrame, path: str) -> None:
+    """Build (or reuse) the structures of `base` and save them to `path`, replacing it atomically."""
+    index = search_index(base)
+    cube = aggregation_cube(base)
+    engine = filter_engine(base)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp_path)
+        for name in _SEARCH_ARRAYS:
+            np.save(os.path.join(tmp_path, f"search-{name}.npy"), getattr(index, name))
+        _write_lines(os.path.join(tmp_path, "search-vocab.txt"), index.vocab)
+        _write_lines(os.path.join(tmp_path, "search-grams.txt"), index.grams)
+
+        for name in _CUBE_ARRAYS:
+            np.save(os.path.join(tmp_path, f"cube-{name}.npy"), getattr(cube, name))
+        cube.keys.to_pickle(os.path.join(tmp_path, "cube-keys.pkl"))
+
+        for i, column in enumerate(SNAPSHOT_SCORE_COLUMNS):
+            if column in base.columns:
+                scores = score_index(base, column)
+                np.save(os.path.join(tmp_path, f"score-{i}-order.npy"), scores.order)
+                np.save(os.path.join(tmp_path, f"score-{i}-values.npy"), scores.sorted_values)
+
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "rows": len(base),
+            "columns": [str(col) for col in base.columns],
+            "cube_columns": cube.columns,
+            "score_columns": [col for col in SNAPSHOT_SCORE_COLUMNS if col in base.columns],
+            "options": {col: engine.options(col) for col in CATEGORY_COLUMNS if col in base.columns},
+        }
+        # Written last: a directory without it is never read
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+        logger.info(f"[snapshot] Saved {path}")
+        _prune(path)
+    except OSError as e:
+        # Including another worker having saved the same snapshot first
+        if not os.path.isdir(path):
+            logger.warning(f"Could not save snapshot {path}: {e}")
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def _prune(path: str) -> None:
+    """Remove the source's other snapshots; processes that mapped one keep their mapping."""
+    directory, name = os.path.split(path)
+    source_name = _SNAPSHOT_NAME.match(name).group(1)
+    for other in os.listdir(directory):
+        match = _SNAPSHOT_NAME.match(other)
+        if match and match.group(1) == source_name and other != name:
+            shutil.rmtree(os.path.join(directory, other), ignore_errors=True)
+
+
+def read_snapshot(base: pd.DataFrame, path: str) -> bool:
+    """
+    Memory-map the snapshot at `path` and register its structures for `base`.
+    Returns False, registering nothing, if it is missing or does not match.
+    """
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["format"] != SNAPSHOT_FORMAT or meta["rows"] != len(base) or meta["columns"] != [str(col) for col in base.columns]:
+            logger.warning(f"[snapshot] Ignoring {path}: it does not match the loaded frame")
+            return False
+
+        def array(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        index = SearchIndex(
+            base,
+            _read_lines(os.path.join(path, "search-vocab.txt")),
+            *(array(f"search-{name}") for name in _SEARCH_ARRAYS[:3]),
+            _read_lines(os.path.join(path, "search-grams.txt")),
+            *(array(f"search-{name}") for name in _SEARCH_ARRAYS[3:]),
+        )
+        cube = AggregationCube(
+            pd.read_pickle(os.path.join(path, "cube-keys.pkl")),
+            *(array(f"cube-{name}") for name in _CUBE_ARRAYS),
+            meta["cube_columns"],
+        )
+        scores = {
+            column: ScoreIndex(base, array(f"score-{i}-order"), array(f"score-{i}-values"))
+            for i, column in enumerate(meta["score_columns"])
+        }
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"[snapshot] Ignoring unreadable snapshot {path}: {e}")
+        return False
+
+    _search_indexes.put(base, index)
+    _cubes.put(base, cube)
+    for column, value in scores.items():
+        _score_indexes.put(base, value, column)
+    engine = filter_engine(base)
+    for column, values in meta["options"].items():
+        engine._options.setdefault(column, values)
+    return True
+
+
+def warm_start(base: pd.DataFrame, source_name: str, config_path: str = "preswald.toml", wait: bool = False) -> None:
+    """
+    Register the structures of `base` from its snapshot, or - if it has none
+    yet - build and save them, in a background thread unless `wait`. Only the
+    first call for a frame does anything.
+    """
+    with _started_lock:
+        ref = _started.get(id(base))
+        if ref is not None and ref() is base:
+            return
+        for key in [key for key, ref in _started.items() if ref() is None]:
+            del _started[key]
+        _started[id(base)] = weakref.ref(base)
+
+    path = snapshot_path(base, source_name, config_path)
+    if path is None or (os.path.isdir(path) and read_snapshot(base, path)):
+        return
+    if wait:
+        write_snapshot(base, path)
+    else:
+        threading.Thread(target=write_snapshot, args=(base, path), name=f"snapshot-{source_name}", daemon=True).start()
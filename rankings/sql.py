@@ -0,0 +1,179 @@
+"""
+Compile the dashboard's filter state into one SQL statement for `query()`.
+
+The same criteria dict used by the filter engine (region, country, size,
+status, focus, min_ar_score, overall_above, search) is turned into a single
+SELECT with only the requested columns, so filtering and projection run in
+preswald's DuckDB engine. Statement templates are cached by their shape
+(which predicates are active, projection, ordering); widget values are bound
+into the cached template as escaped literals because `query()` does not
+accept bind parameters.
+
+preswald loads a CSV source into DuckDB straight from its file. Once the
+rankings store applies updates to the frame the dashboard serves, a
+`FrameTable` serves `query()` from that frame instead (see watch.py), so
+both paths filter the same data.
+"""
+
+import functools
+import uuid
+
+import pandas as pd
+
+from .ingest import show_rank_labels
+from .search import SEARCH_FIELDS, tokenize
+
+
+# CSV sources are loaded into DuckDB as text, so numeric predicates cast first
+_NUMERIC_COLUMNS = {"min_ar_score": "AR SCORE", "overall_above": "Overall SCORE"}
+_EQUALITY_COLUMNS = {"region": "Region", "country": "Country/Territory", "size": "Size", "focus": "Focus"}
+
+
+def quote_identifier(name: str) -> str:
+    if "?" in name:
+        raise ValueError(f"Column names may not contain '?': {name!r}")
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_literal(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int | float):
+        return repr(value)
+    if hasattr(value, "item"):  # numpy scalars
+        return quote_literal(value.item())
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _numeric(column: str) -> str:
+    return f"TRY_CAST({quote_identifier(column)} AS DOUBLE)"
+
+
+def _predicate(name: str, arity: int) -> str:
+    """SQL for one predicate with `arity` placeholders."""
+    if name in _EQUALITY_COLUMNS:
+        return f"{quote_identifier(_EQUALITY_COLUMNS[name])} = ?"
+    if name == "status":
+        if arity == 0:
+            return "FALSE"
+        return f"{quote_identifier('Status')} IN ({', '.join(['?'] * arity)})"
+    if name == "min_ar_score":
+        return f"{_numeric(_NUMERIC_COLUMNS[name])} >= ?"
+    if name == "overall_above":
+        return f"{_numeric(_NUMERIC_COLUMNS[name])} > ?"
+    if name == "search":
+        # Every search word must appear in at least one searchable field
+        fields = " OR ".join(
+            f"strip_accents(lower(coalesce({quote_identifier(column)}, ''))) LIKE ?" for column in SEARCH_FIELDS
+        )
+        return " AND ".join([f"({fields})"] * arity)
+    raise KeyError(f"Unknown filter predicate: {name!r}")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_statement(
+    source: str,
+    shape: tuple[tuple[str, int], ...],
+    columns: tuple[str, ...] | None = None,
+    order_by: str | None = None,
+    descending: bool = True,
+    limit: int | None = None,
+) -> str:
+    """Statement template with `?` placeholders for a given predicate shape."""
+    projection = "*" if columns is None else ", ".join(quote_identifier(col) for col in columns)
+    sql = f"SELECT {projection} FROM {source}"
+    if shape:
+        sql += " WHERE " + " AND ".join(_predicate(name, arity) for name, arity in shape)
+    if order_by is not None:
+        direction = "DESC" if descending else "ASC"
+        sql += f" ORDER BY {_numeric(order_by)} {direction} NULLS LAST"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return sql
+
+
+def bind(template: str, params: list) -> str:
+    """Substitute `?` placeholders in a compiled template with escaped literals."""
+    parts = template.split("?")
+    if len(parts) != len(params) + 1:
+        raise ValueError(f"Statement expects {len(parts) - 1} parameters, got {len(params)}")
+    out = [parts[0]]
+    for value, part in zip(params, parts[1:], strict=True):
+        out.append(quote_literal(value))
+        out.append(part)
+    return "".join(out)
+
+
+def build_query(
+    source: str,
+    criteria: dict,
+    columns: list[str] | None = None,
+    order_by: str | None = None,
+    descending: bool = True,
+    limit: int | None = None,
+) -> str:
+    """
+    SQL selecting the rows that match `criteria` (as passed to `FilterEngine.select`).
+
+    Search words are matched as case- and accent-insensitive substrings; the
+    prefix ranking and typo tolerance of the in-memory search index are not
+    available in SQL, so a search can match fewer rows here than through
+    `FilterEngine.select` - hello.py filters searches with the engine.
+    Note that preswald rewrites every occurrence of the source name in the
+    statement, including inside literals.
+    """
+    shape, params = [], []
+    for name, value in criteria.items():
+        if value is None:
+            continue
+        if name == "status":
+            values = tuple(value)
+            shape.append((name, len(values)))
+            params.extend(values)
+        elif name == "search":
+            words = tokenize(value)
+            if not words:
+                continue
+            shape.append((name, len(words)))
+            for word in words:
+                params.extend([f"%{word}%"] * len(SEARCH_FIELDS))
+        else:
+            shape.append((name, 1))
+            params.append(value)
+
+    template = compile_statement(
+        source, tuple(shape), None if columns is None else tuple(columns), order_by, descending, limit
+    )
+    return bind(template, params)
+
+
+class FrameTable:
+    """
+    Serves preswald's `query()` for a data source from a typed frame rather
+    than from its file. Rank columns hold their published labels, as in the
+    file. Stands in for preswald's `CSVSource` in the data manager.
+    """
+
+    def __init__(self, name: str, frame: pd.DataFrame, duckdb_conn):
+        self.name = name
+        self.checksum = frame.attrs.get("checksum")
+        self._duckdb = duckdb_conn
+        self._table_name = f"frame_{uuid.uuid4().hex[:8]}"
+        view = f"{self._table_name}_view"
+        duckdb_conn.register(view, show_rank_labels(frame))
+        try:
+            duckdb_conn.execute(f"CREATE TABLE {self._table_name} AS SELECT * FROM {view}")
+        finally:
+            duckdb_conn.unregister(view)
+
+    def __repr__(self) -> str:
+        return f"FrameTable({self.name!r}, table={self._table_name!r})"
+
+    def query(self, sql: str) -> pd.DataFrame:
+        # Like preswald's sources: the source name stands for the table
+        return self._duckdb.execute(sql.replace(self.name, self._table_name)).df()
+
+    def to_df(self) -> pd.DataFrame:
+        return self._duckdb.execute(f"SELECT * FROM {self._table_name}").df()
@@ -0,0 +1,659 @@
+"""
+Multi-year, append-only rankings store.
+
+Each edition of the rankings (the year in its `<year> Rank` header) is
+ingested once into a typed Parquet partition, and per-indicator updates
+published between editions are kept as partitions of their own and applied
+on top of their edition when it is read. Nothing stored is ever rewritten:
+a corrected edition or a new update is a new partition, recorded in an
+append-only manifest, so only new files are parsed when they arrive.
+
+Institutions are identified across editions by a dense integer ID assigned
+once per (name, country) key in the institution index. Every partition
+carries an `Institution ID` column, so comparing editions is a positional
+join - an ID -> row array per edition - rather than a merge of whole tables
+on names.
+
+Several processes may open the same store (see serve.py). Writes take an
+exclusive lock on `store.lock` and re-read the manifest first, so an entry
+is never lost to a process writing from a stale copy and every process sees
+the same institution IDs. Only one process - the one holding `leader.lock` -
+ingests new files during `sync()`; the others wait for it to store the file
+they loaded and otherwise just reload the manifest.
+"""
+
+import contextlib
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .ingest import DEFAULT_CACHE_DIR, SCORE_COLUMNS, file_checksum, is_rank_column, load_source, rank_label_column, read_csv_typed, read_source_config, source_checksum
+from .registry import FrameRegistry, set_source
+
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: processes do not coordinate, so serve a store from one process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 1
+
+ID_COLUMN = "Institution ID"
+# Editions are stored with their `<year> Rank` column renamed, so every partition has the same schema
+RANK_COLUMN = "Rank"
+# Banded ranks ('701-750', '1401+') are stored as their leading number beside their label column;
+# these flag the exact ones
+EXACT_COLUMNS = {RANK_COLUMN: "Rank Exact", "Previous Rank": "Previous Rank Exact"}
+# Columns identifying a row of an update file; everything else in it must be a score or rank
+UPDATE_KEY_COLUMNS = ["Institution Name", "Country/Territory"]
+
+_EDITION_RANK = re.compile(r"^(\d{4}) Rank$")
+_EXACT_RANK = re.compile(r"^\s*\d+\s*=?\s*$")
+_LEADING_YEAR = re.compile(r"^(\d{4})\b")
+# Seconds a process that does not ingest waits for the leader to store the file it loaded
+INGEST_WAIT = 30.0
+
+
+def edition_year(columns) -> int | None:
+    """The edition year of a rankings table, from its `<year> Rank` column."""
+    for col in columns:
+        match = _EDITION_RANK.match(str(col))
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def institution_keys(frame: pd.DataFrame) -> pd.Series:
+    """
+    Normalized `name|country` key of each row. Repeats of a key within the
+    frame get an occurrence suffix so that every row keeps its own key.
+    """
+    def normalize(values: pd.Series) -> pd.Series:
+        return values.astype("string").fillna("").str.strip().str.replace(r"\s+", " ", regex=True).str.casefold()
+
+    keys = normalize(frame["Institution Name"]) + "|" + normalize(frame["Country/Territory"])
+    occurrence = keys.groupby(keys, sort=False).cumcount()
+    repeated = occurrence > 0
+    if repeated.any():
+        keys = keys.where(~repeated, keys + "#" + occurrence.astype("string"))
+    return keys.reset_index(drop=True)
+
+
+def _edition_columns(year: int) -> dict[str, str]:
+    """Stored names of the columns of edition `year` that name its year."""
+    return {f"{year} Rank": RANK_COLUMN, rank_label_column(f"{year} Rank"): rank_label_column(RANK_COLUMN)}
+
+
+def _exact_ranks(frame: pd.DataFrame, column: str) -> np.ndarray:
+    """Whether each label of rank column `column` is an exact rank rather than a band."""
+    label = rank_label_column(column)
+    if label not in frame.columns:
+        return np.zeros(len(frame), dtype=bool)
+    return frame[label].astype("string").str.match(_EXACT_RANK).to_numpy(dtype=bool, na_value=False)
+
+
+def _write_parquet(frame: pd.DataFrame, path: str) -> None:
+    # Temporary file first, so a reader never sees a partial partition
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    """Hold an exclusive lock on `path` between processes."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        # Closing the file releases the lock
+        yield
+
+
+class RankingsStore:
+    """The editions and updates of one rankings source, stored under `directory`."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.entries: list[dict] = []
+        self._keys = pd.Index([], dtype="string")
+        self._manifest_stat: tuple | None = None
+        # Open while this process holds the leader lock
+        self._leader = None
+        self._lock = threading.RLock()
+        self._editions: dict[int, tuple[int, pd.DataFrame]] = {}
+        self._positions: dict[int, tuple[int, np.ndarray]] = {}
+        self._movements: dict[int, tuple[int, pd.DataFrame]] = {}
+        self._seen: dict[str, tuple] = {}
+        # (source frame, version, frame returned by sync, whether the store holds the source file)
+        self._frames: tuple | None = None
+        # (checksum, frame) of the loaded source file, whose edition shares the frame's columns
+        self._source: tuple[str, pd.DataFrame] | None = None
+        self._load()
+
+    def __repr__(self) -> str:
+        return f"RankingsStore({self.directory!r}, editions={self.editions}, institutions={len(self._keys)})"
+
+    @property
+    def version(self) -> int:
+        """Number of partitions stored - changes whenever anything is ingested."""
+        return len(self.entries)
+
+    @property
+    def editions(self) -> list[int]:
+        return sorted({entry["year"] for entry in self.entries if entry["kind"] == "edition"})
+
+    @property
+    def institution_count(self) -> int:
+        return len(self._keys)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> None:
+        """Read the manifest and institution index, unless the manifest is unchanged since the last read."""
+        try:
+            stat = os.stat(self._path("manifest.json"))
+            # Each write replaces the file, so its inode changes even within one mtime tick
+            manifest_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if manifest_stat == self._manifest_stat:
+                return
+            with open(self._path("manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise ValueError(f"Unsupported rankings store format {manifest.get('format')!r} in {self.directory}")
+        # The institution index is written before the manifest, so it covers every ID the entries use
+        self._keys = pd.Index(pd.read_parquet(self._path("institutions.parquet"))["Key"].astype("string"))
+        self.entries = manifest["entries"]
+        self._manifest_stat = manifest_stat
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """Hold the store's write lock, with the manifest as last written by any process."""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with _file_lock(self._path("store.lock")):
+                self._load()
+                yield
+
+    def _elect(self) -> bool:
+        """Whether this process ingests new files during `sync()`: the one holding the leader lock."""
+        if self._leader is not None or fcntl is None:
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        f = open(self._path("leader.lock"), "a+b")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return False
+        self._leader = f
+        logger.info(f"[store] This process ingests new files into {self.directory}")
+        return True
+
+    def _await(self, checksum: str) -> bool:
+        """
+        Wait until the leader has stored the file with `checksum`, or this
+        process becomes the leader. Returns whether it did.
+        """
+        deadline = time.monotonic() + INGEST_WAIT
+        while True:
+            with self._lock:
+                self._load()
+                if self._stored(checksum):
+                    return False
+            if self._elect():
+                return True
+            if time.monotonic() >= deadline:
+                logger.warning(f"[store] {checksum[:16]} was not stored in {self.directory} within {INGEST_WAIT:.0f}s; "
+                               "serving it without its updates and rank movement")
+                return False
+            time.sleep(0.25)
+
+    def _append(self, entry: dict, partition: pd.DataFrame, keys: pd.Index) -> None:
+        """
+        Write a partition, then the institution index, then the manifest that
+        references both. Called inside `_writing()`.
+        """
+        _write_parquet(partition, self._path(entry["file"]))
+        if len(keys) != len(self._keys):
+            # IDs are positions in the index, so it only ever grows at the end
+            _write_parquet(pd.DataFrame({"Key": keys}), self._path("institutions.parquet"))
+        entries = [*self.entries, entry]
+        tmp_path = self._path(f"manifest.json.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": MANIFEST_FORMAT, "entries": entries}, f, indent=1)
+        os.replace(tmp_path, self._path("manifest.json"))
+        self.entries, self._keys = entries, keys
+        stat = os.stat(self._path("manifest.json"))
+        self._manifest_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        logger.info(f"[store] Stored {entry['kind']} {entry['year']} ({entry['rows']} rows) from {entry['source']}")
+
+    def _stored(self, checksum: str) -> bool:
+        return any(entry["checksum"] == checksum for entry in self.entries)
+
+    # Ingest
+
+    def ingest_edition(self, path: str, frame: pd.DataFrame | None = None, checksum: str | None = None) -> int | None:
+        """
+        Store the rankings file at `path` as an edition, unless that exact file
+        is already stored. `frame` may pass its already typed contents. Returns
+        the edition year, or None when nothing new was stored.
+        """
+        checksum = checksum or file_checksum(path)
+        with self._writing():
+            if self._stored(checksum):
+                return None
+            frame = read_csv_typed(path) if frame is None else frame
+            year = edition_year(frame.columns)
+            if year is None:
+                raise ValueError(f"{path} has no '<year> Rank' column, so its edition is unknown")
+
+            keys = institution_keys(frame)
+            ids = self._keys.get_indexer(keys)
+            new = ids < 0
+            all_keys = self._keys.append(pd.Index(keys[new], dtype="string")) if new.any() else self._keys
+            ids[new] = np.arange(len(self._keys), len(all_keys))
+
+            partition = frame.rename(columns=_edition_columns(year)).reset_index(drop=True)
+            partition.insert(0, ID_COLUMN, ids.astype(np.int32))
+            for col, exact in EXACT_COLUMNS.items():
+                partition[exact] = _exact_ranks(partition, col)
+
+            entry = {
+                "kind": "edition",
+                "year": year,
+                "file": f"edition-{year}-{checksum[:16]}.parquet",
+                "checksum": checksum,
+                "source": path,
+                "rows": len(partition),
+                "ingested": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            }
+            self._append(entry, partition, all_keys)
+            return year
+
+    def ingest_update(self, path: str, year: int | None = None) -> int | None:
+        """
+        Store a per-indicator update for edition `year` (default: the year the
+        file name starts with, else the latest edition). The file has the
+        `Institution Name` and `Country/Territory` columns plus the score and
+        rank columns it revises; blank cells leave a value unchanged.
+        Returns the edition year, or None when nothing new was stored.
+        """
+        checksum = file_checksum(path)
+        with self._writing():
+            if self._stored(checksum):
+                return None
+            if year is None:
+                match = _LEADING_YEAR.match(os.path.basename(path))
+                year = int(match.group(1)) if match else max(self.editions, default=None)
+            if year not in self.editions:
+                raise ValueError(f"Update {path} is for edition {year}, which is not stored")
+
+            frame = read_csv_typed(path)
+            missing = [col for col in UPDATE_KEY_COLUMNS if col not in frame.columns]
+            if missing:
+                raise ValueError(f"Update {path} lacks the key columns {missing}")
+            values = [col for col in frame.columns if col not in UPDATE_KEY_COLUMNS]
+            labels = {rank_label_column(col) for col in values if is_rank_column(col)}
+            unknown = [col for col in values if col not in SCORE_COLUMNS and not is_rank_column(col) and col not in labels]
+            if unknown:
+                raise ValueError(f"Update {path} may only revise score and rank columns, got {unknown}")
+
+            ids = self._keys.get_indexer(institution_keys(frame))
+            known = ids >= 0
+            if not known.all():
+                logger.warning(f"[store] Ignoring {int((~known).sum())} rows of {path} for institutions not in any edition")
+            partition = frame.loc[known, values].reset_index(drop=True)
+            partition.insert(0, ID_COLUMN, ids[known].astype(np.int32))
+
+            entry = {
+                "kind": "update",
+                "year": year,
+                "file": f"update-{year}-{checksum[:16]}.parquet",
+                "checksum": checksum,
+                "source": path,
+                "rows": len(partition),
+                "columns": values,
+                "ingested": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            }
+            self._append(entry, partition, self._keys)
+            return year
+
+    def _changed_files(self, directory: str | None) -> list[str]:
+        """CSV files in `directory`, in name order, that are new or changed since the last sync."""
+        if not directory or not os.path.isdir(directory):
+            return []
+        changed = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.lower().endswith(".csv"):
+                continue
+            stat = os.stat(path)
+            if self._seen.get(path) != (stat.st_mtime_ns, stat.st_size):
+                changed.append(path)
+                self._seen[path] = (stat.st_mtime_ns, stat.st_size)
+        return changed
+
+    def sync(self, source_name: str, config_path: str = "preswald.toml", rescan: bool = False) -> pd.DataFrame:
+        """
+        Ingest whatever is new for a data source - the source file itself, and
+        CSV files in its `editions_dir` and `updates_dir` - and return the
+        source's edition, with its updates applied, in the source's layout.
+        In a process other than the store's leader nothing is ingested: the
+        store is reloaded with what the leader has stored. The returned frame
+        is the same object until something changes.
+
+        The directories and the manifest are only looked at on the first
+        call, when the source file has changed, or with `rescan` - which a
+        watcher (see watch.py) passes once it has seen the files change - so
+        a call per rerun costs a stat of the source file.
+        """
+        source = read_source_config(source_name, config_path)
+        frame = load_source(source_name, config_path)
+        with self._lock:
+            if not rescan and self._frames is not None and self._frames[0] is frame and self._frames[1] == self.version:
+                return self._frames[2]
+        checksum = source_checksum(source["path"], source.get("cache_dir", DEFAULT_CACHE_DIR))
+        if self._elect() or self._await(checksum):
+            self._ingest_new(source, frame, checksum)
+        with self._lock:
+            self._load()
+            if self._source is None or self._source[0] != checksum:
+                self._source = (checksum, frame)
+                # Editions built on the previous source frame would keep it alive
+                self._editions.clear()
+                self._movements.clear()
+            if self._frames is None or self._frames[0] is not frame or self._frames[1] != self.version:
+                year = edition_year(frame.columns)
+                # Until the leader has stored the file, the stored edition's rows are not the frame's
+                held = year in self.editions and self.entries[self._edition_entry(year)]["checksum"] == checksum
+                self._frames = (frame, self.version, self._current(frame, year) if held else frame, held)
+                set_source(self._frames[2], source_name)
+            return self._frames[2]
+
+    def _ingest_new(self, source: dict, frame: pd.DataFrame, checksum: str) -> None:
+        with self._lock:
+            for path in self._changed_files(source.get("editions_dir")):
+                try:
+                    self.ingest_edition(path)
+                except ValueError as e:
+                    logger.error(f"[store] Skipping edition file: {e}")
+            stat = os.stat(source["path"])
+            if self._seen.get(source["path"]) != (stat.st_mtime_ns, stat.st_size):
+                self.ingest_edition(source["path"], frame, checksum)
+                self._seen[source["path"]] = (stat.st_mtime_ns, stat.st_size)
+            for path in self._changed_files(source.get("updates_dir")):
+                try:
+                    self.ingest_update(path)
+                except ValueError as e:
+                    logger.error(f"[store] Skipping update file: {e}")
+
+    def _current(self, frame: pd.DataFrame, year: int) -> pd.DataFrame:
+        """The source frame, or a copy with the edition's updates applied."""
+        updates = self._updates(year)
+        if not updates:
+            return frame
+        edition = self.edition(year)
+        out = frame.copy(deep=False)
+        if frame.attrs.get("checksum"):
+            combined = "+".join([frame.attrs["checksum"], *(entry["checksum"] for entry in updates)])
+            out.attrs["checksum"] = hashlib.sha256(combined.encode()).hexdigest()
+        # Tells query() users the frame no longer matches the file preswald loaded into DuckDB
+        out.attrs["updates"] = len(updates)
+        renamed = _edition_columns(year)
+        for col in out.columns:
+            stored = edition[renamed.get(col, col)]
+            if not stored.equals(frame[col]):
+                out[col] = stored.values
+        return out
+
+    # Read
+
+    def _edition_entry(self, year: int) -> int:
+        indexes = [i for i, entry in enumerate(self.entries) if entry["kind"] == "edition" and entry["year"] == year]
+        if not indexes:
+            raise KeyError(f"No edition {year} in the rankings store (have {self.editions})")
+        return indexes[-1]
+
+    def _updates(self, year: int) -> list[dict]:
+        """Updates to the latest stored version of edition `year`, oldest first."""
+        if year not in self.editions:
+            return []
+        start = self._edition_entry(year)
+        return [entry for entry in self.entries[start + 1:] if entry["kind"] == "update" and entry["year"] == year]
+
+    def edition(self, year: int) -> pd.DataFrame:
+        """Edition `year` as stored (`Rank` for its `<year> Rank` column) with its updates applied."""
+        with self._lock:
+            cached = self._editions.get(year)
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            entry = self.entries[self._edition_entry(year)]
+            if self._source is not None and self._source[0] == entry["checksum"]:
+                # The loaded source file's edition: only the stored ID and exactness columns are read,
+                # the rest is shared with the source frame rather than held as a second copy
+                stored = pd.read_parquet(self._path(entry["file"]), columns=[ID_COLUMN, *EXACT_COLUMNS.values()])
+                frame = self._source[1].rename(columns=_edition_columns(year))
+                frame.insert(0, ID_COLUMN, stored[ID_COLUMN].to_numpy())
+                for col in EXACT_COLUMNS.values():
+                    frame[col] = stored[col].to_numpy()
+            else:
+                frame = pd.read_parquet(self._path(entry["file"]))
+            updates = self._updates(year)
+            if updates:
+                frame = frame.copy(deep=False)
+                rows_by_id = self._scatter(frame[ID_COLUMN].to_numpy())
+                renamed = _edition_columns(year)
+                for entry in updates:
+                    update = pd.read_parquet(self._path(entry["file"]))
+                    rows = rows_by_id[update[ID_COLUMN].to_numpy()]
+                    for col in entry["columns"]:
+                        target = renamed.get(col, col)
+                        if target not in frame.columns:
+                            continue
+                        hit = (rows >= 0) & update[col].notna().to_numpy()
+                        values = frame[target].array.copy()
+                        revised = update[col].array[hit]
+                        if isinstance(values, pd.Categorical):
+                            # Revised rank labels may be new categories
+                            values = values.add_categories(pd.Index(revised.categories).difference(values.categories))
+                            revised = np.asarray(revised, dtype=object)
+                        values[rows[hit]] = revised
+                        frame[target] = values
+                for col, exact in EXACT_COLUMNS.items():
+                    if rank_label_column(col) in frame.columns:
+                        frame[exact] = _exact_ranks(frame, col)
+            self._editions[year] = (self.version, frame)
+            return frame
+
+    def _scatter(self, ids: np.ndarray) -> np.ndarray:
+        """ID -> row position array (-1 where the ID is absent) for a partition's ID column."""
+        positions = np.full(len(self._keys), -1, dtype=np.int32)
+        positions[ids] = np.arange(len(ids), dtype=np.int32)
+        return positions
+
+    def positions(self, year: int) -> np.ndarray:
+        """Row of each institution ID in edition `year`, -1 where the institution is not ranked."""
+        with self._lock:
+            cached = self._positions.get(year)
+            if cached is None or cached[0] != self.version:
+                cached = self._positions[year] = (self.version, self._scatter(self.edition(year)[ID_COLUMN].to_numpy()))
+            return cached[1]
+
+    def previous_edition(self, year: int) -> int | None:
+        earlier = [y for y in self.editions if y < year]
+        return earlier[-1] if earlier else None
+
+    def movement(self, year: int) -> pd.DataFrame:
+        """
+        Year-over-year change of every institution in edition `year`, row for
+        row. When the previous year's edition is stored, ranks and scores are
+        joined from it by institution ID; otherwise the edition's own
+        `Previous Rank` column is used and score changes are unknown.
+        `Rank Change` is positive for a climb and only set where both ranks
+        are exact, not bands.
+        """
+        with self._lock:
+            cached = self._movements.get(year)
+            if cached is None or cached[0] != self.version:
+                cached = self._movements[year] = (self.version, self._movement(year))
+            return cached[1]
+
+    def movement_of(self, frame: pd.DataFrame) -> pd.DataFrame | None:
+        """
+        `movement()` of the edition in `frame`, a frame returned by `sync()`,
+        while the store still serves it - so the rows line up with `frame`'s.
+        None once the store has moved on to a newer frame, or while the leader
+        has not stored `frame`'s file yet.
+        """
+        year = edition_year(frame.columns)
+        with self._lock:
+            if year is None or self._frames is None or self._frames[2] is not frame or not self._frames[3]:
+                return None
+            return self.movement(year)
+
+    def _movement(self, year: int) -> pd.DataFrame:
+        current = self.edition(year)
+        rank_label, previous_label = rank_label_column(RANK_COLUMN), rank_label_column("Previous Rank")
+        # Stores written before rank labels were kept have none
+        labelled = rank_label in current.columns
+        out = current[[ID_COLUMN, "Institution Name", "Country/Territory", "Region", RANK_COLUMN, *([rank_label] if labelled else [])]]
+        exact = current[EXACT_COLUMNS[RANK_COLUMN]].to_numpy(dtype=bool)
+        previous_labels = None
+
+        previous_year = self.previous_edition(year)
+        if previous_year == year - 1:
+            previous = self.edition(previous_year)
+            rows = self.positions(previous_year)[current[ID_COLUMN].to_numpy()]
+            ranked = rows >= 0
+            take = np.where(ranked, rows, 0)
+            previous_rank = previous[RANK_COLUMN].array.take(take)
+            previous_rank[~ranked] = pd.NA
+            if labelled and rank_label in previous.columns:
+                previous_labels = previous[rank_label].array.take(np.where(ranked, rows, -1), allow_fill=True)
+            previous_exact = previous[EXACT_COLUMNS[RANK_COLUMN]].to_numpy(dtype=bool)[take] & ranked
+            for col in SCORE_COLUMNS:
+                if col in current.columns and col in previous.columns:
+                    before = previous[col].to_numpy(dtype=np.float32)[take]
+                    before[~ranked] = np.nan
+                    out[f"{col} Change"] = current[col].to_numpy(dtype=np.float32) - before
+        else:
+            previous_rank = current["Previous Rank"].array
+            if labelled and previous_label in current.columns:
+                previous_labels = current[previous_label].array
+            previous_exact = current[EXACT_COLUMNS["Previous Rank"]].to_numpy(dtype=bool) & current["Previous Rank"].notna().to_numpy()
+
+        out["Previous Rank"] = previous_rank
+        if previous_labels is not None:
+            out[previous_label] = previous_labels
+        change = pd.array(previous_rank, dtype="Int32") - current[RANK_COLUMN].array
+        change[~(exact & previous_exact)] = pd.NA
+        out["Rank Change"] = change
+        out["New Entry"] = pd.isna(out["Previous Rank"]).to_numpy()
+        changes = [col for col in out.columns if col.endswith(" SCORE Change")]
+        out = out[[col for col in out.columns if col not in changes] + changes]
+        out.attrs["previous_edition"] = previous_year if previous_year == year - 1 else None
+        return out
+
+    def trends(self, ids: np.ndarray | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Mean of each score column per stored edition over the institutions
+        `ids` (every ranked institution when None), with the number of those
+        institutions ranked in each edition. One row per edition.
+        """
+        columns = SCORE_COLUMNS if columns is None else columns
+        rows = []
+        for year in self.editions:
+            frame = self.edition(year)
+            if ids is None:
+                present = np.arange(len(frame))
+            else:
+                present = self.positions(year)[np.asarray(ids)]
+                present = present[present >= 0]
+            means = frame[[col for col in columns if col in frame.columns]].iloc[present].astype("float64").mean()
+            rows.append({"Edition": year, "Institutions": len(present), **means.to_dict()})
+        return pd.DataFrame(rows, columns=["Edition", "Institutions", *columns])
+
+    def history(self, institution_id: int, columns: list[str] | None = None) -> pd.DataFrame:
+        """One institution's rank and scores in every stored edition it was ranked in."""
+        columns = [RANK_COLUMN, *(SCORE_COLUMNS if columns is None else columns)]
+        rows = []
+        for year in self.editions:
+            row = self.positions(year)[institution_id]
+            if row >= 0:
+                frame = self.edition(year)
+                rows.append({"Edition": year, **{col: frame[col].iloc[row] for col in columns if col in frame.columns}})
+        return pd.DataFrame(rows)
+
+
+_stores: dict[str, RankingsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def rankings_store(source_name: str, config_path: str = "preswald.toml") -> RankingsStore | None:
+    """The process-wide store of a data source, or None if it has no `store_dir` in preswald.toml."""
+    directory = read_source_config(source_name, config_path).get("store_dir")
+    if not directory:
+        return None
+    directory = os.path.abspath(directory)
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = _stores[directory] = RankingsStore(directory)
+        return store
+
+
+def _movement_of(base: pd.DataFrame, source_name: str, config_path: str) -> pd.DataFrame | None:
+    store = rankings_store(source_name, config_path)
+    return None if store is None else store.movement_of(base)
+
+
+_movements = FrameRegistry(_movement_of)
+
+
+def rank_movement(base: pd.DataFrame, source_name: str, config_path: str = "preswald.toml") -> pd.DataFrame | None:
+    """
+    Rank movement of the institutions in `base` (a frame from
+    `load_rankings()`), row for row with it, as the store had it when `base`
+    was loaded - so a rerun holding `base` never pairs it with the movement of
+    a later reload. `movement.attrs["previous_edition"]` is the stored edition
+    it was compared with, or None for the file's `Previous Rank` column. None
+    without a store, or when `base` was replaced before its movement was taken.
+    """
+    return _movements.get(base, source_name, config_path)
+
+
+def load_rankings(source_name: str, config_path: str = "preswald.toml", rescan: bool = False) -> pd.DataFrame:
+    """
+    Like `load_source()`, but through the source's rankings store when
+    preswald.toml gives it a `store_dir`: the file is stored as an edition
+    the first time it is seen, new files in `editions_dir` and `updates_dir`
+    are ingested (on the first call, and after that with `rescan`, see
+    `RankingsStore.sync()`), and the frame returned has the edition's
+    updates applied.
+    """
+    store = rankings_store(source_name, config_path)
+    if store is None:
+        return load_source(source_name, config_path)
+    try:
+        return store.sync(source_name, config_path, rescan)
+    except ImportError:
+        logger.info("pyarrow is not installed - the rankings store is disabled")
+        return load_source(source_name, config_path)
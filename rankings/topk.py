@@ -0,0 +1,96 @@
+"""
+Top-k selection over a row selection.
+
+Rather than sorting the whole selection, the k-th best ranking value is
+found with a partial sort (`np.partition`, linear time), and only the rows
+at least that good - k plus any tied with the k-th - are fully ordered by
+the ranking key and the tie-break columns. Rows missing the ranking value
+are never returned.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+from .paging import _sort_key
+from .selection import Selection
+
+
+def _ascending_key(selection: Selection, column: str, descending: bool) -> np.ndarray:
+    # Smaller is better in every key; -NaN is still NaN
+    values = _sort_key(selection.column(column))
+    return -values if descending else values
+
+
+def _group_codes(values: pd.Series) -> np.ndarray:
+    """Sorted group codes (-1 for missing) in the smallest integer dtype, so grouping can radix sort."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+    else:
+        codes, _ = pd.factorize(values, sort=True)
+    return codes.astype(np.min_scalar_type(-max(int(codes.max(initial=0)), 1)))
+
+
+def _top_positions(selection: Selection, key: np.ndarray, k: int, then_by: Sequence[tuple[str, bool]]) -> np.ndarray:
+    """Positions within the selection of its top `k` rows by the ascending `key`, best first."""
+    candidates = np.flatnonzero(~np.isnan(key))
+    if k <= 0 or len(candidates) == 0:
+        return candidates[:0]
+    if len(candidates) > k:
+        kth = np.partition(key[candidates], k - 1)[k - 1]
+        candidates = candidates[key[candidates] <= kth]
+
+    # np.lexsort sorts by its last key first; the selection order settles any remaining ties
+    part = Selection(selection.base, selection.rows[candidates])
+    keys = [np.arange(len(candidates))]
+    for column, column_descending in reversed(list(then_by)):
+        tie_key = _ascending_key(part, column, column_descending)
+        # Missing tie-break values rank after present ones
+        keys.append(np.where(np.isnan(tie_key), np.inf, tie_key))
+    keys.append(key[candidates])
+    return candidates[np.lexsort(keys)[:k]]
+
+
+def top_k(
+    selection: Selection,
+    k: int,
+    by: str = "Overall SCORE",
+    descending: bool = True,
+    then_by: Sequence[tuple[str, bool]] = (),
+) -> Selection:
+    """
+    The `k` best rows of the selection by column `by`, best first.
+
+    Ties are broken by the `(column, descending)` pairs in `then_by`, in
+    order, and then by the selection's own order (rank order for the base
+    frame). Runs in O(n) plus a sort of the k-or-so best rows.
+    """
+    key = _ascending_key(selection, by, descending)
+    return Selection(selection.base, selection.rows[_top_positions(selection, key, k, then_by)])
+
+
+def top_k_per_group(
+    selection: Selection,
+    k: int,
+    group: str,
+    by: str = "Overall SCORE",
+    descending: bool = True,
+    then_by: Sequence[tuple[str, bool]] = (),
+) -> Selection:
+    """
+    The `k` best rows of each `group` value (e.g. the top 5 per Region),
+    groups in sorted order, each best first. Rows without a group value are
+    left out.
+    """
+    key = _ascending_key(selection, by, descending)
+    codes = _group_codes(selection.column(group))
+    present = np.flatnonzero(codes >= 0)
+    # Stable (radix) grouping pass keeps each group's rows in selection order
+    grouped = present[np.argsort(codes[present], kind="stable")]
+    bounds = np.flatnonzero(np.diff(codes[grouped])) + 1
+    rows = []
+    for positions in np.split(grouped, bounds) if len(grouped) else []:
+        members = Selection(selection.base, selection.rows[positions])
+        rows.append(members.rows[_top_positions(members, key[positions], k, then_by)])
+    return Selection(selection.base, np.concatenate(rows) if rows else selection.rows[:0])
@@ -0,0 +1,286 @@
+"""
+Hot reload of a dashboard data source.
+
+With `watch = true` in a source's preswald.toml table, `load_watched()`
+serves it through a `SourceWatcher`. The first call loads the source, then
+a daemon thread polls its file - and the rankings store's editions and
+updates directories and manifest - every `watch_interval` seconds. In a
+process that does not ingest into the store (see store.py), a file change
+is picked up once the ingesting process has rewritten the manifest.
+
+A change in modification time or size is only acted on once the files have
+stopped changing for a whole interval, so a file still being written is
+never read, and a file whose checksum is unchanged is not reloaded. Other
+changes are rebuilt in the background: the typed frame and store, the
+indexes and aggregates every rerun reads, the rank movement of the frame's
+edition (see `rank_movement()`), and the source's DuckDB table for
+`query()`, built from the new frame so it includes the store's updates. The new frame is then swapped in with one reference assignment.
+Reruns that started before the swap finish on the frame they already hold;
+the old snapshot's indexes and table are released `RELEASE_AFTER` seconds
+later, so the process only holds two snapshots while a swap is under way.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from .cube import aggregation_cube, extend_cube
+from .figures import figure_cache
+from .filters import filter_engine
+from .ingest import file_checksum, read_source_config
+from .registry import pin, release
+from .score_index import score_index
+from .search import search_index
+from .sections import section_cache
+from .snapshot import warm_start
+from .sql import FrameTable
+from .store import load_rankings, rank_movement
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WATCH_INTERVAL = 2.0
+# Seconds after a swap before the previous snapshot is released; reruns still using it by then
+# rebuild what they need for themselves
+RELEASE_AFTER = 60.0
+
+
+def warm_indexes(base: pd.DataFrame) -> None:
+    """Build what every dashboard rerun reads, so the first rerun on a new snapshot does not have to."""
+    section_cache(base)
+    figure_cache(base)
+    aggregation_cube(base)
+    filter_engine(base)
+    score_index(base, "Overall SCORE")
+    search_index(base)
+
+
+def _data_manager():
+    try:
+        from preswald.engine.service import PreswaldService
+
+        return PreswaldService.get_instance().data_manager
+    except (ImportError, RuntimeError):
+        return None
+
+
+def serve_query(source_name: str, frame: pd.DataFrame, rebuild: bool = False):
+    """
+    Point `query()` on a CSV source at `frame`, the frame the dashboard
+    serves, once it differs from the file preswald loaded - the rankings
+    store applied updates to it - or always with `rebuild`. Returns the data
+    source replaced, whose table the caller drops, or None.
+    """
+    manager = _data_manager()
+    if manager is None:
+        return None
+    from preswald.engine.managers.data import CSVSource
+
+    old = manager.sources.get(source_name)
+    if not isinstance(old, CSVSource | FrameTable):
+        return None
+    if isinstance(old, FrameTable) and old.checksum is not None and old.checksum == frame.attrs.get("checksum"):
+        return None
+    if isinstance(old, CSVSource) and not rebuild and not frame.attrs.get("updates"):
+        return None
+    # A DuckDB connection must not be shared between threads; a cursor is this thread's own
+    # connection to the same in-memory database, so the table is visible to queries
+    source = FrameTable(source_name, frame, manager.duckdb_conn.cursor())
+    source._duckdb = manager.duckdb_conn
+    manager.sources[source_name] = source
+    return old
+
+
+def _drop_table(source) -> None:
+    manager = _data_manager()
+    if source is not None and manager is not None:
+        manager.duckdb_conn.cursor().execute(f"DROP TABLE IF EXISTS {source._table_name}")
+
+
+def _csv_files(directory: str | None) -> list[str]:
+    if not directory or not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.lower().endswith(".csv")]
+
+
+class SourceWatcher:
+    """Serves one data source and swaps in a rebuilt snapshot when its files change."""
+
+    def __init__(self, source_name: str, config_path: str = "preswald.toml", interval: float = DEFAULT_WATCH_INTERVAL):
+        self.source_name = source_name
+        self.config_path = config_path
+        self.interval = interval
+        self.frame: pd.DataFrame | None = None
+        self.version = 0
+        # (mtime_ns, size) and checksum of each file behind the current frame
+        self._stats: dict[str, tuple] = {}
+        self._checksums: dict[str, str] = {}
+        self._pending: dict[str, tuple] | None = None
+        self._failed: dict[str, tuple] | None = None
+        self._retired: list[tuple[float, pd.DataFrame, object]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __repr__(self) -> str:
+        return f"SourceWatcher({self.source_name!r}, version={self.version}, files={len(self._stats)})"
+
+    def current(self) -> pd.DataFrame:
+        """The frame to serve this rerun. Only the first call loads; later ones never wait on disk."""
+        frame = self.frame
+        if frame is None:
+            with self._lock:
+                if self.frame is None:
+                    self._stats = self._stat()
+                    frame = load_rankings(self.source_name, self.config_path)
+                    pin(frame)
+                    # Taken before the watch thread starts, while the store still serves this frame
+                    rank_movement(frame, self.source_name, self.config_path)
+                    warm_start(frame, self.source_name, self.config_path)
+                    _drop_table(serve_query(self.source_name, frame))
+                    self.frame = frame
+                    self._thread = threading.Thread(target=self._run, name=f"watch-{self.source_name}", daemon=True)
+                    self._thread.start()
+                frame = self.frame
+        return frame
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _stat(self) -> dict[str, tuple]:
+        source = read_source_config(self.source_name, self.config_path)
+        paths = [source["path"]]
+        if source.get("store_dir"):
+            paths += _csv_files(source.get("editions_dir")) + _csv_files(source.get("updates_dir"))
+            paths.append(self._manifest_path(source))
+        stats = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def _manifest_path(self, source: dict | None = None) -> str | None:
+        source = source or read_source_config(self.source_name, self.config_path)
+        return os.path.join(source["store_dir"], "manifest.json") if source.get("store_dir") else None
+
+    def _checksum(self, stats: dict[str, tuple]) -> dict[str, str]:
+        """Checksums of the files in `stats`, reusing those of files that have not changed."""
+        return {
+            path: self._checksums[path] if self._stats.get(path) == stat and path in self._checksums else file_checksum(path)
+            for path, stat in stats.items()
+        }
+
+    def _run(self) -> None:
+        try:
+            # Checksums of the files as first loaded, for telling a touched file from a changed one
+            self._checksums = {path: file_checksum(path) for path in self._stats}
+        except OSError:
+            self._checksums = {}
+        while not self._stop.wait(self.interval):
+            try:
+                self._poll()
+            except Exception as e:
+                logger.error(f"[watch] Reloading {self.source_name} failed, still serving version {self.version}: {e}")
+            self._release_retired()
+
+    def _poll(self) -> None:
+        stats = self._stat()
+        if stats == self._stats or stats == self._failed:
+            self._pending = None
+            return
+        if stats != self._pending:
+            # Changed since the last poll - wait until the writer has finished
+            self._pending = stats
+            return
+        self._pending = None
+
+        checksums = self._checksum(stats)
+        if checksums == self._checksums:
+            self._stats = stats
+            return
+        try:
+            self._rebuild(stats, checksums)
+        except Exception:
+            # Not retried until the files change again
+            self._failed = stats
+            raise
+
+    def _rebuild(self, stats: dict[str, tuple], checksums: dict[str, str]) -> None:
+        start = time.perf_counter()
+        frame = load_rankings(self.source_name, self.config_path, rescan=True)
+        settled = self._stat()
+        # Ingesting the changed files in this process rewrites the manifest itself
+        manifest = self._manifest_path()
+        if {**settled, manifest: None} != {**stats, manifest: None}:
+            logger.info(f"[watch] {self.source_name} changed again while reloading; waiting for it to settle")
+            return
+        if manifest in settled and settled[manifest] != stats.get(manifest):
+            stats, checksums = settled, {**checksums, manifest: file_checksum(manifest)}
+        if frame is not self.frame:
+            pin(frame)
+            # Rows appended to the file are merged into the current cube rather than re-aggregating all
+            if extend_cube(frame, self.frame) is not None:
+                logger.info(f"[watch] Merged {len(frame) - len(self.frame)} appended rows into the aggregation cube")
+            warm_start(frame, self.source_name, self.config_path, wait=True)
+            self.warm(frame)
+            sql_source = serve_query(self.source_name, frame, rebuild=True)
+            old, self.frame = self.frame, frame
+            self.version += 1
+            self._retired.append((time.monotonic(), old, sql_source))
+            logger.info(f"[watch] Swapped in {self.source_name} version {self.version} ({len(frame)} rows) "
+                        f"after {time.perf_counter() - start:.2f}s")
+        self._stats, self._checksums = stats, checksums
+
+    def warm(self, frame: pd.DataFrame) -> None:
+        warm_indexes(frame)
+        # Registered with the frame, so reruns on it read the movement of the same store version
+        rank_movement(frame, self.source_name, self.config_path)
+
+    def _release_retired(self) -> None:
+        now = time.monotonic()
+        while self._retired and now - self._retired[0][0] >= RELEASE_AFTER:
+            _, frame, sql_source = self._retired.pop(0)
+            release(frame)
+            _drop_table(sql_source)
+            logger.debug(f"[watch] Released a previous snapshot of {self.source_name}")
+
+
+_watchers: dict[tuple[str, str], SourceWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def source_watcher(source_name: str, config_path: str = "preswald.toml") -> SourceWatcher | None:
+    """The process-wide watcher of a data source, or None if it does not set `watch = true`."""
+    key = (os.path.abspath(config_path), source_name)
+    watcher = _watchers.get(key)
+    if watcher is None:
+        source = read_source_config(source_name, config_path)
+        if not source.get("watch"):
+            return None
+        with _watchers_lock:
+            watcher = _watchers.get(key)
+            if watcher is None:
+                interval = float(source.get("watch_interval", DEFAULT_WATCH_INTERVAL))
+                watcher = _watchers[key] = SourceWatcher(source_name, config_path, interval)
+    return watcher
+
+
+def load_watched(source_name: str, config_path: str = "preswald.toml") -> pd.DataFrame:
+    """
+    The current snapshot of a data source when it is watched (`watch = true`),
+    otherwise `load_rankings()`. Either way its indexes come from the source's
+    warm-start snapshot when it has one (`snapshot = true`, see snapshot.py).
+    """
+    watcher = source_watcher(source_name, config_path)
+    if watcher is None:
+        frame = load_rankings(source_name, config_path)
+        warm_start(frame, source_name, config_path)
+        _drop_table(serve_query(source_name, frame))
+        return frame
+    return watcher.current()
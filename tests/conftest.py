@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from rankings.ingest import read_csv_typed  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def rankings_frame() -> pd.DataFrame:
+    """The typed sample dataset, shared read-only like the dashboard's base frame."""
+    return read_csv_typed(os.path.join(PROJECT_DIR, "data", "sample.csv"))
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    """Write rows (a list of dicts) as a rankings CSV under tmp_path and return its path."""
+
+    def write(name: str, rows: list[dict]) -> str:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(rows).to_csv(path, index=False)
+        return str(path)
+
+    return write
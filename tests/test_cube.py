@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rankings.cube import AggregationCube, extend_cube
+from rankings.registry import pin, release
+
+
+def cell_names(cube: AggregationCube) -> np.ndarray:
+    return cube.keys.astype(object).fillna("").astype(str).agg("|".join, axis=1).to_numpy()
+
+
+def assert_same_cube(a: AggregationCube, b: AggregationCube):
+    # Cells are kept in dimension sort order, which can differ once categories are unioned
+    order_a, order_b = np.argsort(cell_names(a), kind="stable"), np.argsort(cell_names(b), kind="stable")
+    pd.testing.assert_frame_equal(
+        a.keys.iloc[order_a].astype(object).reset_index(drop=True), b.keys.iloc[order_b].astype(object).reset_index(drop=True)
+    )
+    for name in ["rows", "count", "total", "low", "high", "top_row", "sketch"]:
+        np.testing.assert_allclose(getattr(a, name)[order_a], getattr(b, name)[order_b], err_msg=name)
+
+
+@pytest.mark.parametrize("split", [1, 500, 1000])
+def test_append_equals_full_build(rankings_frame, split):
+    head = rankings_frame.iloc[:split]
+    cube = AggregationCube.build(head).append(rankings_frame.iloc[split:], split)
+    assert_same_cube(cube, AggregationCube.build(rankings_frame))
+
+
+def test_merged_cube_answers_like_full_build(rankings_frame):
+    cube = AggregationCube.build(rankings_frame.iloc[:700]).append(rankings_frame.iloc[700:], 700)
+    full = AggregationCube.build(rankings_frame)
+    for by in [None, "Region", "Size"]:
+        pd.testing.assert_frame_equal(
+            cube.aggregate("Overall SCORE", by=by, quantiles=(0.25, 0.5, 0.75)),
+            full.aggregate("Overall SCORE", by=by, quantiles=(0.25, 0.5, 0.75)),
+            check_categorical=False,
+        )
+    for where in [None, {"Region": "Asia"}, {"Status": ("Public",), "Size": "L"}]:
+        assert cube.top("AR SCORE", where) == full.top("AR SCORE", where)
+        assert cube.row_count(where) == full.row_count(where)
+
+
+def test_aggregates_match_pandas(rankings_frame):
+    cube = AggregationCube.build(rankings_frame)
+    expected = rankings_frame.groupby("Region", observed=True)["Overall SCORE"].agg(["count", "mean", "min", "max"])
+    result = cube.aggregate("Overall SCORE", by="Region", quantiles=()).set_index("Region")
+    np.testing.assert_array_equal(result["count"], expected["count"])
+    np.testing.assert_allclose(result["mean"], expected["mean"], rtol=1e-6)
+    np.testing.assert_allclose(result["max"], expected["max"])
+    assert cube.top("Overall SCORE") == int(np.nanargmax(rankings_frame["Overall SCORE"].to_numpy()))
+    # The median is read from half-point histogram bins
+    median = rankings_frame["Overall SCORE"].median()
+    assert abs(cube.quantile("Overall SCORE", 0.5) - median) <= 0.5
+
+
+def test_extend_cube_only_for_appended_rows(rankings_frame):
+    previous = rankings_frame.iloc[:900].copy()
+    appended = rankings_frame.copy()
+    changed = rankings_frame.copy()
+    changed.loc[changed.index[3], "Overall SCORE"] = 1.0
+    for frame in (previous, appended, changed):
+        pin(frame)
+    try:
+        assert_same_cube(extend_cube(appended, previous), AggregationCube.build(appended))
+        assert extend_cube(changed, previous) is None
+        assert extend_cube(previous, appended) is None
+    finally:
+        for frame in (previous, appended, changed):
+            release(frame)
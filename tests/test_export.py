@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from rankings.export import export_selection
+from rankings.selection import Selection
+
+
+FRAME = pd.DataFrame({"Institution Name": ["Alpha", "Beta"], "Overall SCORE": np.array([91.0, 85.5], dtype=np.float32)})
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_same_selection_of_same_data_reuses_the_file(tmp_path):
+    base = FRAME.copy()
+    base.attrs["checksum"] = "a" * 64
+    first = export_selection(Selection(base), "csv", str(tmp_path))
+    assert export_selection(Selection(base), "csv", str(tmp_path)) == first
+
+
+def test_changed_data_is_exported_again(tmp_path):
+    base = FRAME.copy()
+    base.attrs["checksum"] = "a" * 64
+    before = read(export_selection(Selection(base), "csv", str(tmp_path)))
+    # Same rows, one score revised - as after a reload or an indicator update
+    updated = base.copy()
+    updated.loc[0, "Overall SCORE"] = 97.0
+    updated.attrs["checksum"] = "b" * 64
+    after = read(export_selection(Selection(updated), "csv", str(tmp_path)))
+    assert "97" in after and after != before
+
+    # Without a checksum the data cannot be told apart, so the file is always rewritten
+    unversioned = FRAME.copy()
+    export_selection(Selection(unversioned), "csv", str(tmp_path))
+    unversioned.loc[1, "Overall SCORE"] = 12.5
+    assert "12.5" in read(export_selection(Selection(unversioned), "csv", str(tmp_path)))
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from rankings.filters import FilterEngine, pack_mask, unpack_mask
+
+
+CRITERIA = [
+    {},
+    {"region": "Europe"},
+    {"country": "United Kingdom"},
+    {"size": "XL", "focus": "FC"},
+    {"status": ("Public",)},
+    {"status": ()},
+    {"region": "Asia", "status": ("Private not for Profit", "Private for Profit")},
+    {"min_ar_score": 50},
+    {"overall_above": 90},
+    {"region": "Americas", "min_ar_score": 30, "overall_above": 40, "size": None},
+    {"country": "No Such Country"},
+]
+
+
+def pandas_mask(df, criteria):
+    mask = np.ones(len(df), dtype=bool)
+    for name, column in [("region", "Region"), ("country", "Country/Territory"), ("size", "Size"), ("focus", "Focus")]:
+        if criteria.get(name) is not None:
+            mask &= (df[column] == criteria[name]).to_numpy(dtype=bool, na_value=False)
+    if criteria.get("status") is not None:
+        mask &= df["Status"].isin(criteria["status"]).to_numpy(dtype=bool, na_value=False)
+    if criteria.get("min_ar_score") is not None:
+        mask &= (df["AR SCORE"] >= criteria["min_ar_score"]).to_numpy(dtype=bool, na_value=False)
+    if criteria.get("overall_above") is not None:
+        mask &= (df["Overall SCORE"] > criteria["overall_above"]).to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+@pytest.mark.parametrize("criteria", CRITERIA)
+def test_select_matches_pandas_mask(rankings_frame, criteria):
+    selection = FilterEngine(rankings_frame).select(criteria)
+    np.testing.assert_array_equal(selection.rows, np.flatnonzero(pandas_mask(rankings_frame, criteria)))
+
+
+def test_cached_predicates_combine_like_fresh_ones(rankings_frame):
+    engine = FilterEngine(rankings_frame)
+    engine.select({"region": "Europe"})
+    engine.select({"size": "L"})
+    combined = engine.select({"region": "Europe", "size": "L"})
+    np.testing.assert_array_equal(combined.rows, np.flatnonzero(pandas_mask(rankings_frame, {"region": "Europe", "size": "L"})))
+
+
+@pytest.mark.parametrize("length", [0, 1, 63, 64, 65, 1000])
+def test_pack_mask_round_trips(length):
+    mask = np.random.default_rng(length).random(length) < 0.5
+    np.testing.assert_array_equal(unpack_mask(pack_mask(mask), length), mask)
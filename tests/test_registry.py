@@ -0,0 +1,48 @@
+import gc
+
+import pandas as pd
+
+from rankings.registry import FrameRegistry, pin, release, set_source
+
+
+def frame(source=None):
+    base = pd.DataFrame({"x": [1, 2, 3]})
+    if source is not None:
+        set_source(base, source)
+    return base
+
+
+def test_a_newer_load_replaces_only_its_own_source():
+    registry = FrameRegistry(lambda base: object())
+    old, other = frame("rankings"), frame("countries")
+    built = registry.get(old), registry.get(other)
+    # A frame not loaded from a source (a store edition, a snapshot) leaves both alone
+    registry.get(frame())
+    assert (registry.get(old), registry.get(other)) == built
+
+    newer = frame("rankings")
+    registry.get(newer)
+    assert registry.get(other) is built[1]
+    assert registry.get(old) is not built[0]
+
+
+def test_pinned_frames_keep_their_objects():
+    registry = FrameRegistry(lambda base: object())
+    served = frame("rankings")
+    pin(served)
+    try:
+        value = registry.get(served)
+        registry.get(frame("rankings"))
+        assert registry.get(served) is value
+    finally:
+        release(served)
+
+
+def test_objects_go_with_their_frame():
+    registry = FrameRegistry(lambda base: len(base))
+    base = frame("rankings")
+    registry.get(base)
+    del base
+    gc.collect()
+    registry.put(frame("countries"), 0)
+    assert len(registry._entries) == 1
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rankings.search import SearchIndex
+from rankings.selection import Selection
+
+
+@pytest.fixture(scope="module")
+def index(rankings_frame):
+    return SearchIndex.build(rankings_frame)
+
+
+def names(index, query):
+    return set(index.base["Institution Name"].iloc[np.flatnonzero(index.mask(query))])
+
+
+def test_prefix_matches_and_ranks_exact_words_first(index):
+    assert "Imperial College London" in names(index, "imperi")
+    ranked = index.search("london", limit=5)
+    assert ranked["relevance"].is_monotonic_decreasing
+    assert ranked["Institution Name"].str.contains("London").all()
+
+
+def test_fuzzy_matches_misspelled_words(index):
+    assert "Imperial College London" in names(index, "londn")
+    assert "Massachusetts Institute of Technology (MIT)" in names(index, "massachusets")
+
+
+def test_every_query_word_must_match(index):
+    assert names(index, "imperial london") == {"Imperial College London"}
+    assert names(index, "imperial zzzzqqq") == set()
+
+
+def test_queries_are_not_regexes(index):
+    for query in ["(", "[]+", ".*", "\\", "%"]:
+        assert index.scores(query) is None
+        assert index.mask(query).all()
+    np.testing.assert_array_equal(index.mask("[a-z]+"), index.mask("a z"))
+
+
+def test_accents_are_ignored():
+    base = pd.DataFrame({"Institution Name": ["Université de Montréal", "Other College"], "Country/Territory": ["Canada", "Türkiye"]})
+    index = SearchIndex.build(base)
+    np.testing.assert_array_equal(index.mask("universite montreal"), [True, False])
+    np.testing.assert_array_equal(index.mask("TURKIYE"), [False, True])
+
+
+def test_rank_keeps_only_matching_rows_best_first(index, rankings_frame):
+    selection = Selection(rankings_frame)
+    ranked = index.rank(selection, "london")
+    scores = index.scores("london")
+    assert len(ranked) == int((scores > 0).sum())
+    assert (np.diff(scores[ranked.rows]) <= 0).all()
@@ -0,0 +1,92 @@
+import duckdb
+import pandas as pd
+import pytest
+
+from rankings.filters import filter_engine
+from rankings.sql import FrameTable, bind, build_query, quote_identifier, quote_literal
+from rankings.store import RankingsStore
+
+
+@pytest.fixture
+def connection():
+    con = duckdb.connect()
+    frame = pd.DataFrame(
+        {
+            "Institution Name": ["St Mary's 100% College", "Under_score Institute", "Plain University"],
+            "Country/Territory": ["Côte d'Ivoire", "United Kingdom", "Chile"],
+            "Region": ["Africa", "Europe", "Americas"],
+            "Focus": ["FC", "CO", "FO"],
+            "Status": ["Public", "Public", "Private not for Profit"],
+            "AR SCORE": ["10", "50", "90"],
+            "Overall SCORE": ["91.5", "20", "95"],
+            'Odd "Column"': ["a", "b", "c"],
+        }
+    )
+    con.register("frame", frame)
+    con.execute("CREATE TABLE rankings AS SELECT * FROM frame")
+    yield con
+    con.close()
+
+
+def names(con, sql):
+    return set(con.execute(sql).df()["Institution Name"])
+
+
+def test_quotes_in_values_are_escaped(connection):
+    assert names(connection, build_query("rankings", {"country": "Côte d'Ivoire"})) == {"St Mary's 100% College"}
+    hostile = "x' OR '1'='1"
+    assert names(connection, build_query("rankings", {"region": hostile})) == set()
+    assert names(connection, build_query("rankings", {"status": (hostile, "Public")})) == {"St Mary's 100% College", "Under_score Institute"}
+
+
+def test_like_wildcards_in_search_are_not_wildcards(connection):
+    # '%' and '_' are not word characters, so they never reach a LIKE pattern
+    assert names(connection, build_query("rankings", {"search": "100%"})) == {"St Mary's 100% College"}
+    assert names(connection, build_query("rankings", {"search": "%"})) == names(connection, "SELECT * FROM rankings")
+    sql = build_query("rankings", {"search": "under_score"})
+    assert "'%under%'" in sql and "'%score%'" in sql and "_score%'" not in sql
+    assert names(connection, sql) == {"Under_score Institute"}
+    assert names(connection, build_query("rankings", {"search": "mary's"})) == {"St Mary's 100% College"}
+
+
+def test_identifiers_and_numbers(connection):
+    sql = build_query("rankings", {"overall_above": 90, "min_ar_score": 50}, columns=["Institution Name", 'Odd "Column"'], order_by="Overall SCORE")
+    result = connection.execute(sql).df()
+    assert list(result.columns) == ["Institution Name", 'Odd "Column"']
+    assert list(result["Institution Name"]) == ["Plain University"]
+    with pytest.raises(ValueError):
+        quote_identifier("What?")
+
+
+def test_literals_and_binding():
+    assert quote_literal(None) == "NULL"
+    assert quote_literal(True) == "TRUE"
+    assert quote_literal("it's") == "'it''s'"
+    assert bind("a = ? AND b = ?", ["x?", 1]) == "a = 'x?' AND b = 1"
+    with pytest.raises(ValueError):
+        bind("a = ?", [])
+
+
+def test_sql_and_filter_engine_agree_after_an_update(tmp_path, write_csv):
+    rows = [
+        {"2026 Rank": str(rank), "Institution Name": name, "Country/Territory": "Canada", "Region": "Americas", "Overall SCORE": score}
+        for rank, (name, score) in enumerate([("Toronto", "93.1"), ("McGill", "88.9"), ("UBC", "86.0")], start=1)
+    ]
+    source = write_csv("data/sample.csv", rows)
+    update = write_csv("updates/2026-fix.csv", [{"Institution Name": "McGill", "Country/Territory": "Canada", "Overall SCORE": "95.0"}])
+    store = RankingsStore(str(tmp_path / "store"))
+    config = tmp_path / "preswald.toml"
+    config.write_text(f'[data.sample_csv]\npath = "{source}"\ncache_dir = "{tmp_path / "cache"}"\nstore_dir = "{store.directory}"\n')
+    store.sync("sample_csv", str(config))
+    assert store.ingest_update(update) == 2026
+    frame = store.sync("sample_csv", str(config))
+    assert frame.attrs["updates"] == 1
+
+    con = duckdb.connect()
+    table = FrameTable("sample_csv", frame, con)
+    criteria = {"overall_above": 90}
+    sql_names = set(table.query(build_query("sample_csv", criteria, columns=["Institution Name"]))["Institution Name"])
+    engine_names = set(filter_engine(frame).select(criteria).column("Institution Name"))
+    assert sql_names == engine_names == {"Toronto", "McGill"}
+    # Rank columns read like the file's
+    assert list(table.query("SELECT \"2026 Rank\" FROM sample_csv")["2026 Rank"].astype(str)) == ["1", "2", "3"]
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from rankings.store import ID_COLUMN, RankingsStore, institution_keys
+
+
+def edition(year, rows):
+    return [
+        {f"{year} Rank": rank, "Previous Rank": previous, "Institution Name": name, "Country/Territory": country,
+         "Region": "Europe", "Overall SCORE": score}
+        for rank, previous, name, country, score in rows
+    ]
+
+
+EDITION_2025 = edition(2025, [
+    ("1", "", "Alpha University", "Austria", "99"),
+    ("2", "", "Beta College", "Belgium", "95"),
+    ("3=", "", "Gamma Institute", "Greece", "90"),
+    ("701-750", "", "Delta University", "Denmark", "40"),
+])
+# Reordered, one institution dropped, one new, and a name with different spacing and case
+EDITION_2026 = edition(2026, [
+    ("1", "2", "beta  college", "Belgium", "97"),
+    ("2", "1", "Alpha University", "Austria", "96"),
+    ("3", "", "Epsilon School", "Estonia", "91"),
+    ("4", "701-750", "Delta University", "Denmark", "85"),
+])
+
+
+@pytest.fixture
+def store(tmp_path, write_csv):
+    store = RankingsStore(str(tmp_path / "store"))
+    assert store.ingest_edition(write_csv("2025.csv", EDITION_2025)) == 2025
+    assert store.ingest_edition(write_csv("2026.csv", EDITION_2026)) == 2026
+    return store
+
+
+def ids(store, year):
+    frame = store.edition(year)
+    return dict(zip(institution_keys(frame), frame[ID_COLUMN].tolist()))
+
+
+def test_institution_ids_are_stable_across_editions(store):
+    before, after = ids(store, 2025), ids(store, 2026)
+    for key in ["alpha university|austria", "beta college|belgium", "delta university|denmark"]:
+        assert before[key] == after[key]
+    assert after["epsilon school|estonia"] == 4
+    assert store.institution_count == 5
+
+
+def test_ids_survive_reopening_and_files_are_ingested_once(store, tmp_path, write_csv):
+    reopened = RankingsStore(store.directory)
+    assert reopened.editions == [2025, 2026]
+    assert ids(reopened, 2026) == ids(store, 2026)
+    assert reopened.ingest_edition(write_csv("2026.csv", EDITION_2026)) is None
+    assert reopened.version == 2
+
+
+def test_movement_joins_by_id_and_skips_bands(store):
+    movement = store.movement(2026).set_index("Institution Name")
+    assert movement.loc["beta  college", "Rank Change"] == 1
+    assert movement.loc["Alpha University", "Rank Change"] == -1
+    assert bool(movement.loc["Epsilon School", "New Entry"])
+    # Previous rank was the band 701-750: no exact movement, but the label is kept
+    assert movement["Rank Change"].isna()["Delta University"]
+    assert movement.loc["Delta University", "Previous Rank Label"] == "701-750"
+    np.testing.assert_allclose(movement.loc["Alpha University", "Overall SCORE Change"], -3.0)
+
+
+def test_updates_apply_on_top_of_their_edition(store, write_csv):
+    update = write_csv("2026-update.csv", [
+        {"Institution Name": "Alpha University", "Country/Territory": "Austria", "Overall SCORE": "98.5", "2026 Rank": "1="},
+        {"Institution Name": "Nobody", "Country/Territory": "Nowhere", "Overall SCORE": "10", "2026 Rank": ""},
+    ])
+    assert store.ingest_update(update) == 2026
+    frame = store.edition(2026).set_index("Institution Name")
+    assert frame.loc["Alpha University", "Overall SCORE"] == pytest.approx(98.5)
+    assert frame.loc["Alpha University", "Rank"] == 1
+    assert frame.loc["Alpha University", "Rank Label"] == "1="
+    assert frame.loc["beta  college", "Overall SCORE"] == pytest.approx(97)
+
+
+def test_movement_of_only_while_the_frame_is_served(tmp_path, write_csv):
+    source = write_csv("data/sample.csv", EDITION_2026)
+    config = tmp_path / "preswald.toml"
+    config.write_text(f'[data.sample_csv]\npath = "{source}"\ncache_dir = "{tmp_path / "cache"}"\nstore_dir = "{tmp_path / "store"}"\n')
+    store = RankingsStore(str(tmp_path / "store"))
+    frame = store.sync("sample_csv", str(config))
+    movement = store.movement_of(frame)
+    assert list(movement["Institution ID"]) == list(store.edition(2026)[ID_COLUMN])
+    assert movement.attrs["previous_edition"] is None
+
+    # A newer frame (here: an update applied) replaces it; the old frame no longer gets a movement
+    write_csv("updates/2026-fix.csv", [{"Institution Name": "Alpha University", "Country/Territory": "Austria", "Overall SCORE": "99"}])
+    assert store.ingest_update(str(tmp_path / "updates" / "2026-fix.csv")) == 2026
+    newer = store.sync("sample_csv", str(config))
+    assert newer is not frame
+    assert store.movement_of(frame) is None
+    assert store.movement_of(newer) is not None
+
+
+def test_stores_sharing_a_directory_keep_each_others_writes(tmp_path, write_csv):
+    first, second = RankingsStore(str(tmp_path / "store")), RankingsStore(str(tmp_path / "store"))
+    assert first.ingest_edition(write_csv("2025.csv", EDITION_2025)) == 2025
+    # Written from a copy opened before the first store's write, which is re-read first
+    assert second.ingest_edition(write_csv("2026.csv", EDITION_2026)) == 2026
+    reopened = RankingsStore(first.directory)
+    assert reopened.editions == [2025, 2026]
+    assert ids(reopened, 2026)["alpha university|austria"] == ids(reopened, 2025)["alpha university|austria"]
+    assert reopened.institution_count == 5
+
+
+def test_only_the_leader_ingests_on_sync(tmp_path, write_csv):
+    source = write_csv("data/sample.csv", EDITION_2026)
+    config = tmp_path / "preswald.toml"
+    config.write_text(f'[data.sample_csv]\npath = "{source}"\ncache_dir = "{tmp_path / "cache"}"\n'
+                      f'store_dir = "{tmp_path / "store"}"\nupdates_dir = "{tmp_path / "updates"}"\n')
+    leader, follower = RankingsStore(str(tmp_path / "store")), RankingsStore(str(tmp_path / "store"))
+    leader.sync("sample_csv", str(config))
+    follower.sync("sample_csv", str(config))
+    assert follower.version == leader.version == 1
+
+    write_csv("updates/2026-fix.csv", [{"Institution Name": "Alpha University", "Country/Territory": "Austria", "Overall SCORE": "99"}])
+    frame = follower.sync("sample_csv", str(config), rescan=True)
+    assert follower.version == 1
+    # Without a change notification the directories are not scanned again
+    leader.sync("sample_csv", str(config))
+    assert leader.version == 1
+    leader.sync("sample_csv", str(config), rescan=True)
+    reloaded = follower.sync("sample_csv", str(config), rescan=True)
+    assert follower.version == leader.version == 2
+    assert reloaded is not frame and follower.movement_of(reloaded) is not None
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from rankings.selection import Selection
+from rankings.topk import top_k, top_k_per_group
+
+
+FRAME = pd.DataFrame(
+    {
+        "Institution Name": list("ABCDEFGH"),
+        "Region": pd.Categorical(["Asia", "Europe", "Asia", "Europe", "Asia", None, "Europe", "Asia"]),
+        "Overall SCORE": np.array([90, 95, 95, 80, 95, 99, np.nan, 70], dtype=np.float32),
+        "AR SCORE": np.array([1, 5, 7, 3, 7, np.nan, 9, 2], dtype=np.float32),
+    }
+)
+
+
+def names(selection):
+    return "".join(selection.column("Institution Name"))
+
+
+def test_ties_keep_selection_order():
+    assert names(top_k(Selection(FRAME), 3)) == "FBC"
+    assert names(top_k(Selection(FRAME, [4, 2, 1, 5]), 3)) == "FEC"
+
+
+def test_ties_across_the_kth_value_are_broken_by_then_by():
+    # Three rows tie for second place; AR SCORE descending then selection order decide
+    assert names(top_k(Selection(FRAME), 3, then_by=[("AR SCORE", True)])) == "FCE"
+    assert names(top_k(Selection(FRAME), 3, then_by=[("AR SCORE", False)])) == "FBC"
+
+
+def test_missing_values_are_never_returned():
+    assert names(top_k(Selection(FRAME), 20)) == "FBCEADH"
+    assert names(top_k(Selection(FRAME), 2, by="AR SCORE", descending=False)) == "AH"
+    assert len(top_k(Selection(FRAME), 0)) == 0
+    assert len(top_k(Selection(FRAME, []), 3)) == 0
+
+
+def test_per_group():
+    # Groups in category order; the row without a Region is left out
+    assert names(top_k_per_group(Selection(FRAME), 2, "Region")) == "CEBD"
+    assert names(top_k_per_group(Selection(FRAME), 2, "Region", by="AR SCORE")) == "CEGB"